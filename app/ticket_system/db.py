@@ -0,0 +1,45 @@
+import sqlite3
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to every new SQLite connection"""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    # On the DB-API connection, bypassing Django's cursor: connection setup is
+    # not request work, so it stays out of query logs and request metrics
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        if getattr(settings, "SQLITE_OPTIMIZE", True):
+            _optimize(cursor)
+    finally:
+        cursor.close()
+
+
+def _optimize(cursor):
+    """
+    Keep the planner statistics in sqlite_stat1 current; the query plans and
+    EstimatedCountPaginator's row estimates depend on them and nothing else
+    runs ANALYZE.
+    """
+    # Sample at most this many index rows per table, so ANALYZE stays cheap
+    cursor.execute("PRAGMA analysis_limit = 1000")
+    try:
+        cursor.execute("SELECT 1 FROM sqlite_stat1 LIMIT 1")
+        analyzed = cursor.fetchone() is not None
+    except sqlite3.OperationalError:  # sqlite_stat1 does not exist before ANALYZE
+        analyzed = False
+    if not analyzed:
+        cursor.execute("ANALYZE")
+    else:
+        # SQLite 3.46+ re-analyzes tables whose size changed a lot since; older
+        # versions only consider tables this connection has queried, so this
+        # is a no-op there and the first ANALYZE's figures stay
+        cursor.execute("PRAGMA optimize = 0x10002")
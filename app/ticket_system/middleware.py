@@ -0,0 +1,167 @@
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("ticket_system.requests")
+
+# The current request's QueryRecorder. sync_to_async copies the context into
+# the threads it runs code on, worker threads (thread_sensitive=False)
+# included, so their queries are counted against the request too.
+_recorder = ContextVar("request_metrics_recorder", default=None)
+
+
+class QueryRecorder:
+    """execute_wrapper that counts queries, DB time and repeated statements"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        # Async views may run queries on several threads at once
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.seconds += elapsed
+                self.count += 1
+                # The SQL is still parameterised here, so the same statement
+                # run once per row collapses onto a single key
+                self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return [
+            {"count": count, "sql": sql[:300]}
+            for sql, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # Connections are per thread, so hook each one as it opens, whichever
+    # thread (request, thread-sensitive or worker) it belongs to
+    _install(connection)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, Python time and (optionally) peak memory per
+    request. Adds a Server-Timing header, logs one JSON line per request and
+    flags slow requests and likely N+1 query patterns.
+
+    Works under WSGI and ASGI. Queries from every thread the request runs
+    code on are counted, so for async views that fan out to worker threads
+    the DB time is summed across threads and may exceed the wall-clock total.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 500)
+        self.duplicate_threshold = getattr(
+            settings, "REQUEST_METRICS_DUPLICATE_THRESHOLD", 5
+        )
+        self.trace_memory = getattr(settings, "REQUEST_METRICS_TRACE_MEMORY", False)
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        # Connections opened before this module was imported missed the
+        # connection_created hook
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        started = self._start()
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self._finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        started = self._start()
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self._finish(request, response, recorder, started)
+
+    def _start(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        return time.perf_counter()
+
+    def _finish(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.seconds * 1000
+        python_ms = max(total_ms - db_ms, 0.0)
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+                f"app;dur={python_ms:.1f}",
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+
+        duplicates = recorder.duplicates(self.duplicate_threshold)
+        slow = total_ms >= self.slow_ms
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "python_ms": round(python_ms, 1),
+            "queries": recorder.count,
+            "slow": slow,
+            "duplicate_queries": duplicates,
+        }
+        if self.trace_memory:
+            record["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+        level = logging.WARNING if slow or duplicates else logging.INFO
+        logger.log(level, json.dumps(record), extra={"request_metrics": record})
+        return response
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so its timings cover every other middleware
+    "ticket_system.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,13 +83,131 @@ WSGI_APPLICATION = "ticket_system.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
+# DB_PROFILE selects the database: "sqlite" (default) or "postgres".
+
+DB_PROFILE = os.environ.get("DB_PROFILE", "sqlite")
+
+if DB_PROFILE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "ticketing"),
+            "USER": os.environ.get("POSTGRES_USER", "ticketing"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # Persistent connections, checked before reuse
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+    if django.VERSION >= (5, 1) and os.environ.get("DB_POOL", "1") == "1":
+        # psycopg 3 connection pool; pooled connections replace CONN_MAX_AGE
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("DB_POOL_MIN", "2")),
+                "max_size": int(os.environ.get("DB_POOL_MAX", "10")),
+            }
+        }
+else:
+    DATABASES = {
+        "default": {
+            # Django 5.1+ supports transaction_mode natively
+            "ENGINE": (
+                "django.db.backends.sqlite3"
+                if django.VERSION >= (5, 1)
+                else "ticket_system.sqlite3"
+            ),
+            "NAME": BASE_DIR / "db.sqlite3",
+            # File-backed test DB so threaded tests get real SQLite locking
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+            # Writers take the lock at BEGIN and wait on busy_timeout rather
+            # than failing a read-to-write lock upgrade
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        }
+    }
+
+# Applied to every new SQLite connection by ticket_system.db. WAL lets readers
+# carry on while a gunicorn worker writes; busy_timeout makes writers queue
+# instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative values are KiB, so 64 MiB of page cache
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+# Also ANALYZE (or PRAGMA optimize) on connect so the planner, and the admin's
+# row estimates, have table statistics; see ticket_system.db
+SQLITE_OPTIMIZE = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Swap in "django.core.cache.backends.filebased.FileBasedCache" with a shared
+# LOCATION to let several gunicorn workers share cached reports.
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
+# Report payloads are invalidated by model signals; the TTL is a backstop
+REPORT_CACHE_ALIAS = "default"
+REPORT_CACHE_TTL = 300
+
+# Admin changelists: unfiltered tables at least this big show the planner's
+# row estimate instead of running COUNT(*) (tickets.pagination)
+ADMIN_EXACT_COUNT_LIMIT = 10000
+# Related-object list_filter choices are cached until the related table
+# changes; the TTL bounds how stale "only owners with tickets" can get
+ADMIN_FILTER_CACHE_TTL = 300
+
+# Serve GET /api/tickets/ from values() rows rendered without re-validating
+# against TicketOut (tickets.listing); pair with orjson for the renderer
+TICKET_LIST_FAST_PATH = False
+
+
+# Background jobs (tickets.jobs, run by "manage.py run_jobs")
+JOB_WORKERS = 2
+JOB_POLL_SECONDS = 1.0
+JOB_MAX_ATTEMPTS = 3
+# A failed attempt is retried after this many seconds, doubling each time
+JOB_RETRY_BACKOFF_SECONDS = 30
+# Running jobs report in this often; a job silent for JOB_STALE_SECONDS is
+# assumed to have lost its worker and is queued again
+JOB_HEARTBEAT_SECONDS = 15
+JOB_STALE_SECONDS = 300
+
+
+# Per-request SQL/timing instrumentation (ticket_system.middleware)
+REQUEST_METRICS_ENABLED = True
+# Requests slower than this are logged at WARNING
+REQUEST_METRICS_SLOW_MS = 500
+# The same SQL statement this many times in one request is reported as N+1
+REQUEST_METRICS_DUPLICATE_THRESHOLD = 5
+# tracemalloc slows everything down, so only trace allocations when debugging
+REQUEST_METRICS_TRACE_MEMORY = False
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "ticket_system.requests": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -122,6 +245,35 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+
+# Uploaded files
+# https://docs.djangoproject.com/en/4.2/topics/files/
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "media/"
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    # Attachments are stored once per distinct content (tickets.storage)
+    "attachments": {"BACKEND": "tickets.storage.ContentAddressedStorage"},
+}
+
+# Uploads go to a temporary file as they arrive, hashed chunk by chunk, so
+# the attachment storage can move them into place without reading them again
+FILE_UPLOAD_HANDLERS = ["tickets.storage.HashingFileUploadHandler"]
+
+# Attachment downloads are streamed by Django (sendfile(2) under gunicorn)
+# unless set to "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd),
+# in which case the front-end server sends the file. For nginx, map the
+# prefix to MEDIA_ROOT in an internal location.
+ATTACHMENT_DOWNLOAD_OFFLOAD = None
+ATTACHMENT_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# prune_blobs leaves unreferenced blobs touched within this many seconds, so
+# an upload that has just deduplicated against one keeps its file
+ATTACHMENT_BLOB_GRACE_SECONDS = 3600
+
 AUTH_USER_MODEL = "users.User"
 
 # Default primary key field type
@@ -0,0 +1,24 @@
+"""
+SQLite backend with the ``transaction_mode`` option that Django 5.1 added.
+
+With the default DEFERRED mode a transaction that reads before it writes
+has to upgrade its lock, and SQLite fails that upgrade with "database is
+locked" straight away instead of waiting out busy_timeout. BEGIN IMMEDIATE
+takes the write lock up front, so concurrent writers queue instead. Only
+used on Django < 5.1; newer versions read the same option natively.
+"""
+
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.transaction_mode = kwargs.pop("transaction_mode", None)
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
@@ -1,15 +1,75 @@
+from django.conf import settings
 from django.contrib import admin
-
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils.html import format_html
+
+from tickets import jobs
+from tickets.bulk import transition_tickets
+from tickets.conditional import CATALOG, USERS
+from tickets.exports import stream_tickets_csv
 from tickets.models import (
     Attachment,
     BugReport,
+    DataVersion,
     FeatureRequest,
+    Job,
     Project,
     Task,
     Technology,
     TechnologyCategory,
     Ticket,
 )
+from tickets.pagination import EstimatedCountPaginator
+from tickets.search import search_filter
+
+User = get_user_model()
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object filter whose choices are cached until the related table
+    changes, instead of being reloaded on every changelist view.
+    """
+
+    # The DataVersion counter that moves when the related table changes
+    versions = {Project: CATALOG, TechnologyCategory: CATALOG, User: USERS}
+    # Only offer objects that some row of the changelist refers to
+    related_only = False
+
+    def field_choices(self, field, request, model_admin):
+        related = field.related_model
+        version = DataVersion.current(self.versions.get(related, CATALOG))[0]
+        key = (
+            f"admin-filter:{model_admin.model._meta.label_lower}:"
+            f"{self.field_path}:{version}"
+        )
+        choices = cache.get(key)
+        if choices is None:
+            limit = None
+            if self.related_only:
+                # An index probe per related object rather than a DISTINCT
+                # over the whole changelist table
+                limit = Q(
+                    Exists(
+                        model_admin.model._default_manager.filter(
+                            **{self.field_path: OuterRef("pk")}
+                        )
+                    )
+                )
+            ordering = self.field_admin_ordering(field, request, model_admin)
+            choices = field.get_choices(
+                include_blank=False, limit_choices_to=limit, ordering=ordering
+            )
+            cache.set(key, choices, settings.ADMIN_FILTER_CACHE_TTL)
+        return choices
+
+
+class CachedRelatedOnlyFieldListFilter(CachedRelatedFieldListFilter):
+    related_only = True
 
 
 class AuditAdmin(admin.ModelAdmin):
@@ -33,7 +93,11 @@ class ProjectAdmin(AuditAdmin):
         "is_active",
         "created_at",
     ]
-    list_filter = ["is_active", "project_lead", "created_at"]
+    list_filter = [
+        "is_active",
+        ("project_lead", CachedRelatedOnlyFieldListFilter),
+        "created_at",
+    ]
     search_fields = ["name", "description"]
     readonly_fields = AuditAdmin.readonly_fields + (
         "total_tickets",
@@ -43,7 +107,7 @@ class ProjectAdmin(AuditAdmin):
     filter_horizontal = ["members"]
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related("project_lead")
+        return super().get_queryset(request).select_related("project_lead").with_stats()
 
 
 @admin.register(TechnologyCategory)
@@ -51,21 +115,37 @@ class TechnologyCategoryAdmin(AuditAdmin):
     list_display = ["name", "description", "technology_count"]
     search_fields = ["name", "description"]
 
-    def technology_count(self, obj):
-        return obj.technologies.count()
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(technology_total=Count("technologies"))
+        )
 
-    technology_count.short_description = "Technologies"
+    @admin.display(description="Technologies", ordering="technology_total")
+    def technology_count(self, obj):
+        return obj.technology_total
 
 
 @admin.register(Technology)
 class TechnologyAdmin(AuditAdmin):
     list_display = ["name", "category", "version", "usage_count", "is_active"]
-    list_filter = ["category", "is_active"]
+    list_filter = [("category", CachedRelatedFieldListFilter), "is_active"]
     search_fields = ["name", "description"]
     readonly_fields = AuditAdmin.readonly_fields + ("usage_count",)
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related("category")
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("category")
+            # Read from the usage rollup rather than counting links per row
+            .annotate(usage_total=Coalesce("usage_rollup__ticket_count", 0))
+        )
+
+    @admin.display(description="Usage count", ordering="usage_total")
+    def usage_count(self, obj):
+        return obj.usage_total
 
 
 @admin.register(Ticket)
@@ -86,12 +166,16 @@ class TicketAdmin(AuditAdmin):
         "status",
         "priority",
         "ticket_type",
-        "project",
-        "owner",
-        "technologies__category",
+        ("project", CachedRelatedFieldListFilter),
+        ("owner", CachedRelatedOnlyFieldListFilter),
+        ("technologies__category", CachedRelatedFieldListFilter),
         "created_at",
     ]
+    # Searches go through the full-text index, see get_search_results
     search_fields = ["ticket_id", "title", "reporter_name", "description"]
+    # Skip the unfiltered COUNT(*) that filtered changelists otherwise run
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     readonly_fields = AuditAdmin.readonly_fields + ("ticket_id", "technology_summary")
     filter_horizontal = ["technologies", "assigned_users"]
 
@@ -139,10 +223,11 @@ class TicketAdmin(AuditAdmin):
 
     def technology_display(self, obj):
         """Display first few technologies in list view"""
-        techs = obj.technologies.all()[:3]
-        tech_names = [tech.name for tech in techs]
-        if obj.technologies.count() > 3:
-            tech_names.append(f"+ {obj.technologies.count() - 3} more")
+        # Works on the prefetched list; slicing or counting would query again
+        techs = obj.technologies.all()
+        tech_names = [tech.name for tech in techs[:3]]
+        if len(techs) > 3:
+            tech_names.append(f"+ {len(techs) - 3} more")
         return ", ".join(tech_names) if tech_names else "None"
 
     technology_display.short_description = "Technologies"
@@ -158,9 +243,19 @@ class TicketAdmin(AuditAdmin):
             super()
             .get_queryset(request)
             .select_related("project", "owner")
-            .prefetch_related("technologies", "assigned_users")
+            .prefetch_related(
+                Prefetch(
+                    "technologies",
+                    queryset=Technology.objects.only("name"),
+                )
+            )
         )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(search_filter(search_term)), False
+
 
 # Inline admins for ticket details
 class BugReportInline(admin.StackedInline):
@@ -184,7 +279,24 @@ class TaskInline(admin.StackedInline):
 class AttachmentInline(admin.TabularInline):
     model = Attachment
     extra = 1
-    readonly_fields = ("created_at", "modified_at", "created_by", "modified_by")
+    readonly_fields = (
+        "download",
+        "created_at",
+        "modified_at",
+        "created_by",
+        "modified_by",
+    )
+
+    @admin.display(description="Download")
+    def download(self, obj):
+        # Served by the API endpoint, which streams and supports Range
+        if not obj.pk:
+            return "-"
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse("api-0.1:download_attachment", args=[obj.pk]),
+            obj.original_name,
+        )
 
 
 # Add inlines to TicketAdmin
@@ -199,53 +311,109 @@ TicketAdmin.inlines = [
 # Custom admin actions for bulk operations
 @admin.action(description="Export selected tickets with technology details")
 def export_tickets_with_tech(modeladmin, request, queryset):
-    """Custom export that includes technology information"""
-    import csv
-
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="tickets_with_tech.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "Ticket ID",
-            "Title",
-            "Project",
-            "Status",
-            "Priority",
-            "Owner",
-            "Assigned Users",
-            "Technologies",
-            "Technology Categories",
-        ]
+    """Custom export that includes technology information, streamed"""
+    return stream_tickets_csv(queryset)
+
+
+@admin.action(description="Export selected tickets in the background")
+def export_tickets_in_background(modeladmin, request, queryset):
+    job = jobs.enqueue(
+        "export_tickets_with_tech",
+        {"ticket_ids": list(queryset.values_list("pk", flat=True))},
+        user=request.user,
+    )
+    modeladmin.message_user(
+        request,
+        format_html(
+            'Export queued as <a href="{}">job {}</a>.',
+            reverse("admin:tickets_job_change", args=[job.pk]),
+            job.pk,
+        ),
     )
 
-    for ticket in queryset.prefetch_related("technologies__category", "assigned_users"):
-        tech_names = ", ".join([tech.name for tech in ticket.technologies.all()])
-        tech_categories = ", ".join(
-            list(set([tech.category.name for tech in ticket.technologies.all()]))
-        )
-        assigned_users = ", ".join(
-            [user.username for user in ticket.assigned_users.all()]
-        )
 
-        writer.writerow(
-            [
-                ticket.ticket_id,
-                ticket.title,
-                ticket.project.name,
-                ticket.status,
-                ticket.priority,
-                ticket.owner.username if ticket.owner else "",
-                assigned_users,
-                tech_names,
-                tech_categories,
-            ]
-        )
+def _report_transition(modeladmin, request, counts):
+    modeladmin.message_user(
+        request,
+        f"{counts['updated']} tickets updated "
+        f"({counts['assigned']} assignments added, "
+        f"{counts['unassigned']} removed).",
+    )
+
+
+def _set_field_action(field, value, label):
+    # One set-based UPDATE per action, without loading the selected tickets
+    def action(modeladmin, request, queryset):
+        counts = transition_tickets(queryset, user=request.user, **{field: value})
+        _report_transition(modeladmin, request, counts)
+
+    action.__name__ = f"set_{field}_{value}"
+    return admin.action(description=f"Set {field} to {label}")(action)
+
+
+@admin.action(description="Make me the owner of selected tickets")
+def take_ownership(modeladmin, request, queryset):
+    counts = transition_tickets(queryset, owner_id=request.user.pk, user=request.user)
+    _report_transition(modeladmin, request, counts)
 
-    return response
 
+@admin.action(description="Assign me to selected tickets")
+def assign_to_me(modeladmin, request, queryset):
+    counts = transition_tickets(queryset, assign=[request.user.pk], user=request.user)
+    _report_transition(modeladmin, request, counts)
+
+
+@admin.action(description="Unassign me from selected tickets")
+def unassign_me(modeladmin, request, queryset):
+    counts = transition_tickets(queryset, unassign=[request.user.pk], user=request.user)
+    _report_transition(modeladmin, request, counts)
+
+
+TicketAdmin.actions = (
+    [export_tickets_with_tech, export_tickets_in_background]
+    + [
+        _set_field_action("status", value, label)
+        for value, label in Ticket.STATUS_CHOICES
+    ]
+    + [
+        _set_field_action("priority", value, label)
+        for value, label in Ticket.PRIORITY_CHOICES
+    ]
+    + [take_ownership, assign_to_me, unassign_me]
+)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "kind",
+        "status",
+        "attempts",
+        "created_by",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "kind"]
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    readonly_fields = [
+        "kind",
+        "payload",
+        "status",
+        "attempts",
+        "worker",
+        "started_at",
+        "heartbeat_at",
+        "finished_at",
+        "result",
+        "result_file",
+        "error",
+        "created_at",
+        "created_by",
+    ]
+    fields = ["priority", "max_attempts", "run_after"] + readonly_fields
 
-TicketAdmin.actions = [export_tickets_with_tech]
+    def has_add_permission(self, request):
+        # Jobs are queued by admin actions and the API
+        return False
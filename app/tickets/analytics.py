@@ -0,0 +1,173 @@
+"""
+Denormalized ticket facts for the BI warehouse, as NDJSON or Parquet.
+
+Each fact carries the ticket with its project, subtype category,
+technologies (with categories), assignees and audit timestamps, so the
+warehouse needs no joins of its own. Tickets are read as values() rows in
+batches of ANALYTICS_BATCH_SIZE. Each batch costs one query for its
+technologies and one for its assignees, and becomes one Parquet row group.
+
+Incremental exports take only tickets with ``modified_at >= since`` and
+report the newest modified_at they saw as the next watermark. The bound is
+inclusive, so rows sharing the watermark timestamp are sent again; load
+them as upserts on ``id``. Deletions are not exported.
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Coalesce
+
+from tickets.models import Ticket
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional, see req_files/requirements.txt
+    pyarrow = None
+
+ANALYTICS_BATCH_SIZE = 5000
+
+COLUMNS = {
+    "id": "id",
+    "ticket_id": "ticket_id",
+    "title": "title",
+    "ticket_type": "ticket_type",
+    "status": "status",
+    "priority": "priority",
+    "project_id": "project_id",
+    "project": "project__name",
+    "owner": "owner__username",
+    "reporter_name": "reporter_name",
+    "reporter_department": "reporter_department",
+    "created_at": "created_at",
+    "modified_at": "modified_at",
+    "created_by": "created_by__username",
+    "modified_by": "modified_by__username",
+}
+
+
+def fact_queryset(since=None):
+    tickets = Ticket.objects.all()
+    if since is not None:
+        tickets = tickets.filter(modified_at__gte=since)
+    return (
+        tickets.order_by("modified_at", "id")
+        .annotate(
+            # Only the row for the ticket's own type exists
+            subtype_category=Coalesce(
+                "bugreport__category", "featurerequest__category", "task__task_type"
+            )
+        )
+        .values(*COLUMNS.values(), "subtype_category")
+    )
+
+
+def _links(ticket_ids):
+    through = Ticket.technologies.through
+    technologies = {pk: [] for pk in ticket_ids}
+    for ticket_id, name, category in (
+        through.objects.filter(ticket_id__in=ticket_ids)
+        .order_by("technology__category__name", "technology__name")
+        .values_list("ticket_id", "technology__name", "technology__category__name")
+    ):
+        technologies[ticket_id].append({"name": name, "category": category})
+    assignees = {pk: [] for pk in ticket_ids}
+    for ticket_id, username in (
+        Ticket.assigned_users.through.objects.filter(ticket_id__in=ticket_ids)
+        .order_by("id")
+        .values_list("ticket_id", "user__username")
+    ):
+        assignees[ticket_id].append(username)
+    return technologies, assignees
+
+
+def fact_batches(since=None, batch_size=None):
+    """Yield lists of fact dicts, ``batch_size`` tickets at a time"""
+    batch_size = batch_size or ANALYTICS_BATCH_SIZE
+    batch = []
+    for row in fact_queryset(since).iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield _complete(batch)
+            batch = []
+    if batch:
+        yield _complete(batch)
+
+
+def _complete(rows):
+    technologies, assignees = _links([row["id"] for row in rows])
+    facts = []
+    for row in rows:
+        fact = {name: row[lookup] for name, lookup in COLUMNS.items()}
+        fact["subtype_category"] = row["subtype_category"]
+        fact["technologies"] = technologies[row["id"]]
+        fact["assignees"] = assignees[row["id"]]
+        facts.append(fact)
+    return facts
+
+
+def write_ndjson(batches, out):
+    """Write one JSON object per line to the binary file ``out``"""
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    rows, watermark = 0, None
+    for batch in batches:
+        out.write(
+            "".join(encoder.encode(fact) + "\n" for fact in batch).encode("utf-8")
+        )
+        rows += len(batch)
+        watermark = batch[-1]["modified_at"]
+    return rows, watermark
+
+
+def parquet_schema():
+    string, timestamp = pyarrow.string(), pyarrow.timestamp("us", tz="UTC")
+    return pyarrow.schema(
+        [
+            ("id", pyarrow.int64()),
+            ("ticket_id", string),
+            ("title", string),
+            ("ticket_type", string),
+            ("status", string),
+            ("priority", string),
+            ("project_id", pyarrow.int64()),
+            ("project", string),
+            ("subtype_category", string),
+            ("owner", string),
+            ("reporter_name", string),
+            ("reporter_department", string),
+            (
+                "technologies",
+                pyarrow.list_(pyarrow.struct([("name", string), ("category", string)])),
+            ),
+            ("assignees", pyarrow.list_(string)),
+            ("created_at", timestamp),
+            ("modified_at", timestamp),
+            ("created_by", string),
+            ("modified_by", string),
+        ]
+    )
+
+
+def write_parquet(batches, out):
+    """Write each batch as one row group of a Parquet file to ``out``"""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+    schema = parquet_schema()
+    rows, watermark = 0, None
+    with pyarrow.parquet.ParquetWriter(out, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+            rows += len(batch)
+            watermark = batch[-1]["modified_at"]
+    return rows, watermark
+
+
+WRITERS = {"ndjson": write_ndjson, "parquet": write_parquet}
+
+
+def export_facts(out, fmt="ndjson", since=None, batch_size=None):
+    """
+    Write ticket facts modified since ``since`` (all when None) to the binary
+    file ``out``. Returns (rows written, watermark for the next run).
+    """
+    rows, watermark = WRITERS[fmt](fact_batches(since, batch_size), out)
+    return rows, watermark or since
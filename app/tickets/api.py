@@ -1,13 +1,46 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.db.models import Count, Q
+from django.http import FileResponse
 from django.shortcuts import get_object_or_404
-from ninja import NinjaAPI, Schema
-
-from tickets.models import Project, Technology, TechnologyCategory, Ticket
-
-api = NinjaAPI(title="SE Ticketing API", version="0.1")
+from django.urls import reverse
+from ninja import File, NinjaAPI, Schema
+from ninja.decorators import decorate_view
+from ninja.errors import HttpError
+from ninja.files import UploadedFile
+from ninja.security import django_auth
+
+from tickets import jobs
+from tickets.bulk import MAX_BATCH_SIZE, UNCHANGED, create_tickets, transition_tickets
+from tickets.catalog import get_catalog, ticket_technologies
+from tickets.conditional import CATALOG, TICKETS, USERS, etag
+from tickets.downloads import serve_attachment
+from tickets.exports import stream_tickets_csv
+from tickets.listing import parse_fieldset, sparse_ticket_page, ticket_page
+from tickets.models import (
+    Attachment,
+    Job,
+    Project,
+    Technology,
+    Ticket,
+)
+from tickets.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate_tickets
+from tickets.report_cache import acached_report, cached_report
+from tickets.renderers import FastJSONRenderer
+from tickets.reports import (
+    aindividual_report,
+    aproject_report,
+    ateam_technology_report,
+    individual_report,
+    project_report,
+    team_technology_report,
+)
+from tickets.search import search_ticket_ids
+
+api = NinjaAPI(title="SE Ticketing API", version="0.1", renderer=FastJSONRenderer())
 User = get_user_model()
 
 
@@ -43,6 +76,16 @@ class TicketOut(Schema):
     created_at: str
 
 
+class TicketSearchOut(TicketOut):
+    rank: float
+
+
+class TicketPage(Schema):
+    items: List[TicketOut]
+    next: Optional[str] = None
+    prev: Optional[str] = None
+
+
 class TicketCreateSchema(Schema):
     title: str
     description: str
@@ -54,43 +97,292 @@ class TicketCreateSchema(Schema):
     priority: str = "medium"
 
 
-@api.get("/tickets/", response=List[TicketOut])
+class BulkTicketResult(Schema):
+    index: int
+    id: Optional[int] = None
+    ticket_id: Optional[str] = None
+    errors: List[str] = []
+
+
+class BulkTicketOut(Schema):
+    created: int
+    failed: int
+    results: List[BulkTicketResult]
+
+
+class TicketTransitionSchema(Schema):
+    ticket_ids: List[int]
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    # Send "owner_id": null to clear the owner; leave it out to keep it
+    owner_id: Optional[int] = None
+    assign: List[int] = []
+    unassign: List[int] = []
+
+
+class TicketTransitionOut(Schema):
+    updated: int
+    assigned: int
+    unassigned: int
+
+
+class AttachmentOut(Schema):
+    id: int
+    ticket_id: str
+    original_name: str
+    size: int
+    sha256: Optional[str] = None
+    created_at: str
+
+
+class JobCreateSchema(Schema):
+    kind: str
+    payload: dict = {}
+    priority: int = 0
+
+
+class JobOut(Schema):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: str
+    result: Optional[Any] = None
+    result_url: Optional[str] = None
+
+
+def _job_out(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+        "result": job.result,
+        "result_url": (
+            reverse("api-0.1:job_result", args=[job.id]) if job.result_file else None
+        ),
+    }
+
+
+def _own_job(request, pk):
+    jobs_visible = Job.objects.all()
+    if not request.user.is_staff:
+        jobs_visible = jobs_visible.filter(created_by=request.user)
+    return get_object_or_404(jobs_visible, pk=pk)
+
+
+def _attachment_out(a):
+    return {
+        "id": a.id,
+        "ticket_id": a.ticket.ticket_id,
+        "original_name": a.original_name,
+        "size": a.blob.size if a.blob else a.file.size,
+        "sha256": a.blob_id,
+        "created_at": a.created_at.isoformat(),
+    }
+
+
+def _ticket_out(t, technologies):
+    return {
+        "id": t.id,
+        "ticket_id": t.ticket_id,
+        "title": t.title,
+        "status": t.status,
+        "priority": t.priority,
+        "ticket_type": t.ticket_type,
+        "project": t.project.name,
+        "technologies": technologies,
+        "reporter_name": t.reporter_name,
+        "owner": t.owner.username if t.owner else None,
+        "assigned_users": [user.username for user in t.assigned_users.all()],
+        "created_at": t.created_at.isoformat(),
+    }
+
+
+@api.get("/tickets/", response=TicketPage)
+@decorate_view(etag(TICKETS, CATALOG, USERS))
 def list_tickets(
-    request, status: Optional[str] = None, project_id: Optional[int] = None
+    request,
+    status: Optional[str] = None,
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
 ):
-    """List tickets with optional filters"""
-    tickets = Ticket.objects.select_related("project", "owner").prefetch_related(
-        "technologies", "assigned_users"
+    """
+    List tickets with optional filters, one keyset page at a time.
+
+    ``fields`` (comma-separated TicketOut fields) trims each item, and
+    ``expand`` (project, owner, technologies, assigned_users) returns those
+    relations as objects with ids instead of names.
+    """
+    tickets = Ticket.objects.all()
+
+    if status:
+        tickets = tickets.filter(status=status)
+    if project_id:
+        tickets = tickets.filter(project_id=project_id)
+
+    if fields or expand:
+        fields, expand = parse_fieldset(fields, expand)
+        page = sparse_ticket_page(tickets, fields, expand, cursor, limit)
+        return api.create_response(request, page, status=200)
+
+    if getattr(settings, "TICKET_LIST_FAST_PATH", False):
+        # Already shaped like TicketPage, so skip the response validation
+        return api.create_response(
+            request, ticket_page(tickets, cursor, limit), status=200
+        )
+
+    tickets = tickets.select_related("project", "owner").prefetch_related(
+        "assigned_users"
     )
 
+    page, next_cursor, prev_cursor = paginate_tickets(tickets, cursor, limit)
+
+    # Technology names come from the catalog, not a join per page
+    technologies, catalog = ticket_technologies([t.id for t in page])
+    items = [_ticket_out(t, catalog.names(technologies[t.id])) for t in page]
+    return {"items": items, "next": next_cursor, "prev": prev_cursor}
+
+
+@api.get("/tickets/export.csv", auth=django_auth)
+def export_tickets(
+    request, status: Optional[str] = None, project_id: Optional[int] = None
+):
+    """All matching tickets with technology details, streamed as CSV (staff)"""
+    # Same audience as the admin action it mirrors
+    if not request.user.is_staff:
+        raise HttpError(403, "Staff only")
+    tickets = Ticket.objects.all()
     if status:
         tickets = tickets.filter(status=status)
     if project_id:
         tickets = tickets.filter(project_id=project_id)
+    return stream_tickets_csv(tickets)
+
+
+@api.post("/tickets/bulk", response=BulkTicketOut, auth=django_auth)
+def bulk_create_tickets(request, items: List[TicketCreateSchema]):
+    """Create up to MAX_BATCH_SIZE tickets at once; invalid items are reported"""
+    if len(items) > MAX_BATCH_SIZE:
+        raise HttpError(400, f"At most {MAX_BATCH_SIZE} tickets per request")
+    results = create_tickets([item.dict() for item in items], user=request.user)
+    failed = sum(1 for result in results if result["errors"])
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
+@api.post("/tickets/transition", response=TicketTransitionOut, auth=django_auth)
+def transition(request, payload: TicketTransitionSchema):
+    """Change status/priority/owner and assignees of many tickets at once"""
+    if len(payload.ticket_ids) > MAX_BATCH_SIZE:
+        raise HttpError(400, f"At most {MAX_BATCH_SIZE} tickets per request")
+    try:
+        return transition_tickets(
+            Ticket.objects.filter(pk__in=payload.ticket_ids),
+            status=payload.status,
+            priority=payload.priority,
+            owner_id=(
+                payload.owner_id
+                if "owner_id" in payload.model_fields_set
+                else UNCHANGED
+            ),
+            assign=payload.assign,
+            unassign=payload.unassign,
+            user=request.user,
+        )
+    except ValidationError as e:
+        raise HttpError(400, " ".join(e.messages))
+
+
+@api.post("/tickets/{ticket_pk}/attachments", response=AttachmentOut, auth=django_auth)
+def upload_attachment(request, ticket_pk: int, file: UploadedFile = File(...)):
+    """Attach a file; identical content is stored once and shared"""
+    ticket = get_object_or_404(Ticket, pk=ticket_pk)
+    attachment = Attachment.objects.create(
+        ticket=ticket,
+        file=file,
+        original_name=file.name,
+        created_by=request.user,
+        modified_by=request.user,
+    )
+    return _attachment_out(attachment)
+
+
+@api.api_operation(
+    ["GET", "HEAD"],
+    "/attachments/{pk}/download",
+    auth=django_auth,
+    url_name="download_attachment",
+)
+def download_attachment(request, pk: int):
+    """Stream an attachment; supports Range/If-Range for resumable downloads"""
+    return serve_attachment(request, get_object_or_404(Attachment, pk=pk))
+
 
+@api.post("/jobs", response=JobOut, auth=django_auth)
+def create_job(request, payload: JobCreateSchema):
+    """Queue background work; poll GET /jobs/{id} for its status"""
+    try:
+        job = jobs.enqueue(
+            payload.kind, payload.payload, user=request.user, priority=payload.priority
+        )
+    except ValidationError as e:
+        raise HttpError(400, " ".join(e.messages))
+    return _job_out(job)
+
+
+@api.get("/jobs/{pk}", response=JobOut, auth=django_auth)
+def get_job(request, pk: int):
+    return _job_out(_own_job(request, pk))
+
+
+@api.get("/jobs/{pk}/result", auth=django_auth, url_name="job_result")
+def get_job_result(request, pk: int):
+    """Download the file a finished job produced"""
+    job = _own_job(request, pk)
+    if not job.result_file:
+        raise HttpError(404, "This job has no result file")
+    return FileResponse(
+        job.result_file.open("rb"),
+        as_attachment=True,
+        filename=job.result_file.name.rsplit("/", 1)[-1],
+    )
+
+
+@api.get("/tickets/search", response=List[TicketSearchOut])
+@decorate_view(etag(TICKETS, CATALOG, USERS))
+def search_tickets(request, q: str, limit: int = DEFAULT_PAGE_SIZE):
+    """Full-text search over tickets and their subtype details, best match first"""
+    ranked = search_ticket_ids(q, limit=max(1, min(limit, MAX_PAGE_SIZE)))
+    tickets = (
+        Ticket.objects.select_related("project", "owner")
+        .prefetch_related("assigned_users")
+        .in_bulk([pk for pk, _ in ranked])
+    )
+    technologies, catalog = ticket_technologies(list(tickets))
     return [
-        {
-            "id": t.id,
-            "ticket_id": t.ticket_id,
-            "title": t.title,
-            "status": t.status,
-            "priority": t.priority,
-            "ticket_type": t.ticket_type,
-            "project": t.project.name,
-            "technologies": [tech.name for tech in t.technologies.all()],
-            "reporter_name": t.reporter_name,
-            "owner": t.owner.username if t.owner else None,
-            "assigned_users": [user.username for user in t.assigned_users.all()],
-            "created_at": t.created_at.isoformat(),
-        }
-        for t in tickets
+        {**_ticket_out(tickets[pk], catalog.names(technologies[pk])), "rank": rank}
+        for pk, rank in ranked
+        if pk in tickets
     ]
 
 
 @api.get("/projects/", response=List[ProjectOut])
+@decorate_view(etag(TICKETS, CATALOG, USERS))
 def list_projects(request):
     """List all projects with ticket statistics"""
-    projects = Project.objects.prefetch_related("members").all()
+    projects = Project.objects.with_stats().prefetch_related("members")
     return [
         {
             "id": p.id,
@@ -105,23 +397,25 @@ def list_projects(request):
 
 
 @api.get("/technologies/", response=List[TechnologyOut])
+@decorate_view(etag(TICKETS, CATALOG))
 def list_technologies(request, category: Optional[str] = None):
     """List technologies with usage statistics"""
-    technologies = Technology.objects.select_related("category").annotate(
-        ticket_count=Count("tickets")
-    )
+    technologies = Technology.objects.annotate(ticket_count=Count("tickets"))
 
     if category:
         technologies = technologies.filter(category__name=category)
 
+    # Names, categories and ordering come from the catalog, not joins
+    counts = dict(technologies.order_by().values_list("id", "ticket_count"))
+    catalog = get_catalog(counts)
     return [
         {
-            "id": t.id,
-            "name": t.name,
-            "category": t.category.name,
-            "usage_count": t.ticket_count,
+            "id": pk,
+            "name": catalog.technologies[pk].name,
+            "category": catalog.technologies[pk].category,
+            "usage_count": counts[pk],
         }
-        for t in technologies
+        for pk in catalog.sort(counts)
     ]
 
 
@@ -129,6 +423,7 @@ def list_technologies(request, category: Optional[str] = None):
 
 
 @api.get("/reports/individual/{username}/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
 def get_individual_report(request, username: str):
     """Individual S.E. member report - THIS IS KEY"""
     try:
@@ -136,174 +431,56 @@ def get_individual_report(request, username: str):
     except User.DoesNotExist:
         return {"error": "User not found or not S.E. team member"}
 
-    tickets = (
-        Ticket.objects.filter(Q(owner=user) | Q(assigned_users=user))
-        .distinct()
-        .prefetch_related("technologies__category", "project")
-    )
-
-    # Technology analysis
-    tech_usage = {}
-    tech_categories = {}
-    project_work = {}
-
-    for ticket in tickets:
-        # Track project work
-        project_name = ticket.project.name
-        if project_name not in project_work:
-            project_work[project_name] = {"total": 0, "completed": 0}
-        project_work[project_name]["total"] += 1
-        if ticket.status == "completed":
-            project_work[project_name]["completed"] += 1
-
-        # Track technology usage
-        for tech in ticket.technologies.all():
-            tech_name = tech.name
-            category = tech.category.name
-
-            if tech_name not in tech_usage:
-                tech_usage[tech_name] = 0
-            tech_usage[tech_name] += 1
-
-            if category not in tech_categories:
-                tech_categories[category] = 0
-            tech_categories[category] += 1
-
-    return {
-        "user": user.get_full_name() or user.username,
-        "summary": {
-            "total_tickets": tickets.count(),
-            "completed": tickets.filter(status="completed").count(),
-            "in_progress": tickets.filter(status="in_progress").count(),
-            "completion_rate": round(
-                (tickets.filter(status="completed").count() / tickets.count() * 100), 1
-            )
-            if tickets.count() > 0
-            else 0,
-        },
-        "technology_expertise": {
-            "most_used_technologies": dict(
-                sorted(tech_usage.items(), key=lambda x: x[1], reverse=True)[:10]
-            ),
-            "technology_categories": tech_categories,
-            "total_technologies_used": len(tech_usage),
-        },
-        "project_contributions": project_work,
-        "recent_work": [
-            {
-                "ticket_id": t.ticket_id,
-                "title": t.title,
-                "project": t.project.name,
-                "status": t.status,
-                "technologies": [tech.name for tech in t.technologies.all()],
-            }
-            for t in tickets.order_by("-modified_at")[:10]
-        ],
-    }
+    return cached_report("individual", user.username, lambda: individual_report(user))
 
 
 @api.get("/reports/team-technology/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
 def get_team_technology_report(request):
     """Team-wide technology usage report"""
-
-    # Get all S.E. team members
-    se_users = User.objects.filter(is_se_team=True)
-
-    # Technology usage across team
-    tech_stats = (
-        Technology.objects.annotate(
-            ticket_count=Count("tickets"),
-            user_count=Count(
-                "tickets__assigned_users",
-                distinct=True,
-                filter=Q(tickets__assigned_users__is_se_team=True),
-            ),
-        )
-        .select_related("category")
-        .order_by("-ticket_count")
-    )
-
-    # Category usage
-    category_stats = TechnologyCategory.objects.annotate(
-        ticket_count=Count("technologies__tickets"),
-        user_count=Count(
-            "technologies__tickets__assigned_users",
-            distinct=True,
-            filter=Q(technologies__tickets__assigned_users__is_se_team=True),
-        ),
-    ).order_by("-ticket_count")
-
-    return {
-        "team_size": se_users.count(),
-        "technology_diversity": {
-            "total_technologies_used": tech_stats.filter(ticket_count__gt=0).count(),
-            "most_popular_technologies": [
-                {
-                    "name": tech.name,
-                    "category": tech.category.name,
-                    "tickets": tech.ticket_count,
-                    "team_members_using": tech.user_count,
-                }
-                for tech in tech_stats[:15]
-            ],
-            "category_breakdown": [
-                {
-                    "category": cat.name,
-                    "tickets": cat.ticket_count,
-                    "team_members_using": cat.user_count,
-                }
-                for cat in category_stats
-            ],
-        },
-    }
+    return cached_report("team-technology", "all", team_technology_report)
 
 
 @api.get("/reports/project/{project_id}/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
 def get_project_report(request, project_id: int):
     """Detailed project report with technology analysis"""
     project = get_object_or_404(Project, id=project_id)
-    tickets = project.tickets.prefetch_related(
-        "technologies__category", "owner", "assigned_users"
+    return cached_report("project", project.id, lambda: project_report(project))
+
+
+# Async report variants for ASGI servers: same payloads and cache entries, but
+# each report's independent aggregates run concurrently
+
+
+@api.get("/async/reports/individual/{username}/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
+async def aget_individual_report(request, username: str):
+    """Individual S.E. member report, pieces built concurrently"""
+    try:
+        user = await User.objects.aget(username=username, is_se_team=True)
+    except User.DoesNotExist:
+        return {"error": "User not found or not S.E. team member"}
+
+    return await acached_report(
+        "individual", user.username, lambda: aindividual_report(user)
     )
 
-    # Technology usage in this project
-    tech_usage = {}
-    contributors = set()
 
-    for ticket in tickets:
-        if ticket.owner:
-            contributors.add(ticket.owner.username)
-        for user in ticket.assigned_users.all():
-            contributors.add(user.username)
-        for tech in ticket.technologies.all():
-            if tech.name not in tech_usage:
-                tech_usage[tech.name] = 0
-            tech_usage[tech.name] += 1
+@api.get("/async/reports/team-technology/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
+async def aget_team_technology_report(request):
+    """Team-wide technology usage report, pieces built concurrently"""
+    return await acached_report("team-technology", "all", ateam_technology_report)
 
-    return {
-        "project": {
-            "name": project.name,
-            "description": project.description,
-            "completion_percentage": project.completion_percentage,
-        },
-        "progress": {
-            "total_tickets": project.total_tickets,
-            "completed": project.completed_tickets,
-            "in_progress": tickets.filter(status="in_progress").count(),
-            "staging": tickets.filter(status="staging").count(),
-        },
-        "technology_stack": dict(
-            sorted(tech_usage.items(), key=lambda x: x[1], reverse=True)
-        ),
-        "contributors": list(contributors),
-        "recent_activity": [
-            {
-                "ticket_id": t.ticket_id,
-                "title": t.title,
-                "status": t.status,
-                "owner": t.owner.username if t.owner else None,
-                "updated": t.modified_at.isoformat(),
-            }
-            for t in tickets.order_by("-modified_at")[:10]
-        ],
-    }
+
+@api.get("/async/reports/project/{project_id}/")
+@decorate_view(etag(TICKETS, CATALOG, USERS))
+async def aget_project_report(request, project_id: int):
+    """Detailed project report, pieces built concurrently"""
+    try:
+        # Annotated, so the header and progress counts need no extra queries
+        project = await Project.objects.with_stats().aget(id=project_id)
+    except Project.DoesNotExist:
+        raise HttpError(404, "Not Found")
+    return await acached_report("project", project.id, lambda: aproject_report(project))
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TicketsConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tickets'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "tickets"
+
+    def ready(self):
+        from ticket_system import db  # noqa: F401  (connection_created receiver)
+        from tickets import signals
+
+        post_migrate.connect(signals.create_search_index, sender=self)
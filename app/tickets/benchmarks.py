@@ -0,0 +1,521 @@
+"""
+Benchmark harness for the API endpoints and admin changelists.
+
+Each measurement records wall-clock latency over several runs, the number of
+SQL queries and the peak Python allocation of one request. Results are plain
+dicts so ``manage.py benchmark`` can write them out as JSON and runs can be
+compared. The suites expect to run against a throwaway database that
+tickets.synthetic has populated.
+"""
+
+import asyncio
+import csv
+import json
+import platform
+import random
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from tickets.exports import TICKET_CSV_HEADER, stream_tickets_csv
+from tickets.models import Project, Technology, Ticket
+from tickets.pagination import MAX_PAGE_SIZE, encode_cursor
+from tickets.renderers import orjson
+
+User = get_user_model()
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def measure(call, repeat=5, reset=clear_caches):
+    """
+    Time ``call`` ``repeat`` times. Queries and peak memory come from a
+    separate untimed run so tracemalloc overhead does not skew the latency.
+    """
+    reset()
+    # request_started resets the query log, so start counting from zero
+    reset_queries()
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as ctx:
+        outcome = call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Later requests reset the query log, so count the captured ones now
+    queries = len(ctx.captured_queries)
+
+    timings = []
+    for _ in range(repeat):
+        reset()
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "latency_ms": {
+            "median": round(statistics.median(timings), 3),
+            "min": round(min(timings), 3),
+            "max": round(max(timings), 3),
+        },
+        "queries": queries,
+        "peak_memory_kb": round(peak / 1024, 1),
+        "status": getattr(outcome, "status_code", None),
+    }
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def endpoint_targets():
+    """(name, url, params, needs_admin) for every API endpoint and key changelist"""
+    busiest_user = (
+        User.objects.filter(is_se_team=True)
+        .annotate(n=Count("owned_tickets"))
+        .order_by("-n")
+        .first()
+    )
+    biggest_project = (
+        Project.objects.with_stats().order_by("-total_tickets_count").first()
+    )
+    middle = Ticket.objects.order_by("-created_at", "-id")[Ticket.objects.count() // 2]
+    return [
+        ("tickets", "/api/tickets/", {}, False),
+        ("tickets_status", "/api/tickets/", {"status": "in_progress"}, False),
+        ("tickets_project", "/api/tickets/", {"project_id": biggest_project.id}, False),
+        (
+            "tickets_deep_page",
+            "/api/tickets/",
+            {"cursor": encode_cursor(middle, "next")},
+            False,
+        ),
+        ("tickets_search", "/api/tickets/search", {"q": "condition report"}, False),
+        ("projects", "/api/projects/", {}, False),
+        ("technologies", "/api/technologies/", {}, False),
+        (
+            "report_individual",
+            f"/api/reports/individual/{busiest_user.username}/",
+            {},
+            False,
+        ),
+        ("report_team_technology", "/api/reports/team-technology/", {}, False),
+        ("report_project", f"/api/reports/project/{biggest_project.id}/", {}, False),
+        ("admin_tickets", "/admin/tickets/ticket/", {}, True),
+        (
+            "admin_tickets_status",
+            "/admin/tickets/ticket/",
+            {"status__exact": "completed"},
+            True,
+        ),
+        ("admin_tickets_search", "/admin/tickets/ticket/", {"q": "condition"}, True),
+        ("admin_projects", "/admin/tickets/project/", {}, True),
+        ("admin_technologies", "/admin/tickets/technology/", {}, True),
+        ("admin_categories", "/admin/tickets/technologycategory/", {}, True),
+    ]
+
+
+def admin_user():
+    user, _ = User.objects.get_or_create(
+        username="benchmark-admin",
+        defaults={"is_staff": True, "is_superuser": True},
+    )
+    return user
+
+
+def admin_client():
+    client = Client()
+    client.force_login(admin_user())
+    return client
+
+
+def run_endpoint_suite(scale, repeat=5):
+    api_client, staff_client = Client(), admin_client()
+    results = []
+    for name, url, params, needs_admin in endpoint_targets():
+        client = staff_client if needs_admin else api_client
+        result = measure(lambda: client.get(url, params), repeat=repeat)
+        results.append(
+            {"suite": "endpoints", "scale": scale, "name": name, "url": url, **result}
+        )
+    return results
+
+
+def bulk_create_items(count):
+    projects = list(Project.objects.values_list("id", flat=True)[:10])
+    technologies = list(Technology.objects.values_list("id", flat=True)[:20])
+    return [
+        {
+            "title": f"Intake ticket {i}",
+            "description": "Pushed by the intake integration",
+            "ticket_type": "task",
+            "project_id": projects[i % len(projects)],
+            "technology_ids": [
+                technologies[i % len(technologies)],
+                technologies[(i + 7) % len(technologies)],
+            ],
+            "reporter_name": "Intake Bot",
+            "reporter_contact": "intake@example.com",
+            "priority": "medium",
+        }
+        for i in range(count)
+    ]
+
+
+def save_one_at_a_time(items):
+    for item in items:
+        fields = dict(item)
+        technology_ids = fields.pop("technology_ids")
+        ticket = Ticket.objects.create(**fields)
+        ticket.technologies.add(*technology_ids)
+
+
+def run_bulk_create_suite(scale, repeat=5, batch=200):
+    """POST /api/tickets/bulk against a Ticket.save() loop, in tickets/second"""
+    client = admin_client()
+    results = []
+    for name, call in (
+        (
+            "bulk_endpoint",
+            lambda: client.post(
+                "/api/tickets/bulk",
+                json.dumps(bulk_create_items(batch)),
+                content_type="application/json",
+            ),
+        ),
+        ("save_loop", lambda: save_one_at_a_time(bulk_create_items(batch))),
+    ):
+        result = measure(call, repeat=repeat)
+        result["tickets_per_second"] = round(
+            batch / (result["latency_ms"]["median"] / 1000)
+        )
+        results.append(
+            {
+                "suite": "bulk_create",
+                "scale": scale,
+                "name": name,
+                "batch": batch,
+                **result,
+            }
+        )
+    return results
+
+
+def report_targets():
+    busiest_user = (
+        User.objects.filter(is_se_team=True)
+        .annotate(n=Count("owned_tickets"))
+        .order_by("-n")
+        .first()
+    )
+    biggest_project = (
+        Project.objects.with_stats().order_by("-total_tickets_count").first()
+    )
+    return [
+        ("report_individual", f"/reports/individual/{busiest_user.username}/"),
+        ("report_team_technology", "/reports/team-technology/"),
+        ("report_project", f"/reports/project/{biggest_project.id}/"),
+    ]
+
+
+def wsgi_burst(path, concurrency):
+    """``concurrency`` simultaneous requests to the sync endpoint, one thread each
+    like a threaded gunicorn worker"""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: Client().get(f"/api{path}"), range(concurrency)))
+
+
+def asgi_burst(path, concurrency):
+    """The same burst against the async endpoint through Django's ASGI handler,
+    on one event loop as under uvicorn"""
+
+    async def burst():
+        client = AsyncClient()
+        await asyncio.gather(
+            *(client.get(f"/api/async{path}") for _ in range(concurrency))
+        )
+
+    asyncio.run(burst())
+
+
+def run_async_report_suite(scale, repeat=5, concurrency=8):
+    """Uncached report bursts: sync views on threads vs async views on a loop"""
+    results = []
+    for name, path in report_targets():
+        for server, burst in (("wsgi", wsgi_burst), ("asgi", asgi_burst)):
+            timings = []
+            for _ in range(repeat):
+                clear_caches()
+                started = time.perf_counter()
+                burst(path, concurrency)
+                timings.append((time.perf_counter() - started) * 1000)
+            median = statistics.median(timings)
+            results.append(
+                {
+                    "suite": "async_reports",
+                    "scale": scale,
+                    "name": f"{name}_{server}",
+                    "url": f"/api/async{path}" if server == "asgi" else f"/api{path}",
+                    "concurrency": concurrency,
+                    "burst_ms": {
+                        "median": round(median, 3),
+                        "min": round(min(timings), 3),
+                        "max": round(max(timings), 3),
+                    },
+                    "requests_per_second": round(concurrency / (median / 1000), 1),
+                }
+            )
+    return results
+
+
+def run_serialization_suite(scale, repeat=5):
+    """Full ticket pages in rows/second, validated path vs values() fast path"""
+    client = Client()
+    results = []
+    for name, fast in (("validated", False), ("fast_path", True)):
+        with override_settings(TICKET_LIST_FAST_PATH=fast):
+            result = measure(
+                lambda: client.get("/api/tickets/", {"limit": MAX_PAGE_SIZE}),
+                repeat=repeat,
+            )
+        result["rows_per_second"] = round(
+            MAX_PAGE_SIZE / (result["latency_ms"]["median"] / 1000)
+        )
+        results.append(
+            {
+                "suite": "serialization",
+                "scale": scale,
+                "name": name,
+                "url": "/api/tickets/",
+                "orjson": orjson is not None,
+                **result,
+            }
+        )
+    return results
+
+
+def _buffered_export(queryset):
+    """The export as it was before streaming: whole CSV in memory, N+1 joins"""
+    response = HttpResponse(content_type="text/csv")
+    writer = csv.writer(response)
+    writer.writerow(TICKET_CSV_HEADER)
+    for ticket in queryset.prefetch_related("technologies__category", "assigned_users"):
+        writer.writerow(
+            [
+                ticket.ticket_id,
+                ticket.title,
+                ticket.project.name,
+                ticket.status,
+                ticket.priority,
+                ticket.owner.username if ticket.owner else "",
+                ", ".join([user.username for user in ticket.assigned_users.all()]),
+                ", ".join([tech.name for tech in ticket.technologies.all()]),
+                ", ".join(
+                    list(
+                        set([tech.category.name for tech in ticket.technologies.all()])
+                    )
+                ),
+            ]
+        )
+    return response
+
+
+def run_export_suite(scale, repeat=3):
+    """Full-table CSV export: buffered N+1 export vs the streaming one"""
+    tickets = Ticket.objects.all()
+    results = []
+    for name, export in (
+        ("buffered", lambda: _buffered_export(tickets).content),
+        ("streaming", lambda: b"".join(stream_tickets_csv(tickets).streaming_content)),
+    ):
+        result = measure(export, repeat=repeat)
+        result["rows_per_second"] = round(
+            scale / (result["latency_ms"]["median"] / 1000)
+        )
+        results.append({"suite": "export", "scale": scale, "name": name, **result})
+    return results
+
+
+# SQLite's own defaults, to compare against the SQLITE_PRAGMAS profile
+SQLITE_DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def _mixed_operations(ticket_ids, project_ids):
+    def list_page(client, rng):
+        return client.get(
+            "/api/tickets/", {"status": rng.choice(["staging", "completed"])}
+        )
+
+    def search(client, rng):
+        return client.get("/api/tickets/search", {"q": "condition"})
+
+    def project_report(client, rng):
+        return client.get(f"/api/reports/project/{rng.choice(project_ids)}/")
+
+    def transition(client, rng):
+        return client.post(
+            "/api/tickets/transition",
+            json.dumps(
+                {
+                    "ticket_ids": rng.sample(ticket_ids, 5),
+                    "status": rng.choice(["accepted", "in_progress", "completed"]),
+                }
+            ),
+            content_type="application/json",
+        )
+
+    def create(client, rng):
+        return client.post(
+            "/api/tickets/bulk",
+            json.dumps(bulk_create_items(5)),
+            content_type="application/json",
+        )
+
+    return [list_page, search, project_report], [transition, create]
+
+
+def mixed_load(threads=8, duration=5.0, write_ratio=0.2, seed=1):
+    """
+    Run a time-boxed mix of API reads and writes from ``threads`` threads,
+    each with its own logged-in client and database connection like a
+    threaded gunicorn worker. Returns throughput, latency percentiles and
+    errors; any non-2xx response counts as an error.
+    """
+    user = admin_user()
+    ticket_ids = list(Ticket.objects.values_list("id", flat=True)[:5000])
+    project_ids = list(Project.objects.values_list("id", flat=True))
+    reads, writes = _mixed_operations(ticket_ids, project_ids)
+    connection.close()
+
+    lock = threading.Lock()
+    latencies = {"read": [], "write": []}
+    errors = Counter()
+    deadline = time.perf_counter() + duration
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        local = {"read": [], "write": []}
+        local_errors = Counter()
+        try:
+            while time.perf_counter() < deadline:
+                kind = "write" if rng.random() < write_ratio else "read"
+                operation = rng.choice(writes if kind == "write" else reads)
+                started = time.perf_counter()
+                try:
+                    response = operation(client, rng)
+                    failed = not 200 <= response.status_code < 300
+                except Exception as e:  # keep hammering, but count it
+                    local_errors[type(e).__name__] += 1
+                    continue
+                if failed:
+                    local_errors[f"HTTP {response.status_code}"] += 1
+                    continue
+                local[kind].append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+        with lock:
+            for kind, values in local.items():
+                latencies[kind].extend(values)
+            errors.update(local_errors)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - started
+
+    def percentiles(values):
+        if not values:
+            return None
+        values = sorted(values)
+        return {
+            "p50": round(values[len(values) // 2], 3),
+            "p95": round(values[int(len(values) * 0.95)], 3),
+            "max": round(values[-1], 3),
+        }
+
+    completed = len(latencies["read"]) + len(latencies["write"])
+    return {
+        "threads": threads,
+        "duration_s": round(elapsed, 2),
+        "write_ratio": write_ratio,
+        "requests": completed,
+        "requests_per_second": round(completed / elapsed, 1),
+        "reads": len(latencies["read"]),
+        "writes": len(latencies["write"]),
+        "read_latency_ms": percentiles(latencies["read"]),
+        "write_latency_ms": percentiles(latencies["write"]),
+        "errors": dict(errors),
+    }
+
+
+def run_mixed_load_suite(scale, repeat=5, threads=8, duration=5.0, write_ratio=0.2):
+    """
+    Mixed read/write throughput for the active DB profile. On SQLite the
+    tuned profile (SQLITE_PRAGMAS, BEGIN IMMEDIATE) is compared with SQLite
+    and Django defaults; ``repeat`` is unused because runs are time-boxed.
+    """
+    options = connection.settings_dict["OPTIONS"]
+    tuned = (getattr(settings, "SQLITE_PRAGMAS", {}), dict(options))
+    profiles = [(connection.vendor, tuned)]
+    if connection.vendor == "sqlite":
+        default_options = {k: v for k, v in options.items() if k != "transaction_mode"}
+        profiles = [
+            ("sqlite_default", (SQLITE_DEFAULT_PRAGMAS, default_options)),
+            ("sqlite_tuned", tuned),
+        ]
+    results = []
+    try:
+        for name, (pragmas, profile_options) in profiles:
+            # Every thread's connection is built from this shared dict
+            options.clear()
+            options.update(profile_options)
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                # Reconnect so the pragmas (and the journal mode) take effect
+                connection.close()
+                result = mixed_load(threads, duration, write_ratio)
+            connection.close()
+            results.append(
+                {
+                    "suite": "mixed_load",
+                    "scale": scale,
+                    "name": name,
+                    "database": connection.vendor,
+                    "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+                    **result,
+                }
+            )
+    finally:
+        options.clear()
+        options.update(tuned[1])
+    return results
+
+
+SUITES = {
+    "endpoints": run_endpoint_suite,
+    "bulk_create": run_bulk_create_suite,
+    "async_reports": run_async_report_suite,
+    "serialization": run_serialization_suite,
+    "mixed_load": run_mixed_load_suite,
+    "export": run_export_suite,
+}
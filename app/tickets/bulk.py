@@ -0,0 +1,261 @@
+"""
+Set-based ticket writes for intake integrations.
+
+bulk_create and queryset updates fire no model signals, so everything the
+receivers in tickets.signals would have done (usage rollups, the search
+index, the report cache and the ETag counters) is done here explicitly,
+once per batch.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from tickets import rollups, search
+from tickets.conditional import TICKETS
+from tickets.models import DataVersion, Project, Technology, Ticket
+from tickets.report_cache import invalidate_reports
+from tickets.signals import invalidate_ticket_reports
+
+User = get_user_model()
+
+MAX_BATCH_SIZE = 1000
+
+TICKET_TYPES = {choice for choice, _ in Ticket.TICKET_TYPE_CHOICES}
+PRIORITIES = {choice for choice, _ in Ticket.PRIORITY_CHOICES}
+STATUSES = {choice for choice, _ in Ticket.STATUS_CHOICES}
+
+# Distinguishes "leave the owner alone" from "clear the owner"
+UNCHANGED = object()
+
+
+def length_error(field, value):
+    """The max_length error for ``value`` in model field ``field``, or None"""
+    if field.max_length is not None and len(value) > field.max_length:
+        return (
+            f"{field.name}: Ensure this value has at most {field.max_length} "
+            f"characters (it has {len(value)})."
+        )
+    return None
+
+
+def validate_ticket_items(items):
+    """Return a list with the errors for each item, all checked up front"""
+    project_ids = set(
+        Project.objects.filter(
+            id__in={item["project_id"] for item in items}
+        ).values_list("id", flat=True)
+    )
+    technology_ids = set(
+        Technology.objects.filter(
+            id__in={pk for item in items for pk in item["technology_ids"]}
+        ).values_list("id", flat=True)
+    )
+
+    errors = []
+    for item in items:
+        problems = []
+        for field in ("title", "description", "reporter_name", "reporter_contact"):
+            if not item[field].strip():
+                problems.append(f"{field}: This field cannot be blank.")
+            # Checked here so one long value cannot fail the whole batch's
+            # INSERT on databases that enforce VARCHAR lengths
+            error = length_error(Ticket._meta.get_field(field), item[field])
+            if error:
+                problems.append(error)
+        if item["ticket_type"] not in TICKET_TYPES:
+            problems.append(
+                f"ticket_type: '{item['ticket_type']}' is not a valid choice."
+            )
+        if item["priority"] not in PRIORITIES:
+            problems.append(f"priority: '{item['priority']}' is not a valid choice.")
+        if item["project_id"] not in project_ids:
+            problems.append(f"project_id: Project {item['project_id']} does not exist.")
+        missing = sorted(set(item["technology_ids"]) - technology_ids)
+        if missing:
+            problems.append(
+                "technology_ids: Unknown technologies "
+                + ", ".join(str(pk) for pk in missing)
+            )
+        errors.append(problems)
+    return errors
+
+
+def create_tickets(items, user=None):
+    """
+    Validate and insert ticket dicts (TicketCreateSchema fields) in one
+    transaction: one block of ticket IDs, one INSERT per batch of tickets and
+    one for their technology links. Invalid items are skipped and reported.
+    Returns a result dict per item, in input order.
+    """
+    errors = validate_ticket_items(items)
+    valid = [(i, item) for i, item in enumerate(items) if not errors[i]]
+    results = [
+        {"index": i, "id": None, "ticket_id": None, "errors": problems}
+        for i, problems in enumerate(errors)
+    ]
+    if not valid:
+        return results
+
+    with transaction.atomic():
+        tickets = [
+            Ticket(
+                ticket_id=ticket_id,
+                title=item["title"],
+                description=item["description"],
+                ticket_type=item["ticket_type"],
+                project_id=item["project_id"],
+                priority=item["priority"],
+                reporter=user,
+                reporter_name=item["reporter_name"],
+                reporter_contact=item["reporter_contact"],
+                created_by=user,
+                modified_by=user,
+            )
+            for ticket_id, (_, item) in zip(
+                Ticket.allocate_ticket_ids(len(valid)), valid
+            )
+        ]
+        Ticket.objects.bulk_create(tickets, batch_size=500)
+
+        links = [
+            (ticket.id, technology_id)
+            for ticket, (_, item) in zip(tickets, valid)
+            for technology_id in dict.fromkeys(item["technology_ids"])
+        ]
+        Ticket.technologies.through.objects.bulk_create(
+            [
+                Ticket.technologies.through(ticket_id=t, technology_id=tech)
+                for t, tech in links
+            ],
+            batch_size=500,
+        )
+
+        rollups.record_links(links, 1)
+        search.index_tickets([ticket.id for ticket in tickets])
+        # New tickets have no owner or assignees yet, so only project and
+        # team reports can change
+        invalidate_reports(project_ids={ticket.project_id for ticket in tickets})
+        DataVersion.bump(TICKETS)
+
+    for ticket, (i, _) in zip(tickets, valid):
+        results[i].update(id=ticket.id, ticket_id=ticket.ticket_id)
+    return results
+
+
+def transition_tickets(
+    tickets,
+    status=None,
+    priority=None,
+    owner_id=UNCHANGED,
+    assign=(),
+    unassign=(),
+    user=None,
+):
+    """
+    Move the ``tickets`` queryset to a new status/priority/owner and add or
+    remove assignees with a fixed number of queries per MAX_BATCH_SIZE
+    tickets selected. Only rows that actually change are updated and stamped
+    with modified_at/modified_by. Raises ValidationError for unknown choices
+    or users. Returns {"updated", "assigned", "unassigned"} row counts.
+    """
+    assign, unassign = set(assign), set(unassign)
+    problems = []
+    if status is not None and status not in STATUSES:
+        problems.append(f"status: '{status}' is not a valid choice.")
+    if priority is not None and priority not in PRIORITIES:
+        problems.append(f"priority: '{priority}' is not a valid choice.")
+    wanted_users = assign | unassign
+    if owner_id not in (UNCHANGED, None):
+        wanted_users.add(owner_id)
+    missing = wanted_users - set(
+        User.objects.filter(id__in=wanted_users).values_list("id", flat=True)
+    )
+    if missing:
+        problems.append("Unknown users " + ", ".join(str(pk) for pk in sorted(missing)))
+    if assign & unassign:
+        problems.append("Users cannot be both assigned and unassigned.")
+    if problems:
+        raise ValidationError(problems)
+
+    changes = {}
+    differs = Q()
+    if status is not None:
+        changes["status"] = status
+        differs |= ~Q(status=status)
+    if priority is not None:
+        changes["priority"] = priority
+        differs |= ~Q(priority=priority)
+    if owner_id is not UNCHANGED:
+        changes["owner_id"] = owner_id
+        differs |= ~Q(owner_id=owner_id) if owner_id else Q(owner__isnull=False)
+
+    stamp = {"modified_at": timezone.now(), "modified_by": user}
+    totals = {"updated": 0, "assigned": 0, "unassigned": 0}
+    with transaction.atomic():
+        ids = list(tickets.order_by().values_list("pk", flat=True))
+        # Chunks keep the IN lists under SQLite's bound-parameter limit; a
+        # triage-sized selection is a single chunk
+        for offset in range(0, len(ids), MAX_BATCH_SIZE):
+            counts = _transition_chunk(
+                ids[offset : offset + MAX_BATCH_SIZE],
+                changes,
+                differs,
+                assign,
+                unassign,
+                stamp,
+            )
+            for key, n in counts.items():
+                totals[key] += n
+        if totals["updated"]:
+            DataVersion.bump(TICKETS)
+    return totals
+
+
+def _transition_chunk(ids, changes, differs, assign, unassign, stamp):
+    TicketAssignee = Ticket.assigned_users.through
+    rows = Ticket.objects.filter(pk__in=ids)
+    touched, old_owner_ids = set(), set()
+    if changes:
+        for pk, owner_id in rows.filter(differs).values_list("pk", "owner_id"):
+            touched.add(pk)
+            old_owner_ids.add(owner_id)
+        Ticket.objects.filter(pk__in=touched).update(**changes, **stamp)
+
+    added, removed = [], []
+    if assign or unassign:
+        existing = set(
+            TicketAssignee.objects.filter(
+                ticket_id__in=ids, user_id__in=assign | unassign
+            ).values_list("ticket_id", "user_id")
+        )
+        added = [
+            (ticket_id, user_id)
+            for ticket_id in ids
+            for user_id in assign
+            if (ticket_id, user_id) not in existing
+        ]
+        removed = [pair for pair in existing if pair[1] in unassign]
+        TicketAssignee.objects.bulk_create(
+            [TicketAssignee(ticket_id=t, user_id=u) for t, u in added],
+            batch_size=500,
+        )
+        if removed:
+            TicketAssignee.objects.filter(
+                ticket_id__in={t for t, _ in removed}, user_id__in=unassign
+            ).delete()
+        rollups.record_assignments(added, 1)
+        rollups.record_assignments(removed, -1)
+
+        relinked = {t for t, _ in added} | {t for t, _ in removed}
+        if relinked - touched:
+            Ticket.objects.filter(pk__in=relinked - touched).update(**stamp)
+        touched |= relinked
+
+    if touched:
+        # Previous owners and removed assignees are no longer linked, so
+        # name them explicitly
+        invalidate_ticket_reports(touched, user_ids=old_owner_ids | unassign)
+    return {"updated": len(touched), "assigned": len(added), "unassigned": len(removed)}
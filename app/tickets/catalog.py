@@ -0,0 +1,163 @@
+"""
+Process-local copy of the technology catalog.
+
+Technologies and their categories change rarely but are named on almost
+every page, so each process keeps them in memory as plain tuples instead of
+joining through tickets_technology and tickets_technologycategory. The
+copy is stamped with the CATALOG DataVersion counter that tickets.signals
+bumps on every change. A process compares that counter once per request or
+job, on first use, and reloads (two queries) only when it moved. Endpoints
+behind the ETag decorator have already read the counter, so for them the
+comparison is free. Changes made in this process drop the copy straight
+away.
+"""
+
+import threading
+from collections import namedtuple
+
+from tickets.conditional import CATALOG
+from tickets.models import DataVersion, Technology, TechnologyCategory, Ticket
+
+TechnologyEntry = namedtuple(
+    "TechnologyEntry", "name category category_id color is_active"
+)
+CategoryEntry = namedtuple("CategoryEntry", "name color")
+
+
+class Catalog:
+    def __init__(self, version, technologies, categories):
+        self.version = version
+        self.technologies = technologies
+        self.categories = categories
+        # Technology.Meta.ordering: category name, then name
+        self.position = {
+            pk: position
+            for position, pk in enumerate(
+                sorted(
+                    technologies,
+                    key=lambda pk: (technologies[pk].category, technologies[pk].name),
+                )
+            )
+        }
+
+    def sort(self, technology_ids):
+        """``technology_ids`` in Technology.Meta.ordering"""
+        return sorted(technology_ids, key=self.position.__getitem__)
+
+    def names(self, technology_ids):
+        return [self.technologies[pk].name for pk in self.sort(technology_ids)]
+
+    def describe(self, technology_ids):
+        """{"id", "name", "category"} dicts, as ?expand=technologies shows them"""
+        return [
+            {
+                "id": pk,
+                "name": self.technologies[pk].name,
+                "category": self.technologies[pk].category,
+            }
+            for pk in self.sort(technology_ids)
+        ]
+
+
+_lock = threading.Lock()
+_catalog = None
+# Whether the version has been compared since the current request or job
+# started; see expire() and note_version()
+_checked = False
+
+
+def _load(version):
+    categories = {
+        pk: CategoryEntry(name, color)
+        for pk, name, color in TechnologyCategory.objects.values_list(
+            "id", "name", "color"
+        )
+    }
+    technologies = {
+        row[0]: TechnologyEntry(*row[1:])
+        for row in Technology.objects.values_list(
+            "id",
+            "name",
+            "category__name",
+            "category_id",
+            "category__color",
+            "is_active",
+        )
+    }
+    return Catalog(version, technologies, categories)
+
+
+def _covers(catalog, technology_ids, category_ids):
+    return all(pk in catalog.technologies for pk in technology_ids) and all(
+        pk in catalog.categories for pk in category_ids
+    )
+
+
+def get_catalog(technology_ids=(), category_ids=()):
+    """
+    The current catalog. Pass the ids about to be looked up so that ones
+    created since the last check (possibly by another process) force a
+    reload instead of a KeyError.
+    """
+    global _catalog, _checked
+    catalog = _catalog
+    if (
+        catalog is not None
+        and _checked
+        and _covers(catalog, technology_ids, category_ids)
+    ):
+        return catalog
+    with _lock:
+        catalog = _catalog
+        # Another thread may have checked (or reloaded) while this one waited
+        if (
+            catalog is not None
+            and _checked
+            and _covers(catalog, technology_ids, category_ids)
+        ):
+            return catalog
+        version = DataVersion.current(CATALOG)[0]
+        if (
+            catalog is None
+            or version != catalog.version
+            or not _covers(catalog, technology_ids, category_ids)
+        ):
+            catalog = _load(version)
+        _catalog, _checked = catalog, True
+    return catalog
+
+
+def expire():
+    """Compare the version again on the next lookup (at each request and job)"""
+    global _checked
+    _checked = False
+
+
+def note_version(version):
+    """Record a CATALOG version read elsewhere, e.g. for an ETag"""
+    global _catalog, _checked
+    if _catalog is not None and _catalog.version != version:
+        _catalog = None
+    _checked = True
+
+
+def invalidate():
+    global _catalog
+    _catalog = None
+
+
+def ticket_technologies(ticket_ids):
+    """
+    ({ticket pk: [technology ids in Technology.Meta.ordering]}, catalog),
+    read from the link table alone
+    """
+    links = list(
+        Ticket.technologies.through.objects.filter(
+            ticket_id__in=ticket_ids
+        ).values_list("ticket_id", "technology_id")
+    )
+    catalog = get_catalog({technology_id for _, technology_id in links})
+    technologies = {pk: [] for pk in ticket_ids}
+    for ticket_id, technology_id in links:
+        technologies[ticket_id].append(technology_id)
+    return {pk: catalog.sort(ids) for pk, ids in technologies.items()}, catalog
@@ -0,0 +1,159 @@
+"""
+Attachment downloads with HTTP range support.
+
+Files are never read into worker memory. A full download is a FileResponse
+over the open file, which gunicorn and other servers providing
+wsgi.file_wrapper send with sendfile(2). A single byte range is the same
+file positioned at the range start and capped at its length, so it can still
+be sent with sendfile. With ATTACHMENT_DOWNLOAD_OFFLOAD set, the response
+only carries an X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd)
+header and the front-end server sends the file and handles Range itself.
+"""
+
+import mimetypes
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import (
+    content_disposition_header,
+    http_date,
+    parse_etags,
+    parse_http_date_safe,
+)
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class Unsatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range ``Range`` header, None when the
+    whole file should be sent. Raises Unsatisfiable for ranges past the end.
+    Multi-range requests get the whole file, which RFC 9110 allows.
+    """
+    match = RANGE_RE.match((header or "").replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise Unsatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise Unsatisfiable
+    return start, end
+
+
+def _if_range_matches(header, etag, last_modified):
+    """Whether the validator in If-Range still describes the stored file"""
+    if not header:
+        return True
+    if header.startswith('"') or header.startswith("W/"):
+        # If-Range uses the strong comparison, so weak tags never match
+        return not header.startswith("W/") and header in parse_etags(etag)
+    return parse_http_date_safe(header) == last_modified
+
+
+class RangeFile:
+    """
+    A file positioned at ``start`` that reads at most ``length`` bytes.
+
+    fileno() is passed through so sendfile-capable servers can send the
+    range straight from the page cache; they start at the current offset
+    and stop at Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _validators(attachment, storage):
+    mtime = int(storage.get_modified_time(attachment.file.name).timestamp())
+    if attachment.blob_id:
+        # Content addressed, so the digest is a strong validator
+        return f'"{attachment.blob_id}"', mtime
+    return f'"{mtime}-{attachment.file.size}"', mtime
+
+
+def _offload(attachment, storage, mode):
+    content_type, _ = mimetypes.guess_type(attachment.original_name)
+    response = HttpResponse(content_type=content_type or "application/octet-stream")
+    response["Content-Disposition"] = content_disposition_header(
+        True, attachment.original_name
+    )
+    if mode == "x-accel-redirect":
+        response["X-Accel-Redirect"] = (
+            settings.ATTACHMENT_ACCEL_REDIRECT_PREFIX + attachment.file.name
+        )
+    else:
+        response["X-Sendfile"] = storage.path(attachment.file.name)
+    return response
+
+
+def serve_attachment(request, attachment):
+    """Response for GET/HEAD of an attachment, honouring Range and If-Range"""
+    storage = attachment.file.storage
+    etag, mtime = _validators(attachment, storage)
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is not None:
+        return response
+
+    mode = settings.ATTACHMENT_DOWNLOAD_OFFLOAD
+    if mode:
+        response = _offload(attachment, storage, mode)
+    else:
+        size = attachment.file.size
+        byte_range = None
+        if _if_range_matches(request.headers.get("If-Range"), etag, mtime):
+            try:
+                byte_range = parse_range(request.headers.get("Range"), size)
+            except Unsatisfiable:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+
+        file = storage.open(attachment.file.name, "rb")
+        if byte_range is not None:
+            start, end = byte_range
+            file = RangeFile(file, start, end - start + 1)
+        # The original name sets Content-Type and Content-Disposition
+        response = FileResponse(
+            file, as_attachment=True, filename=attachment.original_name
+        )
+        if byte_range is not None:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(mtime)
+    return response
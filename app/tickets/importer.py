@@ -0,0 +1,387 @@
+"""
+Bulk ticket import from CSV or NDJSON, used by the import_tickets command.
+
+Rows are read as a stream and inserted in batches. Each batch runs in one
+transaction and saves its ImportCheckpoint in that same transaction, so
+every row is imported exactly once however often the run is interrupted
+and resumed.
+
+Project, technology and user names resolve through dicts loaded once per
+run rather than a query per row. Each batch inserts its tickets, subtype
+rows, technology links and assignments with one bulk_create each. As in
+tickets.bulk, no model signals fire, so the usage rollups, the search
+index, the report cache and the ETag counters are updated explicitly.
+
+Row fields (CSV columns or NDJSON keys):
+
+- ticket fields: title, description, ticket_type, project, priority,
+  status, reporter_name, reporter_contact, reporter_department,
+  business_impact and owner.
+- technologies and assignees: lists of names. CSV cells hold them
+  comma-separated.
+- ticket_id and created_at: optional, for keeping legacy values.
+- subtype fields: the BugReport, FeatureRequest or Task fields matching
+  ticket_type.
+"""
+
+import csv
+import json
+import re
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tickets import rollups, search
+from tickets.bulk import length_error
+from tickets.conditional import TICKETS
+from tickets.models import (
+    BugReport,
+    DataVersion,
+    FeatureRequest,
+    ImportCheckpoint,
+    Project,
+    Task,
+    Technology,
+    Ticket,
+    TicketSequence,
+)
+from tickets.report_cache import invalidate_all_reports
+
+User = get_user_model()
+
+FORMATS = ("csv", "ndjson")
+
+TICKET_FIELDS = [
+    "title",
+    "description",
+    "ticket_type",
+    "priority",
+    "status",
+    "reporter_name",
+    "reporter_contact",
+    "reporter_department",
+    "business_impact",
+]
+REQUIRED = ["title", "ticket_type", "reporter_name", "reporter_contact"]
+DEFAULTS = {"priority": "medium", "status": "staging"}
+
+SUBTYPES = {
+    "bug": BugReport,
+    "feature": FeatureRequest,
+    "task": Task,
+}
+
+CHOICES = {
+    "ticket_type": {value for value, _ in Ticket.TICKET_TYPE_CHOICES},
+    "priority": {value for value, _ in Ticket.PRIORITY_CHOICES},
+    "status": {value for value, _ in Ticket.STATUS_CHOICES},
+}
+
+TICKET_ID_RE = re.compile(r"^SE-(\d{4})-(\d+)$")
+
+
+class UnreadableRow:
+    """Stands in for an NDJSON line that is not valid JSON"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def read_rows(path, fmt):
+    """
+    Yield the rows of a CSV or NDJSON file as dicts, one at a time. Lines
+    that do not parse are yielded as UnreadableRow so they are skipped and
+    reported like any other bad row instead of stopping every resume.
+    """
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield UnreadableRow(f"Not valid JSON: {e}.")
+
+
+def _text(row, name):
+    """A row value as stripped text; NDJSON values need not be strings"""
+    value = row.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def _names(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, list):
+        value = [value]
+    names = (str(name).strip() for name in value if name is not None)
+    return [name for name in names if name]
+
+
+def _subtype_fields(model):
+    """(name, allowed values or None) for the row-supplied fields of ``model``"""
+    return [
+        (field.name, {value for value, _ in field.choices} if field.choices else None)
+        for field in model._meta.concrete_fields
+        if field.editable
+        and not field.is_relation
+        and field.name not in ("created_at", "modified_at")
+    ]
+
+
+SUBTYPE_FIELDS = {kind: _subtype_fields(model) for kind, model in SUBTYPES.items()}
+
+
+class Lookups:
+    """Name -> id maps for the whole run, loaded with one query each"""
+
+    def __init__(self):
+        self.projects = dict(Project.objects.values_list("name", "id"))
+        self.technologies = dict(Technology.objects.values_list("name", "id"))
+        self.users = dict(User.objects.values_list("username", "id"))
+
+
+def prepare(row, lookups):
+    """Return (ticket fields, subtype fields, technology ids, user ids, errors)"""
+    if isinstance(row, UnreadableRow):
+        return {}, {}, [], [], [row.error]
+    if not isinstance(row, dict):
+        return {}, {}, [], [], ["Row is not an object."]
+    problems = []
+    fields = {}
+    for name in TICKET_FIELDS:
+        value = _text(row, name) or DEFAULTS.get(name, "")
+        if name in CHOICES and value not in CHOICES[name]:
+            problems.append(f"{name}: '{value}' is not a valid choice.")
+        problems.append(length_error(Ticket._meta.get_field(name), value))
+        fields[name] = value
+    for name in REQUIRED:
+        if not fields[name]:
+            problems.append(f"{name}: This field cannot be blank.")
+
+    project = _text(row, "project")
+    fields["project_id"] = lookups.projects.get(project)
+    if fields["project_id"] is None:
+        problems.append(f"project: Unknown project '{project}'.")
+
+    owner = _text(row, "owner")
+    fields["owner_id"] = lookups.users.get(owner) if owner else None
+    if owner and fields["owner_id"] is None:
+        problems.append(f"owner: Unknown user '{owner}'.")
+
+    ticket_id = _text(row, "ticket_id")
+    if ticket_id:
+        problems.append(length_error(Ticket._meta.get_field("ticket_id"), ticket_id))
+        fields["ticket_id"] = ticket_id
+    created_at = _text(row, "created_at")
+    if created_at:
+        try:
+            created_at = parse_datetime(created_at)
+        except ValueError:  # well-formed but out of range
+            created_at = None
+        if created_at is None:
+            problems.append("created_at: Not an ISO 8601 timestamp.")
+        elif timezone.is_naive(created_at):
+            created_at = timezone.make_aware(created_at)
+        fields["created_at"] = created_at
+
+    technology_names = _names(row.get("technologies"))
+    technology_ids = [lookups.technologies.get(name) for name in technology_names]
+    user_names = _names(row.get("assignees"))
+    user_ids = [lookups.users.get(name) for name in user_names]
+    for kind, names, ids in (
+        ("technologies", technology_names, technology_ids),
+        ("assignees", user_names, user_ids),
+    ):
+        missing = [name for name, pk in zip(names, ids) if pk is None]
+        if missing:
+            problems.append(f"{kind}: Unknown {', '.join(missing)}.")
+
+    subtype = {}
+    model = SUBTYPES.get(fields["ticket_type"])
+    for name, allowed in SUBTYPE_FIELDS.get(fields["ticket_type"], ()):
+        value = _text(row, name)
+        if allowed is not None and value not in allowed:
+            problems.append(f"{name}: '{value}' is not a valid choice.")
+        problems.append(length_error(model._meta.get_field(name), value))
+        subtype[name] = value
+
+    return (
+        fields,
+        subtype,
+        list(dict.fromkeys(technology_ids)),
+        list(dict.fromkeys(user_ids)),
+        # Over-long values would fail the batch's INSERT on databases that
+        # enforce VARCHAR lengths, and every resume after it
+        [problem for problem in problems if problem],
+    )
+
+
+def import_batch(rows, lookups, user=None):
+    """
+    Insert a batch of (row number, row dict) pairs. Must run inside a
+    transaction. Returns (tickets imported, [(row number, errors)]).
+    """
+    prepared, errors = [], []
+    for number, row in rows:
+        item = prepare(row, lookups)
+        if item[-1]:
+            errors.append((number, item[-1]))
+        else:
+            prepared.append((number, item))
+
+    # Legacy IDs that already exist (or repeat within the batch) are errors
+    wanted = [item[0]["ticket_id"] for _, item in prepared if "ticket_id" in item[0]]
+    taken = set(
+        Ticket.objects.filter(ticket_id__in=wanted).values_list("ticket_id", flat=True)
+    )
+    valid = []
+    for number, item in prepared:
+        ticket_id = item[0].get("ticket_id")
+        if ticket_id in taken:
+            errors.append((number, [f"ticket_id: {ticket_id} already exists."]))
+            continue
+        if ticket_id:
+            taken.add(ticket_id)
+        valid.append(item)
+    if not valid:
+        return 0, errors
+
+    # Move the counters past this batch's legacy IDs before allocating, so
+    # generated IDs cannot collide with them
+    _advance_sequences(taken)
+    unnumbered = sum(1 for item in valid if "ticket_id" not in item[0])
+    generated = []
+    while len(generated) < unnumbered:
+        # Backstop: skip any allocated ID that is already spoken for
+        generated += [
+            ticket_id
+            for ticket_id in Ticket.allocate_ticket_ids(unnumbered - len(generated))
+            if ticket_id not in taken
+        ]
+    taken.update(generated)
+    new_ids = iter(generated)
+    tickets = []
+    created_at = {}
+    for fields, _, _, _, _ in valid:
+        fields = dict(fields)
+        legacy_created_at = fields.pop("created_at", None)
+        ticket = Ticket(**fields, created_by=user, modified_by=user)
+        if not ticket.ticket_id:
+            ticket.ticket_id = next(new_ids)
+        tickets.append(ticket)
+        if legacy_created_at:
+            created_at[ticket.ticket_id] = legacy_created_at
+    Ticket.objects.bulk_create(tickets, batch_size=500)
+
+    if created_at:
+        # auto_now_add overwrote them, so restore legacy dates in one UPDATE
+        Ticket.objects.filter(ticket_id__in=created_at).update(
+            created_at=Case(
+                *[
+                    When(ticket_id=ticket_id, then=Value(value))
+                    for ticket_id, value in created_at.items()
+                ],
+                output_field=DateTimeField(),
+            )
+        )
+
+    subtypes = defaultdict(list)
+    links, assignments = [], []
+    for ticket, (fields, subtype, technology_ids, user_ids, _) in zip(tickets, valid):
+        model = SUBTYPES.get(ticket.ticket_type)
+        if model is not None:
+            subtypes[model].append(
+                model(ticket=ticket, created_by=user, modified_by=user, **subtype)
+            )
+        links += [(ticket.id, pk) for pk in technology_ids]
+        assignments += [(ticket.id, pk) for pk in user_ids]
+    for model, objs in subtypes.items():
+        model.objects.bulk_create(objs, batch_size=500)
+
+    TicketTechnology = Ticket.technologies.through
+    TicketTechnology.objects.bulk_create(
+        [TicketTechnology(ticket_id=t, technology_id=pk) for t, pk in links],
+        batch_size=500,
+    )
+    rollups.record_links(links, 1)
+    TicketAssignee = Ticket.assigned_users.through
+    TicketAssignee.objects.bulk_create(
+        [TicketAssignee(ticket_id=t, user_id=pk) for t, pk in assignments],
+        batch_size=500,
+    )
+    # After the links, so the per-user technology counts include them
+    rollups.record_assignments(assignments, 1)
+
+    search.index_tickets([ticket.id for ticket in tickets])
+    invalidate_all_reports()
+    DataVersion.bump(TICKETS)
+    return len(tickets), errors
+
+
+def _advance_sequences(ticket_ids):
+    """Keep generated IDs clear of imported legacy ones"""
+    highest = {}
+    for ticket_id in ticket_ids:
+        match = TICKET_ID_RE.match(ticket_id)
+        if match:
+            year, number = int(match[1]), int(match[2])
+            highest[year] = max(highest.get(year, 0), number)
+    for year, number in highest.items():
+        counter = TicketSequence.objects.filter(year=year)
+        if not counter.update(last_number=Greatest("last_number", Value(number))):
+            # The legacy tickets are not inserted yet, so seeding from the
+            # existing IDs alone is not enough
+            TicketSequence._create_for_year(year)
+            counter.update(last_number=Greatest("last_number", Value(number)))
+
+
+def run_import(path, fmt, source, batch_size=500, user=None, on_batch=None):
+    """
+    Import ``path`` from where the checkpoint for ``source`` left off. Calls
+    ``on_batch(checkpoint, errors)`` after each committed batch and returns
+    the final checkpoint.
+    """
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(source=source)
+    lookups = Lookups()
+    rows = enumerate(read_rows(path, fmt), start=1)
+    # Rows before the checkpoint were committed by an earlier run
+    for _ in range(checkpoint.rows_done):
+        next(rows, None)
+
+    batch = []
+    while True:
+        row = next(rows, None)
+        if row is not None:
+            batch.append(row)
+        if batch and (row is None or len(batch) == batch_size):
+            with transaction.atomic():
+                imported, errors = import_batch(batch, lookups, user)
+                ImportCheckpoint.objects.filter(pk=source).update(
+                    rows_done=batch[-1][0],
+                    imported=F("imported") + imported,
+                    skipped=F("skipped") + len(errors),
+                    modified_at=timezone.now(),
+                )
+            checkpoint.refresh_from_db()
+            if on_batch is not None:
+                on_batch(checkpoint, errors)
+            batch = []
+        if row is None:
+            break
+
+    ImportCheckpoint.objects.filter(pk=source).update(
+        finished=True, modified_at=timezone.now()
+    )
+    checkpoint.refresh_from_db()
+    return checkpoint
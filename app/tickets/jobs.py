@@ -0,0 +1,303 @@
+"""
+A small background job queue kept in the project's own database.
+
+enqueue() inserts a Job row and the run_jobs management command claims due
+jobs and runs them on a thread or process pool, so heavy exports and
+reports no longer hold a gunicorn worker. No broker is involved.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED where the backend supports
+it (PostgreSQL), so workers never queue up behind each other's rows. On
+SQLite a job is claimed with a conditional UPDATE that only one worker can
+win. Failures are retried with exponential backoff up to max_attempts, and
+jobs whose worker stopped sending heartbeats go back in the queue.
+"""
+
+import csv
+import io
+import logging
+import tempfile
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tickets import analytics, catalog
+from tickets.exports import TICKET_CSV_HEADER, ticket_csv_rows
+from tickets.models import Job, Project, Ticket
+from tickets.report_cache import cached_report
+from tickets.reports import individual_report, project_report, team_technology_report
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+REGISTRY = {}
+# Payload checks run by enqueue(), so bad input is refused up front instead
+# of failing max_attempts times on a worker
+VALIDATORS = {}
+
+# On SQLite, how many due jobs to try before concluding that other workers
+# have taken them all
+CLAIM_CANDIDATES = 10
+
+
+def register(kind, validate=None):
+    """
+    Register the decorated function as the handler for jobs of ``kind``.
+    ``validate(payload)``, if given, raises ValidationError for payloads the
+    handler cannot run.
+    """
+
+    def decorator(func):
+        REGISTRY[kind] = func
+        if validate is not None:
+            VALIDATORS[kind] = validate
+        return func
+
+    return decorator
+
+
+def enqueue(kind, payload=None, user=None, priority=0, max_attempts=None):
+    if kind not in REGISTRY:
+        raise ValidationError(f"Unknown job kind '{kind}'.")
+    payload = payload or {}
+    if kind in VALIDATORS:
+        VALIDATORS[kind](payload)
+    return Job.objects.create(
+        kind=kind,
+        payload=payload,
+        priority=priority,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        created_by=user,
+        modified_by=user,
+    )
+
+
+def _due():
+    return Job.objects.filter(
+        status=Job.QUEUED, run_after__lte=timezone.now()
+    ).order_by("priority", "run_after", "id")
+
+
+def claim(worker):
+    """Mark the next due job as running on ``worker`` and return it, or None"""
+    now = timezone.now()
+    claimed = {
+        "status": Job.RUNNING,
+        "worker": worker,
+        "attempts": F("attempts") + 1,
+        "started_at": now,
+        "heartbeat_at": now,
+        "modified_at": now,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            pks = list(
+                _due()
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:1]
+            )
+            if not pks:
+                return None
+            pk = pks[0]
+            Job.objects.filter(pk=pk).update(**claimed)
+    else:
+        for pk in _due().values_list("pk", flat=True)[:CLAIM_CANDIDATES]:
+            # Only one worker's UPDATE can still find the job queued
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**claimed):
+                break
+        else:
+            return None
+    return Job.objects.get(pk=pk)
+
+
+def execute(pk, worker):
+    """Run a claimed job and record its result, retry or failure"""
+    job = Job.objects.get(pk=pk)
+    catalog.expire()
+    # A stale-job sweep may have handed the job to another worker meanwhile
+    mine = Job.objects.filter(pk=pk, worker=worker, status=Job.RUNNING)
+    handler = REGISTRY.get(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        result = handler(job)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        now = timezone.now()
+        if handler is not None and job.attempts < job.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            outcome = {
+                "status": Job.QUEUED,
+                "run_after": now + timedelta(seconds=backoff),
+            }
+        else:
+            outcome = {"status": Job.FAILED, "finished_at": now}
+        mine.update(error=traceback.format_exc(), worker="", modified_at=now, **outcome)
+        return
+    now = timezone.now()
+    mine.update(
+        status=Job.SUCCEEDED,
+        result=result,
+        result_file=job.result_file.name or "",
+        error="",
+        finished_at=now,
+        modified_at=now,
+    )
+
+
+def work(pk, worker):
+    """Pool entry point: execute() on this thread's or process's own connection"""
+    try:
+        execute(pk, worker)
+    finally:
+        connections.close_all()
+
+
+def heartbeat(worker, pks):
+    if pks:
+        Job.objects.filter(pk__in=pks, worker=worker, status=Job.RUNNING).update(
+            heartbeat_at=timezone.now()
+        )
+
+
+def requeue_stale():
+    """Put back (or fail) running jobs whose worker stopped sending heartbeats"""
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.JOB_STALE_SECONDS),
+    )
+    error = "Worker stopped responding"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, worker="", error=error, finished_at=now, modified_at=now
+    )
+    requeued = stale.update(
+        status=Job.QUEUED, worker="", error=error, run_after=now, modified_at=now
+    )
+    return requeued + failed
+
+
+# Job kinds
+
+
+@register("export_tickets_with_tech")
+def export_tickets_with_tech(job):
+    """CSV export of the tickets in payload["ticket_ids"] (all when absent)"""
+    tickets = Ticket.objects.all()
+    if "ticket_ids" in job.payload:
+        tickets = tickets.filter(pk__in=job.payload["ticket_ids"])
+    rows = 0
+    with tempfile.TemporaryFile() as raw:
+        out = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        writer = csv.writer(out)
+        writer.writerow(TICKET_CSV_HEADER)
+        for row in ticket_csv_rows(tickets):
+            writer.writerow(row)
+            rows += 1
+        out.flush()
+        job.result_file.save("tickets_with_tech.csv", File(raw), save=False)
+        out.detach()
+    return {"rows": rows}
+
+
+def _parse_since(since):
+    """payload["since"] as a datetime, None when absent"""
+    if not since:
+        return None
+    try:
+        value = parse_datetime(since)
+    except TypeError:
+        value = None
+    if value is None:
+        raise ValueError(f"'since' is not an ISO 8601 timestamp: {since!r}")
+    return value
+
+
+def validate_analytics_export(payload):
+    fmt = payload.get("format", "ndjson")
+    if fmt not in analytics.WRITERS:
+        raise ValidationError(
+            f"Unknown format '{fmt}'; use one of {', '.join(analytics.WRITERS)}."
+        )
+    if fmt == "parquet" and analytics.pyarrow is None:
+        raise ValidationError("Parquet export needs pyarrow installed.")
+    try:
+        _parse_since(payload.get("since"))
+    except ValueError:
+        raise ValidationError("'since' is not an ISO 8601 timestamp.")
+
+
+@register("analytics_export", validate=validate_analytics_export)
+def analytics_export(job):
+    """Ticket facts (payload {"format", "since"}) as a downloadable file"""
+    fmt = job.payload.get("format", "ndjson")
+    since = job.payload.get("since")
+    with tempfile.TemporaryFile() as out:
+        rows, watermark = analytics.export_facts(out, fmt, _parse_since(since))
+        job.result_file.save(f"ticket_facts.{fmt}", File(out), save=False)
+    return {"rows": rows, "watermark": watermark.isoformat() if watermark else None}
+
+
+REPORTS = {
+    "individual": lambda param: individual_report(
+        User.objects.get(username=param, is_se_team=True)
+    ),
+    "team-technology": lambda param: team_technology_report(),
+    "project": lambda param: project_report(Project.objects.get(pk=param)),
+}
+
+
+def validate_report(payload):
+    name = payload.get("name")
+    if not isinstance(name, str) or name not in REPORTS:
+        raise ValidationError(
+            f"Unknown report '{name}'; use one of {', '.join(REPORTS)}."
+        )
+    param = payload.get("param", "all")
+    if name == "individual":
+        found = User.objects.filter(username=param, is_se_team=True).exists()
+    elif name == "project":
+        try:
+            found = Project.objects.filter(pk=param).exists()
+        except (TypeError, ValueError):
+            found = False
+    else:
+        found = True
+    if not found:
+        raise ValidationError(f"No {name} report for '{param}'.")
+
+
+@register("report", validate=validate_report)
+def build_report(job):
+    """One report (payload {"name", "param"}), stored as the job result"""
+    name = job.payload["name"]
+    param = job.payload.get("param", "all")
+    return cached_report(name, param, lambda: REPORTS[name](param))
+
+
+@register("precompute_reports")
+def precompute_reports(job):
+    """
+    Warm the report cache with every report. Only useful across processes
+    when REPORT_CACHE_ALIAS points at a shared cache.
+    """
+    built = 0
+    for name, params in (
+        ("team-technology", ["all"]),
+        ("project", Project.objects.values_list("pk", flat=True)),
+        (
+            "individual",
+            User.objects.filter(is_se_team=True).values_list("username", flat=True),
+        ),
+    ):
+        for param in params:
+            cached_report(name, param, lambda: REPORTS[name](param))
+            built += 1
+    return {"reports": built}
@@ -0,0 +1,217 @@
+"""
+Alternative builders for GET /api/tickets/ pages.
+
+``ticket_page`` is the fast path: values() rows with only the columns
+TicketOut needs, technology and assignee names for the whole page from one
+UNION ALL query. ``sparse_ticket_page`` serves ?fields=/?expand= requests
+with only() and just the joins and prefetches those fields need. Both return
+plain dicts that are rendered without another round of schema validation.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import CharField, F, IntegerField, Prefetch, Value
+from ninja.errors import HttpError
+
+from tickets.catalog import get_catalog, ticket_technologies
+from tickets.models import Ticket
+from tickets.pagination import DEFAULT_PAGE_SIZE, paginate_tickets
+
+User = get_user_model()
+
+TicketTechnology = Ticket.technologies.through
+TicketAssignee = Ticket.assigned_users.through
+
+COLUMNS = [
+    "id",
+    "ticket_id",
+    "title",
+    "status",
+    "priority",
+    "ticket_type",
+    "project__name",
+    "reporter_name",
+    "owner__username",
+    "created_at",
+]
+
+
+def m2m_names(ticket_ids):
+    """{ticket pk: (technology names, assignee usernames)} in prefetch order"""
+    # Technology names come from the catalog, so that half reads the link
+    # table alone. Both halves select ticket_id then the same annotations, so
+    # the UNION columns line up
+    technologies = (
+        TicketTechnology.objects.filter(ticket_id__in=ticket_ids)
+        .annotate(
+            kind=Value(0, output_field=IntegerField()),
+            ref=F("technology_id"),
+            label=Value("", output_field=CharField()),
+            link=F("id"),
+        )
+        .values_list("ticket_id", "kind", "ref", "label", "link")
+    )
+    assignees = (
+        TicketAssignee.objects.filter(ticket_id__in=ticket_ids)
+        .annotate(
+            kind=Value(1, output_field=IntegerField()),
+            ref=F("user_id"),
+            label=F("user__username"),
+            link=F("id"),
+        )
+        .values_list("ticket_id", "kind", "ref", "label", "link")
+    )
+    rows = list(technologies.union(assignees, all=True))
+    catalog = get_catalog({row[2] for row in rows if row[1] == 0})
+    # Technology.Meta.ordering is (category name, name); assignees keep link order
+    rows.sort(
+        key=lambda row: (0, catalog.position[row[2]]) if row[1] == 0 else (1, row[4])
+    )
+    names = {pk: ([], []) for pk in ticket_ids}
+    for ticket_id, kind, ref, label, _ in rows:
+        names[ticket_id][kind].append(
+            catalog.technologies[ref].name if kind == 0 else label
+        )
+    return names
+
+
+def ticket_page(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """TicketPage payload built from values() rows"""
+    rows, next_cursor, prev_cursor = paginate_tickets(
+        queryset.values(*COLUMNS), cursor, limit
+    )
+    names = m2m_names([row["id"] for row in rows])
+    items = []
+    for row in rows:
+        technologies, assigned_users = names[row["id"]]
+        items.append(
+            {
+                "id": row["id"],
+                "ticket_id": row["ticket_id"],
+                "title": row["title"],
+                "status": row["status"],
+                "priority": row["priority"],
+                "ticket_type": row["ticket_type"],
+                "project": row["project__name"],
+                "technologies": technologies,
+                "reporter_name": row["reporter_name"],
+                "owner": row["owner__username"],
+                "assigned_users": assigned_users,
+                "created_at": row["created_at"].isoformat(),
+            }
+        )
+    return {"items": items, "next": next_cursor, "prev": prev_cursor}
+
+
+# Sparse fieldsets (?fields=) and expanded relations (?expand=)
+
+FIELDS = [
+    "id",
+    "ticket_id",
+    "title",
+    "status",
+    "priority",
+    "ticket_type",
+    "project",
+    "technologies",
+    "reporter_name",
+    "owner",
+    "assigned_users",
+    "created_at",
+]
+RELATIONS = {"project", "owner", "technologies", "assigned_users"}
+
+
+def _split(value):
+    return {part.strip() for part in (value or "").split(",") if part.strip()}
+
+
+def parse_fieldset(fields=None, expand=None):
+    """
+    Return (fields, expand) for the ?fields= and ?expand= parameters, with
+    fields in TicketOut order. id is always included and expanding a
+    relation implies selecting it. Raises HttpError(400) for unknown names.
+    """
+    requested, expanded = _split(fields), _split(expand)
+    unknown = sorted((requested - set(FIELDS)) | (expanded - RELATIONS))
+    if unknown:
+        raise HttpError(400, f"Unknown fields: {', '.join(unknown)}")
+    if not requested:
+        requested = set(FIELDS)
+    requested |= expanded | {"id"}
+    return [name for name in FIELDS if name in requested], expanded
+
+
+def sparse_queryset(queryset, fields, expand):
+    """Load only the requested columns, joining/prefetching only asked-for relations"""
+    # created_at is needed for the keyset cursor even when it is not shown
+    columns = {"id", "created_at"} | (set(fields) - RELATIONS)
+    related = []
+    for relation, label in (("project", "name"), ("owner", "username")):
+        if relation in fields:
+            columns.add(f"{relation}__{label}")
+            related.append(relation)
+
+    # Technologies are resolved through the catalog, see sparse_ticket_page
+    prefetches = []
+    if "assigned_users" in fields:
+        prefetches.append(
+            Prefetch("assigned_users", queryset=User.objects.only("id", "username"))
+        )
+    queryset = queryset.only(*columns).prefetch_related(*prefetches)
+    # A bare select_related() would follow every non-null foreign key
+    return queryset.select_related(*related) if related else queryset
+
+
+def sparse_ticket(ticket, fields, expand, technologies=None, catalog=None):
+    out = {}
+    for name in fields:
+        if name == "project":
+            project = ticket.project
+            out[name] = (
+                {"id": project.id, "name": project.name}
+                if name in expand
+                else project.name
+            )
+        elif name == "owner":
+            owner = ticket.owner
+            if owner is None:
+                out[name] = None
+            else:
+                out[name] = (
+                    {"id": owner.id, "username": owner.username}
+                    if name in expand
+                    else owner.username
+                )
+        elif name == "technologies":
+            ids = technologies[ticket.id]
+            out[name] = catalog.describe(ids) if name in expand else catalog.names(ids)
+        elif name == "assigned_users":
+            out[name] = [
+                (
+                    {"id": user.id, "username": user.username}
+                    if name in expand
+                    else user.username
+                )
+                for user in ticket.assigned_users.all()
+            ]
+        elif name == "created_at":
+            out[name] = ticket.created_at.isoformat()
+        else:
+            out[name] = getattr(ticket, name)
+    return out
+
+
+def sparse_ticket_page(queryset, fields, expand, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    rows, next_cursor, prev_cursor = paginate_tickets(
+        sparse_queryset(queryset, fields, expand), cursor, limit
+    )
+    technologies, catalog = None, None
+    if "technologies" in fields:
+        technologies, catalog = ticket_technologies([t.id for t in rows])
+    return {
+        "items": [
+            sparse_ticket(t, fields, expand, technologies, catalog) for t in rows
+        ],
+        "next": next_cursor,
+        "prev": prev_cursor,
+    }
@@ -0,0 +1,71 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from tickets import benchmarks, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the API and admin at increasing ticket counts in a throwaway "
+        "test database and write the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="1000,10000,100000",
+            help="Comma-separated ticket counts to benchmark at",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--suite",
+            action="append",
+            choices=sorted(benchmarks.SUITES),
+            help="Suites to run (default: all)",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--output", default="benchmark-results.json", help='File to write, or "-"'
+        )
+
+    def handle(self, *args, **options):
+        scales = sorted(int(scale) for scale in options["scales"].split(","))
+        suites = options["suite"] or sorted(benchmarks.SUITES)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        results = []
+        try:
+            generated = 0
+            for scale in scales:
+                self.stderr.write(f"Generating data up to {scale} tickets...")
+                synthetic.generate(
+                    tickets=scale - generated, seed=options["seed"] + scale
+                )
+                generated = scale
+                for suite in suites:
+                    self.stderr.write(f"Running {suite} at {scale} tickets...")
+                    results += benchmarks.SUITES[suite](scale, repeat=options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        payload = json.dumps(
+            {"environment": benchmarks.environment(), "results": results}, indent=2
+        )
+        if options["output"] == "-":
+            sys.stdout.write(payload + "\n")
+        else:
+            with open(options["output"], "w") as fh:
+                fh.write(payload + "\n")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Wrote {len(results)} results to {options['output']}"
+                )
+            )
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tickets import synthetic
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic projects, technologies, users and tickets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=20)
+        parser.add_argument("--categories", type=int, default=8)
+        parser.add_argument("--technologies", type=int, default=60)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument(
+            "--se-ratio",
+            type=float,
+            default=0.3,
+            help="Share of users on the S.E. team",
+        )
+        parser.add_argument(
+            "--attachment-ratio",
+            type=float,
+            default=0.1,
+            help="Share of tickets that get an attachment row",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        created = synthetic.generate(
+            tickets=options["tickets"],
+            projects=options["projects"],
+            categories=options["categories"],
+            technologies=options["technologies"],
+            users=options["users"],
+            se_ratio=options["se_ratio"],
+            attachment_ratio=options["attachment_ratio"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} tickets in {elapsed:.1f}s "
+                f"({created / elapsed if elapsed else 0:.0f} tickets/s)"
+            )
+        )
@@ -0,0 +1,113 @@
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import importer
+from tickets.models import ImportCheckpoint
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import tickets from a CSV or NDJSON file, resuming interrupted runs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--format",
+            choices=importer.FORMATS,
+            help="File format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per transaction (and per checkpoint)",
+        )
+        parser.add_argument(
+            "--source",
+            help="Checkpoint key for resuming (default: the file's absolute path)",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard the checkpoint and import from the first row",
+        )
+        parser.add_argument(
+            "--errors", help="Append rejected rows to this file as NDJSON"
+        )
+        parser.add_argument(
+            "--user", help="Username recorded as created_by on imported tickets"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+        fmt = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt == "jsonl":
+            fmt = "ndjson"
+        if fmt not in importer.FORMATS:
+            raise CommandError(
+                "Cannot tell the format from the extension; use --format"
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        user = None
+        if options["user"]:
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user '{options['user']}'")
+
+        source = options["source"] or os.path.abspath(path)
+        if options["restart"]:
+            ImportCheckpoint.objects.filter(source=source).delete()
+        checkpoint = ImportCheckpoint.objects.filter(source=source).first()
+        if checkpoint is not None and checkpoint.finished:
+            self.stdout.write(
+                f"{source} was already imported ({checkpoint.imported} tickets); "
+                "use --restart to import it again"
+            )
+            return
+        if checkpoint is not None:
+            self.stdout.write(f"Resuming after row {checkpoint.rows_done}")
+        start_rows = checkpoint.rows_done if checkpoint else 0
+
+        errors_file = open(options["errors"], "a") if options["errors"] else None
+        started = time.perf_counter()
+
+        def on_batch(checkpoint, errors):
+            elapsed = time.perf_counter() - started
+            rate = (checkpoint.rows_done - start_rows) / elapsed if elapsed else 0
+            self.stdout.write(
+                f"Row {checkpoint.rows_done}: {checkpoint.imported} imported, "
+                f"{checkpoint.skipped} skipped ({rate:.0f} rows/s)"
+            )
+            for number, problems in errors:
+                if errors_file is not None:
+                    errors_file.write(json.dumps({"row": number, "errors": problems}))
+                    errors_file.write("\n")
+                else:
+                    self.stderr.write(f"Row {number}: {'; '.join(problems)}")
+
+        try:
+            checkpoint = importer.run_import(
+                path, fmt, source, options["batch_size"], user, on_batch
+            )
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+        elapsed = time.perf_counter() - started
+
+        rows = checkpoint.rows_done - start_rows
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {rows} rows in {elapsed:.1f}s "
+                f"({rows / elapsed if elapsed else 0:.0f} rows/s): "
+                f"{checkpoint.imported} imported, {checkpoint.skipped} skipped"
+            )
+        )
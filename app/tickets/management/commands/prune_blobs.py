@@ -0,0 +1,95 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+
+from tickets.models import Attachment, Blob
+from tickets.storage import PREFIX, attachment_storage, blob_digest, blob_name
+
+
+class Command(BaseCommand):
+    help = "Delete attachment blobs that no attachment references any more"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=settings.ATTACHMENT_BLOB_GRACE_SECONDS,
+            help="Keep blobs whose file was written or reused this recently (seconds)",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the attachment table first",
+        )
+        parser.add_argument(
+            "--scan",
+            action="store_true",
+            help="Also delete stored files that have no blob row (interrupted saves)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report what would be deleted"
+        )
+
+    def handle(self, *args, **options):
+        storage = attachment_storage()
+        cutoff = time.time() - options["grace"]
+        dry_run = options["dry_run"]
+
+        if options["recount"]:
+            fixed = 0
+            counted = Blob.objects.annotate(refs=Count("attachments"))
+            for blob in counted.iterator(chunk_size=2000):
+                if blob.ref_count != blob.refs:
+                    fixed += 1
+                    if not dry_run:
+                        Blob.objects.filter(pk=blob.pk).update(ref_count=blob.refs)
+            self.stdout.write(f"Corrected {fixed} reference counts")
+
+        freed = removed = 0
+        unreferenced = Blob.objects.filter(ref_count=0).exclude(
+            Exists(Attachment.objects.filter(blob=OuterRef("pk")))
+        )
+        for blob in unreferenced.iterator(chunk_size=2000):
+            name = blob_name(blob.sha256)
+            try:
+                if os.path.getmtime(storage.path(name)) > cutoff:
+                    continue
+            except FileNotFoundError:
+                pass
+            removed += 1
+            freed += blob.size
+            if dry_run:
+                continue
+            with transaction.atomic():
+                # Re-check under the delete so a reference taken meanwhile wins
+                if Blob.objects.filter(pk=blob.pk, ref_count=0).delete()[0]:
+                    storage.delete(name)
+
+        orphans = 0
+        if options["scan"]:
+            known = set(Blob.objects.values_list("sha256", flat=True))
+            for root, _, files in os.walk(storage.path(PREFIX)):
+                for filename in files:
+                    path = os.path.join(root, filename)
+                    name = os.path.relpath(path, storage.location).replace(os.sep, "/")
+                    digest = blob_digest(name)
+                    # Temporary .upload spools have no digest name; leave
+                    # recent ones to the save that is writing them
+                    if digest in known or os.path.getmtime(path) > cutoff:
+                        continue
+                    orphans += 1
+                    freed += os.path.getsize(path)
+                    if not dry_run:
+                        os.remove(path)
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {removed} blobs and {orphans} orphaned files, "
+                f"{freed / 1024 / 1024:.1f} MiB"
+            )
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from tickets import rollups
+from tickets.report_cache import invalidate_all_reports
+
+
+class Command(BaseCommand):
+    help = "Rebuild the technology/category usage rollup tables from scratch"
+
+    def handle(self, *args, **options):
+        counts = rollups.rebuild()
+        invalidate_all_reports()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt usage rollups for {technologies} technologies "
+                "({technology_users} technology/user and "
+                "{category_users} category/user pairs)".format(**counts)
+            )
+        )
@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets import jobs
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.JOB_WORKERS,
+            help="Jobs run at the same time",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default="thread",
+            help="Run jobs on threads, or on processes for CPU-bound work",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=settings.JOB_POLL_SECONDS,
+            help="Seconds to wait between checks of an empty queue",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for more jobs",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        if options["pool"] == "process":
+            # Spawned children set Django up afresh rather than inheriting
+            # this process's database connections
+            pool = ProcessPoolExecutor(
+                workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        else:
+            pool = ThreadPoolExecutor(workers, thread_name_prefix="job")
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        self.stdout.write(f"Worker {worker}: {workers} {options['pool']} workers")
+
+        running = {}
+        last_beat = 0.0
+        finished = 0
+        try:
+            while True:
+                for future in [f for f in running if f.done()]:
+                    running.pop(future)
+                    future.result()
+                    finished += 1
+
+                if time.monotonic() - last_beat >= settings.JOB_HEARTBEAT_SECONDS:
+                    jobs.heartbeat(worker, list(running.values()))
+                    jobs.requeue_stale()
+                    last_beat = time.monotonic()
+
+                job = None
+                while not self.stopping and len(running) < workers:
+                    job = jobs.claim(worker)
+                    if job is None:
+                        break
+                    running[pool.submit(jobs.work, job.pk, worker)] = job.pk
+
+                if self.stopping or (options["burst"] and job is None):
+                    if not running:
+                        break
+                if running:
+                    wait(running, timeout=options["poll"], return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            self.stopping = True
+        finally:
+            # Let claimed jobs finish; unclaimed ones stay queued
+            pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS(f"Ran {finished} jobs"))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -1,7 +1,10 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
 from django.utils import timezone
 
+from tickets.storage import attachment_storage
+
 
 class AuditModel(models.Model):
     """Abstract model for auditing."""
@@ -27,6 +30,17 @@ class AuditModel(models.Model):
         abstract = True
 
 
+class ProjectQuerySet(models.QuerySet):
+    def with_stats(self):
+        """Annotate ticket totals in one conditional aggregate per project"""
+        return self.annotate(
+            total_tickets_count=Count("tickets"),
+            completed_tickets_count=Count(
+                "tickets", filter=Q(tickets__status="completed")
+            ),
+        )
+
+
 class Project(AuditModel):
     """Projects to group tickets for reporting and organization"""
 
@@ -48,6 +62,8 @@ class Project(AuditModel):
         settings.AUTH_USER_MODEL, related_name="projects", blank=True
     )
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
 
@@ -56,10 +72,14 @@ class Project(AuditModel):
 
     @property
     def total_tickets(self):
+        if hasattr(self, "total_tickets_count"):
+            return self.total_tickets_count
         return self.tickets.count()
 
     @property
     def completed_tickets(self):
+        if hasattr(self, "completed_tickets_count"):
+            return self.completed_tickets_count
         return self.tickets.filter(status="completed").count()
 
     @property
@@ -106,7 +126,15 @@ class Technology(AuditModel):
         ordering = ["category__name", "name"]
 
     def __str__(self):
-        return f"{self.name} ({self.category.name})"
+        # From the process-local catalog rather than a query per technology,
+        # e.g. for every option of the admin's technology widgets
+        from tickets.catalog import get_catalog  # tickets.catalog imports models
+
+        category_ids = [self.category_id] if self.category_id else []
+        category = get_catalog(category_ids=category_ids).categories.get(
+            self.category_id
+        )
+        return f"{self.name} ({category.name if category else self.category.name})"
 
     @property
     def usage_count(self):
@@ -114,6 +142,170 @@ class Technology(AuditModel):
         return self.tickets.count()
 
 
+class TechnologyUsage(models.Model):
+    """Rollup of ticket and distinct S.E. user counts per technology"""
+
+    technology = models.OneToOneField(
+        Technology,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="usage_rollup",
+    )
+    ticket_count = models.IntegerField(default=0)
+    se_user_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.technology_id}: {self.ticket_count} tickets"
+
+
+class TechnologyUserUsage(models.Model):
+    """How many of a user's assigned tickets involve a technology"""
+
+    technology = models.ForeignKey(
+        Technology, on_delete=models.CASCADE, related_name="+"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    ticket_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["technology", "user"], name="unique_technology_user_usage"
+            )
+        ]
+
+
+class CategoryUsage(models.Model):
+    """Rollup of technology links and distinct S.E. user counts per category"""
+
+    category = models.OneToOneField(
+        TechnologyCategory,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="usage_rollup",
+    )
+    ticket_count = models.IntegerField(default=0)
+    se_user_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category_id}: {self.ticket_count} tickets"
+
+
+class CategoryUserUsage(models.Model):
+    """How many of a user's ticket/technology links fall in a category"""
+
+    category = models.ForeignKey(
+        TechnologyCategory, on_delete=models.CASCADE, related_name="+"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    ticket_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "user"], name="unique_category_user_usage"
+            )
+        ]
+
+
+class DataVersion(models.Model):
+    """Monotonic change counters, used as cheap validators for conditional GETs"""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+    @classmethod
+    def bump(cls, *names):
+        for name in names:
+            if cls.objects.filter(name=name).update(version=F("version") + 1):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(name=name, version=1)
+            except IntegrityError:
+                cls.objects.filter(name=name).update(version=F("version") + 1)
+
+    @classmethod
+    def current(cls, *names):
+        versions = dict(
+            cls.objects.filter(name__in=names).values_list("name", "version")
+        )
+        return tuple(versions.get(name, 0) for name in names)
+
+
+class ImportCheckpoint(models.Model):
+    """Progress of a resumable import_tickets run, saved with each batch"""
+
+    source = models.CharField(max_length=255, primary_key=True)
+    rows_done = models.PositiveIntegerField(default=0)
+    imported = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.rows_done} rows"
+
+
+class TicketSequence(models.Model):
+    """Per-year counter backing SE-YYYY-NNN ticket IDs"""
+
+    year = models.PositiveIntegerField(primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"SE-{self.year}: {self.last_number}"
+
+    @classmethod
+    def allocate(cls, year, count=1):
+        """
+        Reserve ``count`` consecutive numbers for ``year`` and return them.
+
+        The increment is a single UPDATE, so the row lock is taken before the
+        new value is read back and concurrent callers never share a number.
+        """
+        with transaction.atomic():
+            updated = cls.objects.filter(year=year).update(
+                last_number=F("last_number") + count
+            )
+            if not updated:
+                cls._create_for_year(year)
+                cls.objects.filter(year=year).update(
+                    last_number=F("last_number") + count
+                )
+            last = cls.objects.get(year=year).last_number
+        return range(last - count + 1, last + 1)
+
+    @classmethod
+    def _create_for_year(cls, year):
+        """Start the counter after any IDs issued before sequences existed"""
+        prefix = f"SE-{year}-"
+        existing = Ticket.objects.filter(ticket_id__startswith=prefix).values_list(
+            "ticket_id", flat=True
+        )
+        start = max(
+            (
+                int(tid[len(prefix) :])
+                for tid in existing
+                if tid[len(prefix) :].isdigit()
+            ),
+            default=0,
+        )
+        try:
+            with transaction.atomic():
+                cls.objects.create(year=year, last_number=start)
+        except IntegrityError:
+            # Another process created the row first; its seed is just as good
+            pass
+
+
 class Ticket(AuditModel):
     """Main ticket model - simpler MVP approach"""
 
@@ -190,7 +382,40 @@ class Ticket(AuditModel):
     business_impact = models.TextField(blank=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        # id breaks ties so keyset pagination on (created_at, id) is stable
+        ordering = ["-created_at", "-id"]
+        # Match the API/admin filters and their -created_at/-modified_at sorts;
+        # tickets.tests.QueryPlanTests fails if an endpoint falls back to a scan
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="ticket_created_idx"),
+            models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="ticket_status_created_idx",
+            ),
+            models.Index(
+                fields=["priority", "-created_at", "-id"],
+                name="ticket_priority_created_idx",
+            ),
+            models.Index(
+                fields=["ticket_type", "-created_at", "-id"],
+                name="ticket_type_created_idx",
+            ),
+            models.Index(
+                fields=["project", "status"], name="ticket_project_status_idx"
+            ),
+            models.Index(
+                fields=["project", "-created_at", "-id"],
+                name="ticket_project_created_idx",
+            ),
+            models.Index(
+                fields=["project", "-modified_at"], name="ticket_project_modified_idx"
+            ),
+            models.Index(
+                fields=["owner", "-modified_at"], name="ticket_owner_modified_idx"
+            ),
+            # Incremental analytics exports: modified_at >= since, in order
+            models.Index(fields=["modified_at", "id"], name="ticket_modified_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.ticket_id:
@@ -199,21 +424,13 @@ class Ticket(AuditModel):
 
     def generate_ticket_id(self):
         """Generate SE-2025-001 format IDs"""
-        year = timezone.now().year
-        prefix = f"SE-{year}-"
-        last_ticket = (
-            Ticket.objects.filter(ticket_id__startswith=prefix)
-            .order_by("-ticket_id")
-            .first()
-        )
-
-        if last_ticket:
-            last_num = int(last_ticket.ticket_id.split("-")[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        return Ticket.allocate_ticket_ids(1)[0]
 
-        return f"{prefix}{new_num:03d}"
+    @staticmethod
+    def allocate_ticket_ids(count):
+        """Reserve a block of ``count`` ticket IDs for bulk inserts"""
+        year = timezone.now().year
+        return [f"SE-{year}-{n:03d}" for n in TicketSequence.allocate(year, count)]
 
     def __str__(self):
         return f"{self.ticket_id}: {self.title}"
@@ -302,14 +519,100 @@ class Task(AuditModel):
 
 
 # Simple attachments support
+class Blob(models.Model):
+    """Stored attachment content, shared by every Attachment with the same bytes"""
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+    @classmethod
+    def retain(cls, sha256, size):
+        """Count one more reference, creating the row for new content"""
+        if cls.objects.filter(sha256=sha256).update(ref_count=F("ref_count") + 1):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(sha256=sha256, size=size, ref_count=1)
+        except IntegrityError:
+            cls.objects.filter(sha256=sha256).update(ref_count=F("ref_count") + 1)
+
+    @classmethod
+    def release(cls, sha256):
+        """Drop one reference; unreferenced blobs are removed by prune_blobs"""
+        cls.objects.filter(sha256=sha256, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1
+        )
+
+
 class Attachment(AuditModel):
     """File attachments for tickets"""
 
     ticket = models.ForeignKey(
         Ticket, on_delete=models.CASCADE, related_name="attachments"
     )
-    file = models.FileField(upload_to="attachments/%Y/%m/")
+    # New files are stored by content address (tickets.storage), which
+    # replaces upload_to; older rows keep their dated paths
+    file = models.FileField(upload_to="attachments/%Y/%m/", storage=attachment_storage)
     original_name = models.CharField(max_length=255)
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="attachments",
+    )
 
     def __str__(self):
         return f"{self.ticket.ticket_id}: {self.original_name}"
+
+
+class Job(AuditModel):
+    """Background work queued in the database and run by the run_jobs command"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    # Lower runs first
+    priority = models.SmallIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    worker = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to="jobs/%Y/%m/", blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # The claim query: next due job by priority
+            models.Index(
+                fields=["status", "priority", "run_after", "id"],
+                name="job_claim_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from ninja.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(ticket, direction):
+    """Opaque cursor pointing at a ticket's (created_at, id) position"""
+    if isinstance(ticket, dict):  # a values() row
+        created_at, pk = ticket["created_at"], ticket["id"]
+    else:
+        created_at, pk = ticket.created_at, ticket.id
+    payload = {"c": created_at.isoformat(), "i": pk, "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id, direction) or raise a 400 for a malformed cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["c"])
+        ticket_pk = int(payload["i"])
+        direction = payload["d"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HttpError(400, "Invalid cursor")
+    if direction not in ("next", "prev"):
+        raise HttpError(400, "Invalid cursor")
+    return created_at, ticket_pk, direction
+
+
+def paginate_tickets(queryset, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Keyset pagination over (-created_at, -id), matching Ticket.Meta.ordering.
+
+    Only ``limit + 1`` rows are ever fetched, so the cost of a page does not
+    depend on how deep the client has paged. Returns (tickets, next, prev).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    direction = "next"
+
+    if cursor:
+        created_at, ticket_pk, direction = decode_cursor(cursor)
+        if direction == "next":
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=ticket_pk)
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at)
+                | Q(created_at=created_at, id__gt=ticket_pk)
+            )
+
+    if direction == "next":
+        rows = list(queryset.order_by("-created_at", "-id")[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        has_next, has_prev = has_more, bool(cursor)
+    else:
+        # Walk backwards in ascending order, then flip back to display order
+        rows = list(queryset.order_by("created_at", "id")[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_next, has_prev = True, has_more
+
+    next_cursor = encode_cursor(rows[-1], "next") if rows and has_next else None
+    prev_cursor = encode_cursor(rows[0], "prev") if rows and has_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+def estimated_row_count(model, using="default"):
+    """
+    The query planner's row estimate for ``model``'s table, or None when the
+    backend keeps none (or the table has not been analyzed yet).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+    elif connection.vendor == "sqlite":
+        # Filled in by ANALYZE / PRAGMA optimize; the first number is the rows
+        sql = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:  # sqlite_stat1 does not exist before ANALYZE
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin changelist paginator that skips COUNT(*) on large unfiltered tables.
+
+    Unfiltered changelists use the planner's row estimate once it reaches
+    ADMIN_EXACT_COUNT_LIMIT, so the page costs the same however big the
+    table gets. The last page number may be slightly off. Filtered lists
+    and small tables are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
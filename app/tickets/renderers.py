@@ -0,0 +1,22 @@
+from ninja.renderers import JSONRenderer
+from ninja.responses import NinjaJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, see req_files/requirements.txt
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed"""
+
+    def render(self, request, data, *, response_status):
+        if orjson is None:
+            return super().render(request, data, response_status=response_status)
+        # orjson handles the common types natively and hands the rest
+        # (Decimal, pydantic models, lazy strings) to ninja's encoder
+        return orjson.dumps(
+            data,
+            default=NinjaJSONEncoder().default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
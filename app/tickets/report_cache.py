@@ -0,0 +1,80 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GENERATION_KEY = "reports:generation"
+
+
+def _cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "default")]
+
+
+def _generation(cache):
+    return cache.get_or_set(GENERATION_KEY, 0, timeout=None)
+
+
+def _key(generation, name, param):
+    return f"reports:{generation}:{name}:{param}"
+
+
+def cached_report(name, param, build):
+    """
+    Return the cached payload for report ``name`` with ``param``, building and
+    storing it on a miss. REPORT_CACHE_TTL is only a backstop; entries are
+    normally dropped by the invalidation signals in tickets.signals.
+    """
+    cache = _cache()
+    key = _key(_generation(cache), name, param)
+    report = cache.get(key)
+    if report is None:
+        report = build()
+        cache.set(key, report, getattr(settings, "REPORT_CACHE_TTL", 300))
+    return report
+
+
+async def acached_report(name, param, build):
+    """Async cached_report; ``build`` is a coroutine function"""
+    cache = _cache()
+    key = _key(await sync_to_async(_generation)(cache), name, param)
+    report = await cache.aget(key)
+    if report is None:
+        report = await build()
+        await cache.aset(key, report, getattr(settings, "REPORT_CACHE_TTL", 300))
+    return report
+
+
+def invalidate_reports(usernames=(), project_ids=(), team=True):
+    """
+    Drop the cached reports that depend on the given users and projects. Runs
+    when the current transaction commits (at once outside one), so a request
+    cannot re-cache a report from the old rows before the change is visible.
+    """
+    usernames, project_ids = list(usernames), list(project_ids)
+    transaction.on_commit(lambda: _delete_reports(usernames, project_ids, team))
+
+
+def _delete_reports(usernames, project_ids, team):
+    cache = _cache()
+    generation = _generation(cache)
+    keys = [_key(generation, "individual", username) for username in usernames]
+    keys += [_key(generation, "project", project_id) for project_id in project_ids]
+    if team:
+        keys.append(_key(generation, "team-technology", "all"))
+    cache.delete_many(keys)
+
+
+def invalidate_all_reports():
+    """
+    Orphan every cached report by moving to a new key generation, once the
+    current transaction commits
+    """
+    transaction.on_commit(_next_generation)
+
+
+def _next_generation():
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, timeout=None)
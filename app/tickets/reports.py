@@ -0,0 +1,309 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.db.models import Count, F, Q
+
+from tickets.catalog import get_catalog, ticket_technologies
+from tickets.models import Technology, TechnologyCategory, TechnologyUsage, Ticket
+
+TicketTechnology = Ticket.technologies.through
+User = get_user_model()
+
+
+def _user_ticket_ids(user):
+    """Subquery of tickets a user owns or is assigned to"""
+    # Two indexed lookups OR'd together rather than an OR across a join,
+    # which would have to scan every ticket
+    assigned = Ticket.assigned_users.through.objects.filter(user=user).values(
+        "ticket_id"
+    )
+    return Ticket.objects.filter(Q(owner=user) | Q(id__in=assigned)).values("id")
+
+
+def individual_summary(ticket_ids):
+    counts = Ticket.objects.filter(id__in=ticket_ids).aggregate(
+        total=Count("id"),
+        completed=Count("id", filter=Q(status="completed")),
+        in_progress=Count("id", filter=Q(status="in_progress")),
+    )
+    total = counts["total"]
+    return {
+        "total_tickets": total,
+        "completed": counts["completed"],
+        "in_progress": counts["in_progress"],
+        "completion_rate": (
+            round(counts["completed"] / total * 100, 1) if total > 0 else 0
+        ),
+    }
+
+
+def _technology_uses(links):
+    """{technology id: links} grouped on the link table, with no joins"""
+    return dict(
+        links.values_list("technology_id").annotate(uses=Count("id")).order_by()
+    )
+
+
+def individual_technology_expertise(ticket_ids):
+    # Names and categories come from the catalog
+    uses = _technology_uses(TicketTechnology.objects.filter(ticket_id__in=ticket_ids))
+    catalog = get_catalog(uses)
+    tech_usage = dict(
+        sorted(
+            ((catalog.technologies[pk].name, n) for pk, n in uses.items()),
+            key=lambda item: (-item[1], item[0]),
+        )
+    )
+    tech_categories = {}
+    for pk, n in uses.items():
+        category = catalog.technologies[pk].category
+        tech_categories[category] = tech_categories.get(category, 0) + n
+    tech_categories = dict(sorted(tech_categories.items()))
+    return {
+        "most_used_technologies": dict(list(tech_usage.items())[:10]),
+        "technology_categories": tech_categories,
+        "total_technologies_used": len(tech_usage),
+    }
+
+
+def individual_project_contributions(ticket_ids):
+    rows = (
+        Ticket.objects.filter(id__in=ticket_ids)
+        .values("project__name")
+        .annotate(
+            total=Count("id"), completed=Count("id", filter=Q(status="completed"))
+        )
+        .order_by("project__name")
+    )
+    return {
+        row["project__name"]: {"total": row["total"], "completed": row["completed"]}
+        for row in rows
+    }
+
+
+def individual_recent_work(ticket_ids):
+    tickets = list(
+        Ticket.objects.filter(id__in=ticket_ids)
+        .select_related("project")
+        .order_by("-modified_at")[:10]
+    )
+    technologies, catalog = ticket_technologies([t.id for t in tickets])
+    return [
+        {
+            "ticket_id": t.ticket_id,
+            "title": t.title,
+            "project": t.project.name,
+            "status": t.status,
+            "technologies": catalog.names(technologies[t.id]),
+        }
+        for t in tickets
+    ]
+
+
+def individual_report(user):
+    """
+    Individual S.E. member report built from GROUP BY aggregates.
+
+    Runs a fixed number of queries regardless of how many tickets the user
+    has worked on.
+    """
+    ticket_ids = _user_ticket_ids(user)
+    return {
+        "user": user.get_full_name() or user.username,
+        "summary": individual_summary(ticket_ids),
+        "technology_expertise": individual_technology_expertise(ticket_ids),
+        "project_contributions": individual_project_contributions(ticket_ids),
+        "recent_work": individual_recent_work(ticket_ids),
+    }
+
+
+def team_size():
+    return User.objects.filter(is_se_team=True).count()
+
+
+def team_technologies_in_use():
+    return TechnologyUsage.objects.filter(ticket_count__gt=0).count()
+
+
+def team_popular_technologies():
+    # Rollups are maintained by tickets.rollups, so this is O(#technologies)
+    tech_stats = list(
+        Technology.objects.select_related("usage_rollup").order_by(
+            F("usage_rollup__ticket_count").desc(nulls_last=True), "name"
+        )[:15]
+    )
+    catalog = get_catalog([tech.id for tech in tech_stats])
+    return [
+        {
+            "name": tech.name,
+            "category": catalog.technologies[tech.id].category,
+            **_usage(tech),
+        }
+        for tech in tech_stats
+    ]
+
+
+def team_category_breakdown():
+    category_stats = TechnologyCategory.objects.select_related("usage_rollup").order_by(
+        F("usage_rollup__ticket_count").desc(nulls_last=True), "name"
+    )
+    return [{"category": cat.name, **_usage(cat)} for cat in category_stats]
+
+
+def _team_technology_payload(size, in_use, popular, categories):
+    return {
+        "team_size": size,
+        "technology_diversity": {
+            "total_technologies_used": in_use,
+            "most_popular_technologies": popular,
+            "category_breakdown": categories,
+        },
+    }
+
+
+def team_technology_report():
+    """Team-wide technology usage report"""
+    return _team_technology_payload(
+        team_size(),
+        team_technologies_in_use(),
+        team_popular_technologies(),
+        team_category_breakdown(),
+    )
+
+
+def _usage(obj):
+    usage = getattr(obj, "usage_rollup", None)
+    return {
+        "tickets": usage.ticket_count if usage else 0,
+        "team_members_using": usage.se_user_count if usage else 0,
+    }
+
+
+def project_progress(project):
+    tickets = project.tickets.all()
+    return {
+        "total_tickets": project.total_tickets,
+        "completed": project.completed_tickets,
+        "in_progress": tickets.filter(status="in_progress").count(),
+        "staging": tickets.filter(status="staging").count(),
+    }
+
+
+def project_technology_and_contributors(project):
+    tickets = project.tickets.prefetch_related("owner", "assigned_users")
+
+    contributors = set()
+    for ticket in tickets:
+        if ticket.owner:
+            contributors.add(ticket.owner.username)
+        for user in ticket.assigned_users.all():
+            contributors.add(user.username)
+
+    # Technology usage in this project, named from the catalog
+    uses = _technology_uses(TicketTechnology.objects.filter(ticket__project=project))
+    catalog = get_catalog(uses)
+    tech_usage = {catalog.technologies[pk].name: n for pk, n in uses.items()}
+
+    return (
+        dict(sorted(tech_usage.items(), key=lambda x: x[1], reverse=True)),
+        list(contributors),
+    )
+
+
+def project_recent_activity(project):
+    return [
+        {
+            "ticket_id": t.ticket_id,
+            "title": t.title,
+            "status": t.status,
+            "owner": t.owner.username if t.owner else None,
+            "updated": t.modified_at.isoformat(),
+        }
+        for t in project.tickets.select_related("owner").order_by("-modified_at")[:10]
+    ]
+
+
+def _project_payload(project, progress, stack_and_contributors, recent):
+    technology_stack, contributors = stack_and_contributors
+    return {
+        "project": {
+            "name": project.name,
+            "description": project.description,
+            "completion_percentage": project.completion_percentage,
+        },
+        "progress": progress,
+        "technology_stack": technology_stack,
+        "contributors": contributors,
+        "recent_activity": recent,
+    }
+
+
+def project_report(project):
+    """Detailed project report with technology analysis"""
+    return _project_payload(
+        project,
+        project_progress(project),
+        project_technology_and_contributors(project),
+        project_recent_activity(project),
+    )
+
+
+# Async variants for ASGI deployments. Each independent piece runs in its own
+# worker thread with its own database connection, so the aggregates overlap
+# instead of running back to back.
+
+
+def _run_piece(piece, *args):
+    close_old_connections()
+    try:
+        return piece(*args)
+    finally:
+        close_old_connections()
+
+
+async def _gather(*calls):
+    """Run (piece, *args) tuples concurrently and return results in order"""
+    return await asyncio.gather(
+        *(sync_to_async(_run_piece, thread_sensitive=False)(*call) for call in calls)
+    )
+
+
+async def aindividual_report(user):
+    # A subquery each, since the pieces compile their SQL on separate threads
+    summary, expertise, contributions, recent = await _gather(
+        (individual_summary, _user_ticket_ids(user)),
+        (individual_technology_expertise, _user_ticket_ids(user)),
+        (individual_project_contributions, _user_ticket_ids(user)),
+        (individual_recent_work, _user_ticket_ids(user)),
+    )
+    return {
+        "user": user.get_full_name() or user.username,
+        "summary": summary,
+        "technology_expertise": expertise,
+        "project_contributions": contributions,
+        "recent_work": recent,
+    }
+
+
+async def ateam_technology_report():
+    return _team_technology_payload(
+        *await _gather(
+            (team_size,),
+            (team_technologies_in_use,),
+            (team_popular_technologies,),
+            (team_category_breakdown,),
+        )
+    )
+
+
+async def aproject_report(project):
+    return _project_payload(
+        project,
+        *await _gather(
+            (project_progress, project),
+            (project_technology_and_contributors, project),
+            (project_recent_activity, project),
+        ),
+    )
@@ -0,0 +1,251 @@
+"""
+Incrementally maintained technology usage rollups.
+
+TechnologyUsage/CategoryUsage hold ticket counts and distinct S.E. user
+counts; the per-user tables hold reference counts so a user stops counting
+towards a technology only once their last ticket using it goes away. The
+m2m/delete signals in tickets.signals feed changes in through
+``record_links`` and ``record_assignments``; code that writes through rows
+with bulk_create must call them itself. ``rebuild`` recomputes everything.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from tickets.models import (
+    CategoryUsage,
+    CategoryUserUsage,
+    Technology,
+    TechnologyCategory,
+    TechnologyUsage,
+    TechnologyUserUsage,
+    Ticket,
+)
+
+TicketTechnology = Ticket.technologies.through
+TicketAssignee = Ticket.assigned_users.through
+
+LEVELS = (
+    (TechnologyUsage, TechnologyUserUsage, "technology_id"),
+    (CategoryUsage, CategoryUserUsage, "category_id"),
+)
+
+
+def record_links(links, sign=1):
+    """Apply (ticket_id, technology_id) links being added (+1) or removed (-1)"""
+    links = list(links)
+    if not links:
+        return
+    assignees = defaultdict(list)
+    for ticket_id, user_id in TicketAssignee.objects.filter(
+        ticket_id__in={ticket_id for ticket_id, _ in links}
+    ).values_list("ticket_id", "user_id"):
+        assignees[ticket_id].append(user_id)
+
+    tickets, users = Counter(), Counter()
+    for ticket_id, technology_id in links:
+        tickets[technology_id] += sign
+        for user_id in assignees[ticket_id]:
+            users[technology_id, user_id] += sign
+    _apply(tickets, users)
+
+
+def record_assignments(assignments, sign=1):
+    """Apply (ticket_id, user_id) assignments being added (+1) or removed (-1)"""
+    assignments = list(assignments)
+    if not assignments:
+        return
+    technologies = defaultdict(list)
+    for ticket_id, technology_id in TicketTechnology.objects.filter(
+        ticket_id__in={ticket_id for ticket_id, _ in assignments}
+    ).values_list("ticket_id", "technology_id"):
+        technologies[ticket_id].append(technology_id)
+
+    users = Counter()
+    for ticket_id, user_id in assignments:
+        for technology_id in technologies[ticket_id]:
+            users[technology_id, user_id] += sign
+    _apply(Counter(), users)
+
+
+def refresh_user(user_id):
+    """Recount S.E. users wherever a user appears, e.g. after is_se_team flips"""
+    for usage_model, user_model, key in LEVELS:
+        keys = user_model.objects.filter(user_id=user_id).values_list(key, flat=True)
+        _refresh_se_user_counts(usage_model, user_model, key, set(keys))
+
+
+def refresh_categories(category_ids):
+    """Re-derive category rows from technology rows, e.g. after a recategorization"""
+    category_ids = {c for c in category_ids if c is not None}
+    with transaction.atomic():
+        totals = dict(
+            TechnologyUsage.objects.filter(technology__category_id__in=category_ids)
+            .values_list("technology__category_id")
+            .annotate(n=Sum("ticket_count"))
+        )
+        CategoryUsage.objects.filter(category_id__in=category_ids).delete()
+        CategoryUsage.objects.bulk_create(
+            [
+                CategoryUsage(category_id=c, ticket_count=totals.get(c, 0))
+                for c in category_ids
+            ]
+        )
+        CategoryUserUsage.objects.filter(category_id__in=category_ids).delete()
+        CategoryUserUsage.objects.bulk_create(
+            [
+                CategoryUserUsage(
+                    category_id=category_id, user_id=user_id, ticket_count=n
+                )
+                for category_id, user_id, n in TechnologyUserUsage.objects.filter(
+                    technology__category_id__in=category_ids
+                )
+                .values_list("technology__category_id", "user_id")
+                .annotate(n=Sum("ticket_count"))
+            ]
+        )
+        _refresh_se_user_counts(
+            CategoryUsage, CategoryUserUsage, "category_id", category_ids
+        )
+
+
+def rebuild():
+    """Recompute every rollup table from the through tables"""
+    category_of = dict(Technology.objects.values_list("id", "category_id"))
+    tech_tickets = Counter(
+        dict(
+            TicketTechnology.objects.values_list("technology_id").annotate(
+                n=Count("id")
+            )
+        )
+    )
+    tech_users = Counter()
+    for technology_id, user_id, n in (
+        TicketTechnology.objects.filter(ticket__assigned_users__isnull=False)
+        .values_list("technology_id", "ticket__assigned_users")
+        .annotate(n=Count("id"))
+    ):
+        tech_users[technology_id, user_id] = n
+    category_tickets, category_users = _by_category(
+        category_of, tech_tickets, tech_users
+    )
+
+    with transaction.atomic():
+        for usage_model, user_model, _ in LEVELS:
+            user_model.objects.all().delete()
+            usage_model.objects.all().delete()
+        TechnologyUsage.objects.bulk_create(
+            [
+                TechnologyUsage(technology_id=t, ticket_count=tech_tickets[t])
+                for t in category_of
+            ],
+            batch_size=500,
+        )
+        CategoryUsage.objects.bulk_create(
+            [
+                CategoryUsage(category_id=c, ticket_count=category_tickets[c])
+                for c in TechnologyCategory.objects.values_list("id", flat=True)
+            ],
+            batch_size=500,
+        )
+        for (user_model, key), deltas in (
+            ((TechnologyUserUsage, "technology_id"), tech_users),
+            ((CategoryUserUsage, "category_id"), category_users),
+        ):
+            user_model.objects.bulk_create(
+                [
+                    user_model(**{key: k, "user_id": u, "ticket_count": n})
+                    for (k, u), n in deltas.items()
+                ],
+                batch_size=500,
+            )
+        for usage_model, user_model, key in LEVELS:
+            _refresh_se_user_counts(usage_model, user_model, key, None)
+    return {
+        "technologies": len(category_of),
+        "technology_users": len(tech_users),
+        "category_users": len(category_users),
+    }
+
+
+def _by_category(category_of, tech_tickets, tech_users):
+    category_tickets, category_users = Counter(), Counter()
+    for technology_id, n in tech_tickets.items():
+        if technology_id in category_of:
+            category_tickets[category_of[technology_id]] += n
+    for (technology_id, user_id), n in tech_users.items():
+        if technology_id in category_of:
+            category_users[category_of[technology_id], user_id] += n
+    return category_tickets, category_users
+
+
+def _apply(tech_tickets, tech_users):
+    tech_ids = set(tech_tickets) | {t for t, _ in tech_users}
+    category_of = dict(
+        Technology.objects.filter(id__in=tech_ids).values_list("id", "category_id")
+    )
+    tech_tickets = Counter({t: n for t, n in tech_tickets.items() if t in category_of})
+    tech_users = Counter({k: n for k, n in tech_users.items() if k[0] in category_of})
+    category_tickets, category_users = _by_category(
+        category_of, tech_tickets, tech_users
+    )
+
+    with transaction.atomic():
+        _apply_level(*LEVELS[0], tech_tickets, tech_users)
+        _apply_level(*LEVELS[1], category_tickets, category_users)
+
+
+def _apply_level(usage_model, user_model, key, ticket_deltas, user_deltas):
+    keys = set(ticket_deltas) | {k for k, _ in user_deltas}
+    if not keys:
+        return
+    # Make sure every row exists, then move counts with UPDATE ... SET x = x + n
+    # so the row locks are taken before anything is read back
+    usage_model.objects.bulk_create(
+        [usage_model(**{key: k}) for k in keys], ignore_conflicts=True
+    )
+    user_model.objects.bulk_create(
+        [user_model(**{key: k, "user_id": u}) for k, u in user_deltas],
+        ignore_conflicts=True,
+    )
+
+    by_delta = defaultdict(list)
+    for k, n in ticket_deltas.items():
+        if n:
+            by_delta[n].append(k)
+    for n, group in by_delta.items():
+        usage_model.objects.filter(pk__in=group).update(
+            ticket_count=F("ticket_count") + n
+        )
+
+    by_delta = defaultdict(list)
+    for (k, user_id), n in user_deltas.items():
+        if n:
+            by_delta[n, k].append(user_id)
+    for (n, k), user_ids in by_delta.items():
+        user_model.objects.filter(**{key: k}, user_id__in=user_ids).update(
+            ticket_count=F("ticket_count") + n
+        )
+
+    _refresh_se_user_counts(usage_model, user_model, key, keys)
+
+
+def _refresh_se_user_counts(usage_model, user_model, key, keys):
+    """Recount distinct S.E. users with a positive reference count"""
+    se_users = (
+        user_model.objects.filter(
+            **{key: OuterRef("pk")}, ticket_count__gt=0, user__is_se_team=True
+        )
+        .values(key)
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    rows = usage_model.objects.all()
+    if keys is not None:
+        if not keys:
+            return
+        rows = rows.filter(pk__in=keys)
+    rows.update(se_user_count=Coalesce(Subquery(se_users), 0))
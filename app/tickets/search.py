@@ -0,0 +1,190 @@
+"""
+Full-text ticket search.
+
+On SQLite builds with FTS5 compiled in, tickets are indexed in an FTS5 table
+keyed by the ticket's primary key and ranked with bm25(); the index is kept in
+sync by the receivers in tickets.signals. Other databases (and SQLite builds
+without FTS5) fall back to an icontains scan so the API behaves the same
+everywhere.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from tickets.models import Ticket
+
+FTS_TABLE = "tickets_ticket_fts"
+FTS_COLUMNS = ("ticket_id", "title", "description", "details", "reporter_name")
+
+# Free-text fields from the ticket and its subtype rows, folded into "details"
+TICKET_DETAIL_FIELDS = ("business_impact",)
+SUBTYPE_DETAIL_FIELDS = {
+    "bugreport": (
+        "steps_to_reproduce",
+        "expected_results",
+        "actual_results",
+        "url_location",
+        "browser_device",
+    ),
+    "featurerequest": (
+        "current_situation",
+        "desired_functionality",
+        "success_criteria",
+        "business_value",
+    ),
+    "task": ("detailed_description", "acceptance_criteria"),
+}
+
+
+# Whether the SQLite library has FTS5; probed once per process
+_fts5_available = None
+
+
+def fts_enabled():
+    global _fts5_available
+    if connection.vendor != "sqlite":
+        return False
+    if _fts5_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            _fts5_available = ("ENABLE_FTS5",) in cursor.fetchall()
+    return _fts5_available
+
+
+def create_index():
+    """Create the FTS5 table if it does not exist yet"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='porter unicode61')"
+        )
+
+
+def _details(ticket):
+    parts = [getattr(ticket, field) for field in TICKET_DETAIL_FIELDS]
+    for subtype, fields in SUBTYPE_DETAIL_FIELDS.items():
+        detail = getattr(ticket, subtype, None)
+        if detail is not None:
+            parts.extend(getattr(detail, field) for field in fields)
+    return "\n".join(part for part in parts if part)
+
+
+def index_tickets(ticket_ids):
+    """(Re)index the given tickets, dropping any that no longer exist"""
+    ticket_ids = list(ticket_ids)
+    if not fts_enabled() or not ticket_ids:
+        return
+    tickets = Ticket.objects.filter(id__in=ticket_ids).select_related(
+        *SUBTYPE_DETAIL_FIELDS
+    )
+    rows = [
+        (t.id, t.ticket_id, t.title, t.description, _details(t), t.reporter_name)
+        for t in tickets
+    ]
+    remove_tickets(ticket_ids)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_tickets(ticket_ids):
+    ticket_ids = list(ticket_ids)
+    if not fts_enabled() or not ticket_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(ticket_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ticket_ids
+        )
+
+
+def rebuild_index(batch_size=1000):
+    """Drop and repopulate the whole index; returns the number of tickets"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    create_index()
+    ids = list(Ticket.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), batch_size):
+        index_tickets(ids[start : start + batch_size])
+    return len(ids)
+
+
+def _match_expression(query):
+    # Quote every word so user input can never be parsed as FTS5 syntax
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", query))
+
+
+def search_ticket_ids(query, limit=None):
+    """Return (ticket pk, rank) pairs, best match first"""
+    if not fts_enabled():
+        return _fallback_search(query, limit)
+    expression = _match_expression(query)
+    if not expression:
+        return []
+    sql = (
+        f"SELECT rowid, bm25({FTS_TABLE}) AS rank FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s ORDER BY rank"
+    )
+    params = [expression]
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # bm25() is lower-is-better; flip it so callers can treat it as a score
+        return [(pk, -rank) for pk, rank in cursor.fetchall()]
+
+
+def search_filter(query):
+    """
+    A Q matching the tickets ``query`` finds, unranked, evaluated by the
+    database as a subquery so the matching ids never reach Python
+    """
+    if not fts_enabled():
+        tickets = _fallback_queryset(query)
+        return Q(pk__in=tickets.values("id")) if tickets is not None else Q(pk=None)
+    expression = _match_expression(query)
+    if not expression:
+        return Q(pk=None)
+    return Q(
+        pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            [expression],
+        )
+    )
+
+
+def _fallback_queryset(query):
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    tickets = Ticket.objects.all()
+    for term in terms:
+        match = Q(ticket_id__icontains=term) | Q(reporter_name__icontains=term)
+        for field in ("title", "description", *TICKET_DETAIL_FIELDS):
+            match |= Q(**{f"{field}__icontains": term})
+        for subtype, fields in SUBTYPE_DETAIL_FIELDS.items():
+            for field in fields:
+                match |= Q(**{f"{subtype}__{field}__icontains": term})
+        tickets = tickets.filter(match)
+    return tickets
+
+
+def _fallback_search(query, limit):
+    tickets = _fallback_queryset(query)
+    if tickets is None:
+        return []
+    ids = tickets.values_list("id", flat=True)
+    if limit is not None:
+        ids = ids[:limit]
+    return [(pk, 0.0) for pk in ids]
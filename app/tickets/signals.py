@@ -0,0 +1,309 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from tickets import catalog, rollups, search
+from tickets.conditional import CATALOG, TICKETS, USERS
+from tickets.models import (
+    Attachment,
+    Blob,
+    BugReport,
+    DataVersion,
+    FeatureRequest,
+    Project,
+    Task,
+    Technology,
+    TechnologyCategory,
+    Ticket,
+)
+from tickets.report_cache import invalidate_all_reports, invalidate_reports
+from tickets.storage import blob_digest
+
+User = get_user_model()
+
+
+# Usage rollups. These are connected before the cache receivers so reports
+# are never rebuilt from counts that have not been adjusted yet.
+
+
+@receiver(m2m_changed, sender=Ticket.technologies.through)
+@receiver(m2m_changed, sender=Ticket.assigned_users.through)
+def rollup_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_clear", "pre_remove", "post_add"):
+        return
+    other = "user_id" if sender is Ticket.assigned_users.through else "technology_id"
+    if reverse:
+        rows = sender.objects.filter(**{other: instance.pk})
+        if action == "post_add":
+            pairs = [(ticket_id, instance.pk) for ticket_id in pk_set]
+        elif action == "pre_remove":
+            pairs = rows.filter(ticket_id__in=pk_set).values_list("ticket_id", other)
+        else:
+            pairs = rows.values_list("ticket_id", other)
+    else:
+        rows = sender.objects.filter(ticket_id=instance.pk)
+        if action == "post_add":
+            pairs = [(instance.pk, pk) for pk in pk_set]
+        elif action == "pre_remove":
+            # pk_set is whatever was passed to remove(), linked or not
+            pairs = rows.filter(**{f"{other}__in": pk_set}).values_list(
+                "ticket_id", other
+            )
+        else:
+            pairs = rows.values_list("ticket_id", other)
+
+    record = rollups.record_assignments if other == "user_id" else rollups.record_links
+    record(pairs, 1 if action == "post_add" else -1)
+
+
+@receiver(pre_delete, sender=Ticket)
+def rollup_ticket_deleted(sender, instance, **kwargs):
+    rollups.record_links(
+        Ticket.technologies.through.objects.filter(ticket_id=instance.pk).values_list(
+            "ticket_id", "technology_id"
+        ),
+        -1,
+    )
+
+
+@receiver(pre_delete, sender=Technology)
+def rollup_technology_deleted(sender, instance, **kwargs):
+    rollups.record_links(
+        Ticket.technologies.through.objects.filter(
+            technology_id=instance.pk
+        ).values_list("ticket_id", "technology_id"),
+        -1,
+    )
+
+
+@receiver(pre_delete, sender=User)
+def rollup_user_deleted(sender, instance, **kwargs):
+    rollups.record_assignments(
+        Ticket.assigned_users.through.objects.filter(user_id=instance.pk).values_list(
+            "ticket_id", "user_id"
+        ),
+        -1,
+    )
+
+
+@receiver(post_init, sender=Technology)
+def remember_technology_category(sender, instance, **kwargs):
+    instance._rollup_category_id = instance.__dict__.get("category_id")
+
+
+@receiver(post_save, sender=Technology)
+def rollup_technology_saved(sender, instance, created, **kwargs):
+    old_category_id = instance._rollup_category_id
+    if not created and old_category_id != instance.category_id:
+        rollups.refresh_categories([old_category_id, instance.category_id])
+    instance._rollup_category_id = instance.category_id
+
+
+@receiver(post_init, sender=User)
+def remember_se_team(sender, instance, **kwargs):
+    instance._rollup_is_se_team = instance.__dict__.get("is_se_team")
+
+
+@receiver(post_save, sender=User)
+def rollup_user_saved(sender, instance, created, **kwargs):
+    if not created and instance._rollup_is_se_team != instance.is_se_team:
+        rollups.refresh_user(instance.pk)
+    instance._rollup_is_se_team = instance.is_se_team
+
+
+# Report cache invalidation
+
+
+def invalidate_ticket_reports(ticket_ids, user_ids=(), project_ids=()):
+    """Invalidate reports covering the given tickets plus any extra users/projects"""
+    ticket_ids = list(ticket_ids)
+    user_ids = set(user_ids)
+    project_ids = set(project_ids)
+    if ticket_ids:
+        tickets = Ticket.objects.filter(id__in=ticket_ids)
+        for owner_id, project_id in tickets.values_list("owner_id", "project_id"):
+            user_ids.add(owner_id)
+            project_ids.add(project_id)
+        user_ids.update(
+            Ticket.assigned_users.through.objects.filter(
+                ticket_id__in=ticket_ids
+            ).values_list("user_id", flat=True)
+        )
+    user_ids.discard(None)
+    usernames = User.objects.filter(id__in=user_ids).values_list("username", flat=True)
+    invalidate_reports(usernames=list(usernames), project_ids=project_ids)
+
+
+@receiver(post_init, sender=Ticket)
+def remember_report_scope(sender, instance, **kwargs):
+    # Keep the loaded owner/project so a reassignment also refreshes the old ones
+    instance._report_scope = (
+        instance.__dict__.get("owner_id"),
+        instance.__dict__.get("project_id"),
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def ticket_saved(sender, instance, **kwargs):
+    old_owner_id, old_project_id = instance._report_scope
+    invalidate_ticket_reports(
+        [instance.pk], user_ids=[old_owner_id], project_ids=[old_project_id]
+    )
+    instance._report_scope = (instance.owner_id, instance.project_id)
+
+
+@receiver(pre_delete, sender=Ticket)
+def ticket_deleted(sender, instance, **kwargs):
+    # Assignments are cascaded away before post_delete, so collect them now
+    invalidate_ticket_reports([instance.pk])
+
+
+@receiver(m2m_changed, sender=Ticket.technologies.through)
+@receiver(m2m_changed, sender=Ticket.assigned_users.through)
+def ticket_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_clear", "post_add", "post_remove"):
+        return
+    assignments = sender is Ticket.assigned_users.through
+    if not reverse:
+        # Removed assignees are no longer linked, so name them explicitly
+        extra_users = pk_set if assignments and pk_set else ()
+        invalidate_ticket_reports([instance.pk], user_ids=extra_users)
+    elif action == "pre_clear":
+        ticket_ids = sender.objects.filter(
+            **{f"{instance._meta.model_name}_id": instance.pk}
+        ).values_list("ticket_id", flat=True)
+        extra_users = [instance.pk] if assignments else ()
+        invalidate_ticket_reports(ticket_ids, user_ids=extra_users)
+    else:
+        extra_users = [instance.pk] if assignments else ()
+        invalidate_ticket_reports(pk_set or (), user_ids=extra_users)
+
+
+@receiver(post_save, sender=Technology)
+@receiver(post_delete, sender=Technology)
+@receiver(post_save, sender=TechnologyCategory)
+@receiver(post_delete, sender=TechnologyCategory)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def catalog_changed(sender, **kwargs):
+    # Names show up in every report, so start a fresh cache generation
+    invalidate_all_reports()
+
+
+# Change counters behind the ETags in tickets.conditional
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(m2m_changed, sender=Ticket.technologies.through)
+@receiver(m2m_changed, sender=Ticket.assigned_users.through)
+# Subtype text is searchable, so it is part of what TICKETS versions
+@receiver(post_save, sender=BugReport)
+@receiver(post_save, sender=FeatureRequest)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=BugReport)
+@receiver(post_delete, sender=FeatureRequest)
+@receiver(post_delete, sender=Task)
+def bump_tickets(sender, action=None, **kwargs):
+    if action in (None, "post_add", "post_remove", "post_clear"):
+        DataVersion.bump(TICKETS)
+
+
+@receiver(post_save, sender=Technology)
+@receiver(post_delete, sender=Technology)
+@receiver(post_save, sender=TechnologyCategory)
+@receiver(post_delete, sender=TechnologyCategory)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(m2m_changed, sender=Project.members.through)
+def bump_catalog(sender, action=None, **kwargs):
+    if action in (None, "post_add", "post_remove", "post_clear"):
+        DataVersion.bump(CATALOG)
+        # Other processes notice the new version; this one reloads right away
+        catalog.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_users(sender, update_fields=None, **kwargs):
+    # Logging in saves last_login, which no endpoint shows
+    if update_fields is None or set(update_fields) != {"last_login"}:
+        DataVersion.bump(USERS)
+
+
+# Process-local technology catalog (tickets.catalog)
+
+
+@receiver(request_started)
+def expire_catalog(sender, **kwargs):
+    # Each request compares the catalog version once, on first use
+    catalog.expire()
+
+
+# Full-text search index
+
+
+def create_search_index(sender, **kwargs):
+    search.create_index()
+
+
+@receiver(post_save, sender=Ticket)
+def index_ticket(sender, instance, **kwargs):
+    search.index_tickets([instance.pk])
+
+
+@receiver(post_delete, sender=Ticket)
+def unindex_ticket(sender, instance, **kwargs):
+    search.remove_tickets([instance.pk])
+
+
+@receiver(post_save, sender=BugReport)
+@receiver(post_save, sender=FeatureRequest)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=BugReport)
+@receiver(post_delete, sender=FeatureRequest)
+@receiver(post_delete, sender=Task)
+def index_ticket_details(sender, instance, **kwargs):
+    search.index_tickets([instance.ticket_id])
+
+
+# Attachment blob reference counts
+
+
+@receiver(post_init, sender=Attachment)
+def remember_blob(sender, instance, **kwargs):
+    instance._stored_blob_id = instance.__dict__.get("blob_id")
+
+
+@receiver(pre_save, sender=Attachment)
+def store_attachment(sender, instance, **kwargs):
+    # Store a new upload now rather than in FileField.pre_save, so the row
+    # can be pointed at its blob before it is written
+    if instance.file and not instance.file._committed:
+        instance.file.save(instance.file.name, instance.file.file, save=False)
+    digest = blob_digest(instance.file.name)
+    if digest != instance._stored_blob_id:
+        if digest:
+            Blob.retain(digest, instance.file.size)
+        instance.blob_id = digest
+
+
+@receiver(post_save, sender=Attachment)
+def release_replaced_blob(sender, instance, **kwargs):
+    if instance._stored_blob_id and instance._stored_blob_id != instance.blob_id:
+        Blob.release(instance._stored_blob_id)
+    instance._stored_blob_id = instance.blob_id
+
+
+@receiver(post_delete, sender=Attachment)
+def release_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        Blob.release(instance.blob_id)
@@ -0,0 +1,122 @@
+"""
+Content-addressed attachment storage.
+
+Every file is stored once under the SHA-256 of its bytes, so the same
+screenshot attached to twenty tickets takes the space of one. Uploads are
+hashed while Django receives them (HashingFileUploadHandler) and moved into
+place without being read again; other content is streamed to a temporary
+file in chunks and hashed on the way. Attachment rows share a Blob row that
+counts its references, and ``prune_blobs`` removes unreferenced files.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.utils.deconstruct import deconstructible
+
+PREFIX = "attachments/sha256"
+
+
+def blob_name(digest):
+    """Storage name for a SHA-256 hex digest, fanned out over two levels"""
+    return f"{PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def blob_digest(name):
+    """The digest a storage name was derived from, or None for other names"""
+    head, _, digest = (name or "").rpartition("/")
+    if len(digest) == 64 and head == f"{PREFIX}/{digest[:2]}/{digest[2:4]}":
+        return digest
+    return None
+
+
+def attachment_storage():
+    return storages["attachments"]
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Write uploads straight to a temporary file, hashing each chunk as it
+    arrives. The digest is left on the uploaded file as ``sha256``.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+@deconstructible(path="tickets.storage.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names new files by the SHA-256 of their content"""
+
+    def get_available_name(self, name, max_length=None):
+        # The name is replaced by the content address in _save, and equal
+        # names mean equal bytes, so there is nothing to de-conflict
+        return name
+
+    def _save(self, name, content):
+        digest = getattr(content, "sha256", None)
+        spooled = not (digest and hasattr(content, "temporary_file_path"))
+        if spooled:
+            digest, temp_path = self._spool(content)
+        else:
+            temp_path = content.temporary_file_path()
+
+        name = blob_name(digest)
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            # Already stored. Touch it so prune_blobs' grace period covers
+            # the Attachment row about to reference it.
+            os.utime(full_path)
+            if spooled:
+                os.remove(temp_path)
+            return name
+
+        self._makedirs(os.path.dirname(full_path))
+        # Concurrent writers of the same digest move identical bytes into
+        # place, so whichever lands last is as good as the first
+        file_move_safe(temp_path, full_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+    def _spool(self, content):
+        """Copy content to a temporary file beside the blobs, hashing as it goes"""
+        directory = self.path(PREFIX)
+        self._makedirs(directory)
+        hasher = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    hasher.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return hasher.hexdigest(), temp_path
+
+    def _makedirs(self, directory):
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
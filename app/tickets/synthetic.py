@@ -0,0 +1,323 @@
+"""
+Synthetic data for load testing and benchmarks.
+
+Everything is written with bulk_create, so none of the model signals fire;
+``generate`` refreshes the usage rollups, the search index, the report
+cache, the blob reference counts and the ETag counters itself once the rows
+are in. Attachments share a few tiny placeholder PNGs that are written
+through the attachment storage, so downloading one works like a real upload.
+"""
+
+import random
+import struct
+import zlib
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tickets import rollups, search
+from tickets.conditional import CATALOG, TICKETS, USERS
+from tickets.models import (
+    Attachment,
+    Blob,
+    BugReport,
+    DataVersion,
+    FeatureRequest,
+    Project,
+    Task,
+    Technology,
+    TechnologyCategory,
+    Ticket,
+)
+from tickets.report_cache import invalidate_all_reports
+from tickets.storage import attachment_storage, blob_digest
+
+User = get_user_model()
+
+CATEGORY_NAMES = [
+    "Backend",
+    "Frontend",
+    "Database",
+    "Infrastructure",
+    "Data",
+    "Mobile",
+    "Security",
+    "Tooling",
+]
+WORDS = (
+    "catalogue condition report export import search gallery thumbnail "
+    "loan accession record image upload login permission dashboard sync "
+    "archive metadata storage label barcode inventory schedule audit"
+).split()
+DEPARTMENTS = ["Conservation", "Operations", "Registrar", "Curatorial", "Finance"]
+PLACEHOLDER_COLORS = [
+    (0xD9, 0x48, 0x3B),
+    (0x3B, 0x82, 0xD9),
+    (0x4C, 0xAF, 0x50),
+    (0xF2, 0xB1, 0x34),
+    (0x8E, 0x44, 0xAD),
+    (0x7F, 0x8C, 0x8D),
+]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _ensure(model, names, build):
+    """Create any missing rows by unique name, returning all of them"""
+    existing = set(model.objects.filter(name__in=names).values_list("name", flat=True))
+    model.objects.bulk_create([build(name) for name in names if name not in existing])
+    return list(model.objects.filter(name__in=names))
+
+
+def ensure_catalog(rng, projects=20, categories=8, technologies=60):
+    category_names = (CATEGORY_NAMES * (categories // len(CATEGORY_NAMES) + 1))[
+        :categories
+    ]
+    category_names = [
+        name if i < len(CATEGORY_NAMES) else f"{name} {i}"
+        for i, name in enumerate(category_names)
+    ]
+    category_rows = _ensure(
+        TechnologyCategory,
+        category_names,
+        lambda name: TechnologyCategory(
+            name=name, color=f"#{rng.randrange(0x1000000):06x}"
+        ),
+    )
+    technology_rows = _ensure(
+        Technology,
+        [f"Tech {i:03d}" for i in range(technologies)],
+        lambda name: Technology(name=name, category=rng.choice(category_rows)),
+    )
+    project_rows = _ensure(
+        Project,
+        [f"Project {i:03d}" for i in range(projects)],
+        lambda name: Project(name=name, description=_sentence(rng, 12)),
+    )
+    return project_rows, technology_rows
+
+
+def ensure_users(users=50, se_ratio=0.3):
+    names = [f"user{i:04d}" for i in range(users)]
+    existing = set(
+        User.objects.filter(username__in=names).values_list("username", flat=True)
+    )
+    se_count = int(users * se_ratio)
+    User.objects.bulk_create(
+        [
+            User(username=name, is_se_team=i < se_count, first_name=f"User {i}")
+            for i, name in enumerate(names)
+            if name not in existing
+        ]
+    )
+    rows = list(User.objects.filter(username__in=names))
+    return [u for u in rows if u.is_se_team], [u for u in rows if not u.is_se_team]
+
+
+def _subtype(rng, ticket):
+    if ticket.ticket_type == "bug":
+        return BugReport(
+            ticket=ticket,
+            category=rng.choice(BugReport.CATEGORY_CHOICES)[0],
+            url_location=f"https://intranet.example.com/{rng.choice(WORDS)}/",
+            browser_device=rng.choice(["Chrome", "Firefox", "Safari", "Edge"]),
+            steps_to_reproduce=_sentence(rng, 20),
+            expected_results=_sentence(rng, 8),
+            actual_results=_sentence(rng, 8),
+        )
+    if ticket.ticket_type == "feature":
+        return FeatureRequest(
+            ticket=ticket,
+            category=rng.choice(FeatureRequest.CATEGORY_CHOICES)[0],
+            current_situation=_sentence(rng, 15),
+            desired_functionality=_sentence(rng, 20),
+            success_criteria=_sentence(rng, 10),
+            business_value=_sentence(rng, 10),
+        )
+    return Task(
+        ticket=ticket,
+        task_type=rng.choice(Task.TASK_TYPE_CHOICES)[0],
+        detailed_description=_sentence(rng, 25),
+        acceptance_criteria=_sentence(rng, 10),
+    )
+
+
+def _png(color):
+    """A valid 1x1 PNG of a single RGB colour"""
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(b"\x00" + bytes(color))),
+            chunk(b"IEND", b""),
+        ]
+    )
+
+
+def store_placeholders():
+    """
+    Write the placeholder screenshots to the attachment storage (a no-op for
+    ones already there). Returns [(storage name, size)].
+    """
+    storage = attachment_storage()
+    placeholders = []
+    for color in PLACEHOLDER_COLORS:
+        data = _png(color)
+        placeholders.append(
+            (storage.save("screenshot.png", ContentFile(data)), len(data))
+        )
+    return placeholders
+
+
+def _retain_blobs(attachments, sizes):
+    for digest, count in Counter(a.blob_id for a in attachments).items():
+        if not Blob.objects.filter(sha256=digest).update(
+            ref_count=F("ref_count") + count
+        ):
+            Blob.objects.create(sha256=digest, size=sizes[digest], ref_count=count)
+
+
+def _insert_tickets(
+    rng,
+    count,
+    projects,
+    technologies,
+    se_users,
+    others,
+    attachment_ratio,
+    placeholders,
+):
+    now = timezone.now()
+    statuses = [choice for choice, _ in Ticket.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Ticket.PRIORITY_CHOICES]
+    types = [choice for choice, _ in Ticket.TICKET_TYPE_CHOICES]
+    reporters = others or se_users
+
+    tickets = []
+    for ticket_id in Ticket.allocate_ticket_ids(count):
+        reporter = rng.choice(reporters)
+        tickets.append(
+            Ticket(
+                ticket_id=ticket_id,
+                title=_sentence(rng, 6),
+                description=_sentence(rng, 30),
+                ticket_type=rng.choice(types),
+                project=rng.choice(projects),
+                status=rng.choices(statuses, weights=[3, 3, 4, 6, 1, 1])[0],
+                priority=rng.choices(priorities, weights=[1, 3, 5, 3])[0],
+                reporter=reporter,
+                reporter_name=reporter.get_full_name() or reporter.username,
+                reporter_contact=f"{reporter.username}@example.com",
+                reporter_department=rng.choice(DEPARTMENTS),
+                owner=rng.choice(se_users) if se_users and rng.random() < 0.8 else None,
+                business_impact=_sentence(rng, 10),
+            )
+        )
+    Ticket.objects.bulk_create(tickets)
+
+    # auto_now/auto_now_add stamp every row with "now"; spread them over a year
+    for ticket in tickets:
+        ticket.created_at = now - timedelta(minutes=rng.randrange(525_600))
+        ticket.modified_at = ticket.created_at + timedelta(
+            minutes=rng.randrange(
+                int((now - ticket.created_at).total_seconds() // 60) + 1
+            )
+        )
+    Ticket.objects.bulk_update(tickets, ["created_at", "modified_at"])
+
+    for model in (BugReport, FeatureRequest, Task):
+        model.objects.bulk_create(
+            [
+                detail
+                for detail in (_subtype(rng, t) for t in tickets)
+                if isinstance(detail, model)
+            ]
+        )
+    Ticket.technologies.through.objects.bulk_create(
+        [
+            Ticket.technologies.through(ticket_id=t.id, technology_id=tech.id)
+            for t in tickets
+            for tech in rng.sample(
+                technologies, k=min(len(technologies), rng.randint(1, 4))
+            )
+        ]
+    )
+    Ticket.assigned_users.through.objects.bulk_create(
+        [
+            Ticket.assigned_users.through(ticket_id=t.id, user_id=user.id)
+            for t in tickets
+            for user in rng.sample(se_users, k=min(len(se_users), rng.randint(0, 3)))
+        ]
+    )
+    attachments = []
+    for t in tickets:
+        if rng.random() < attachment_ratio:
+            name, _ = rng.choice(placeholders)
+            attachments.append(
+                Attachment(
+                    ticket=t,
+                    file=name,
+                    original_name=f"{t.ticket_id}.png",
+                    blob_id=blob_digest(name),
+                )
+            )
+    _retain_blobs(attachments, {blob_digest(n): size for n, size in placeholders})
+    Attachment.objects.bulk_create(attachments)
+    return [t.id for t in tickets]
+
+
+def generate(
+    tickets=1000,
+    projects=20,
+    categories=8,
+    technologies=60,
+    users=50,
+    se_ratio=0.3,
+    attachment_ratio=0.1,
+    batch_size=2000,
+    seed=None,
+):
+    """
+    Add ``tickets`` synthetic tickets (plus any missing catalog rows and users)
+    to the current database. Returns the number of tickets created.
+    """
+    rng = random.Random(seed)
+    project_rows, technology_rows = ensure_catalog(
+        rng, projects, categories, technologies
+    )
+    se_users, others = ensure_users(users, se_ratio)
+    placeholders = store_placeholders() if attachment_ratio > 0 else []
+
+    created = 0
+    while created < tickets:
+        size = min(batch_size, tickets - created)
+        with transaction.atomic():
+            ids = _insert_tickets(
+                rng,
+                size,
+                project_rows,
+                technology_rows,
+                se_users,
+                others,
+                attachment_ratio,
+                placeholders,
+            )
+            search.index_tickets(ids)
+        created += size
+
+    rollups.rebuild()
+    invalidate_all_reports()
+    DataVersion.bump(TICKETS, CATALOG, USERS)
+    return created
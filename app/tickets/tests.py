@@ -1,3 +1,2236 @@
-from django.test import TestCase
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ticket_system.middleware import RequestMetricsMiddleware
+from tickets import analytics, benchmarks, catalog, exports, importer, jobs, search
+from tickets.conditional import CATALOG
+from tickets.models import (
+    Attachment,
+    Blob,
+    BugReport,
+    CategoryUsage,
+    CategoryUserUsage,
+    DataVersion,
+    ImportCheckpoint,
+    Job,
+    Project,
+    Technology,
+    TechnologyCategory,
+    TechnologyUsage,
+    TechnologyUserUsage,
+    Ticket,
+    TicketSequence,
+)
+from tickets.pagination import EstimatedCountPaginator, estimated_row_count
+from tickets.search import search_filter, search_ticket_ids
+from tickets.storage import attachment_storage, blob_name
+
+User = get_user_model()
+request_logger = logging.getLogger("ticket_system.requests")
+
+
+def setUpModule():
+    # Keep one JSON line per request out of the test output
+    request_logger.setLevel(logging.ERROR)
+
+
+def tearDownModule():
+    request_logger.setLevel(logging.NOTSET)
+
+
+def make_ticket(project, **kwargs):
+    fields = {
+        "title": "Search is broken",
+        "description": "Nothing comes back",
+        "ticket_type": "bug",
+        "reporter_name": "Jane Reporter",
+        "reporter_contact": "jane@example.com",
+    }
+    fields.update(kwargs)
+    return Ticket.objects.create(project=project, **fields)
+
+
+def bulk_make_tickets(project, count, owner=None, technologies=(), **kwargs):
+    """Insert ``count`` tickets without per-row saves, linking technologies"""
+    ticket_ids = Ticket.allocate_ticket_ids(count)
+    tickets = Ticket.objects.bulk_create(
+        [
+            Ticket(
+                ticket_id=tid,
+                project=project,
+                owner=owner,
+                title=f"Bulk {tid}",
+                description="Generated",
+                ticket_type="task",
+                reporter_name="Jane Reporter",
+                reporter_contact="jane@example.com",
+                **kwargs,
+            )
+            for tid in ticket_ids
+        ],
+        batch_size=1000,
+    )
+    Ticket.technologies.through.objects.bulk_create(
+        [
+            Ticket.technologies.through(ticket_id=t.id, technology_id=tech.id)
+            for t in tickets
+            for tech in technologies
+        ],
+        batch_size=1000,
+    )
+    return tickets
+
+
+class TicketFixtureMixin:
+    def setUp(self):
+        cache.clear()
+        catalog.invalidate()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = Project.objects.create(name="Collections")
+        cls.category = TechnologyCategory.objects.create(name="Backend")
+        cls.django = Technology.objects.create(name="Django", category=cls.category)
+        cls.se_user = User.objects.create_user("alice", is_se_team=True)
+
+
+class TicketPaginationTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now()
+        for i in range(7):
+            ticket = make_ticket(cls.project, title=f"Ticket {i}")
+            ticket.technologies.add(cls.django)
+        # Force created_at ties so the id tie-breaker is exercised
+        Ticket.objects.update(created_at=now - timedelta(days=1))
+
+    def get_page(self, **params):
+        response = self.client.get("/api/tickets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_walks_forward_and_back_without_gaps(self):
+        expected = list(Ticket.objects.values_list("ticket_id", flat=True))
+
+        seen, cursor = [], None
+        while True:
+            page = self.get_page(limit=3, **({"cursor": cursor} if cursor else {}))
+            seen.extend(t["ticket_id"] for t in page["items"])
+            cursor = page["next"]
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+        first = self.get_page(limit=3)
+        second = self.get_page(limit=3, cursor=first["next"])
+        back = self.get_page(limit=3, cursor=second["prev"])
+        self.assertEqual(back["items"], first["items"])
+        self.assertIsNone(back["prev"])
+
+    def test_filters_apply_within_pages(self):
+        Ticket.objects.filter(title="Ticket 0").update(status="completed")
+        page = self.get_page(status="completed")
+        self.assertEqual([t["title"] for t in page["items"]], ["Ticket 0"])
+        self.assertIsNone(page["next"])
+
+    def test_page_query_count_is_constant(self):
+        first = self.get_page(limit=2)
+        # ETag counters + page + prefetch technologies + prefetch assigned_users
+        with self.assertNumQueries(4):
+            self.client.get("/api/tickets/", {"limit": 2, "cursor": first["next"]})
+
+    def test_rejects_malformed_cursor(self):
+        response = self.client.get("/api/tickets/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+
+class FastTicketListTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        frontend = TechnologyCategory.objects.create(name="Frontend")
+        cls.react = Technology.objects.create(name="React", category=frontend)
+        bob = User.objects.create_user("bob", is_se_team=True)
+        for i in range(5):
+            ticket = make_ticket(
+                cls.project, title=f"Ticket {i}", owner=cls.se_user if i % 2 else None
+            )
+            ticket.technologies.add(cls.react, cls.django)
+            ticket.assigned_users.add(bob, cls.se_user)
+
+    def test_matches_validated_response(self):
+        params = {"limit": 2}
+        while True:
+            expected = self.client.get("/api/tickets/", params).json()
+            with self.settings(TICKET_LIST_FAST_PATH=True):
+                response = self.client.get("/api/tickets/", params)
+            self.assertEqual(response.json(), expected)
+            if not expected["next"]:
+                break
+            params["cursor"] = expected["next"]
+
+    @override_settings(TICKET_LIST_FAST_PATH=True)
+    def test_one_query_for_all_m2m_names(self):
+        self.client.get("/api/tickets/")
+        # ETag counters + page + technologies/assignees UNION ALL
+        with self.assertNumQueries(3):
+            self.client.get("/api/tickets/", {"status": "staging"})
+
+
+class SparseFieldsetTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i in range(3):
+            ticket = make_ticket(cls.project, title=f"Ticket {i}", owner=cls.se_user)
+            ticket.technologies.add(cls.django)
+            ticket.assigned_users.add(cls.se_user)
+
+    def get(self, **params):
+        response = self.client.get("/api/tickets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_fields_limit_columns_and_joins(self):
+        self.get()
+        with CaptureQueriesContext(connection) as ctx:
+            page = self.get(fields="ticket_id,status", limit=2)
+        # ETag counters + page, no joins or prefetches
+        self.assertEqual(len(ctx.captured_queries), 2)
+        sql = ctx.captured_queries[1]["sql"]
+        self.assertNotIn("description", sql)
+        self.assertNotIn("JOIN", sql)
+        self.assertEqual(set(page["items"][0]), {"id", "ticket_id", "status"})
+
+        # Cursors still work on a sparse page
+        rest = self.get(fields="ticket_id,status", limit=2, cursor=page["next"])
+        self.assertEqual(len(rest["items"]), 1)
+
+    def test_relation_names_and_expansion(self):
+        page = self.get(fields="title,owner,technologies", expand="assigned_users")
+        item = page["items"][0]
+        self.assertEqual(
+            list(item), ["id", "title", "technologies", "owner", "assigned_users"]
+        )
+        self.assertEqual(item["owner"], "alice")
+        self.assertEqual(item["technologies"], ["Django"])
+        self.assertEqual(
+            item["assigned_users"], [{"id": self.se_user.id, "username": "alice"}]
+        )
+
+        item = self.get(expand="project,technologies")["items"][0]
+        self.assertEqual(
+            item["project"], {"id": self.project.id, "name": "Collections"}
+        )
+        self.assertEqual(
+            item["technologies"],
+            [{"id": self.django.id, "name": "Django", "category": "Backend"}],
+        )
+        self.assertEqual(item["status"], "staging")
+
+    def test_unknown_fields(self):
+        response = self.client.get("/api/tickets/", {"fields": "title,secret"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/tickets/", {"expand": "title"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TicketSequenceTests(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(name="Collections")
+        self.year = timezone.now().year
+
+    def test_numbers_past_999_keep_counting(self):
+        TicketSequence.objects.create(year=self.year, last_number=999)
+        self.assertEqual(make_ticket(self.project).ticket_id, f"SE-{self.year}-1000")
+        self.assertEqual(make_ticket(self.project).ticket_id, f"SE-{self.year}-1001")
+
+    def test_seeds_from_existing_ids(self):
+        make_ticket(self.project, ticket_id=f"SE-{self.year}-041")
+        self.assertEqual(make_ticket(self.project).ticket_id, f"SE-{self.year}-042")
+
+    def test_allocates_blocks(self):
+        first = Ticket.allocate_ticket_ids(5)
+        second = Ticket.allocate_ticket_ids(2)
+        self.assertEqual(len(set(first + second)), 7)
+        self.assertEqual(second[-1], f"SE-{self.year}-007")
+
+
+class TicketSequenceConcurrencyTests(TransactionTestCase):
+    def test_concurrent_creates_get_unique_ids(self):
+        project = Project.objects.create(name="Collections")
+
+        def create(i):
+            try:
+                return make_ticket(project, title=f"Concurrent {i}").ticket_id
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ticket_ids = list(pool.map(create, range(64)))
+
+        self.assertEqual(len(set(ticket_ids)), 64)
+        self.assertEqual(TicketSequence.objects.get().last_number, 64)
+
+
+class DatabaseProfileTests(TransactionTestCase):
+    def test_sqlite_pragmas_and_immediate_transactions(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "wal")
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+        with CaptureQueriesContext(connection) as ctx, transaction.atomic():
+            Project.objects.exists()
+        self.assertEqual(ctx.captured_queries[0]["sql"], "BEGIN IMMEDIATE")
+
+    def test_new_connections_gather_table_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute("DELETE FROM sqlite_stat1")
+        bulk_make_tickets(Project.objects.create(name="Collections"), 12)
+        self.assertIsNone(estimated_row_count(Ticket))
+
+        connection.close()
+        self.assertEqual(estimated_row_count(Ticket), 12)
+
+    def test_mixed_load_has_no_lock_errors(self):
+        project = Project.objects.create(name="Collections")
+        category = TechnologyCategory.objects.create(name="Backend")
+        Technology.objects.create(name="Django", category=category)
+        bulk_make_tickets(project, 20)
+        result = benchmarks.mixed_load(threads=4, duration=1.0, write_ratio=0.5)
+        self.assertEqual(result["errors"], {})
+        self.assertGreater(result["writes"], 0)
+        # The writes went through rather than being refused
+        self.assertGreater(Ticket.objects.count(), 20)
+
+
+class ProjectStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ("Archive", "Collections", "Conservation"):
+            project = Project.objects.create(name=name)
+            make_ticket(project)
+            make_ticket(project, status="completed")
+            make_ticket(project, status="completed")
+        Project.objects.create(name="Empty")
+
+    def test_with_stats_matches_properties(self):
+        annotated = Project.objects.with_stats().get(name="Archive")
+        plain = Project.objects.get(name="Archive")
+        with self.assertNumQueries(0):
+            self.assertEqual(annotated.total_tickets, 3)
+            self.assertEqual(annotated.completed_tickets, 2)
+            self.assertEqual(annotated.completion_percentage, 66.7)
+        self.assertEqual(plain.completion_percentage, 66.7)
+        self.assertEqual(
+            Project.objects.with_stats().get(name="Empty").total_tickets, 0
+        )
+
+    def test_list_projects_query_count_is_constant(self):
+        # ETag counters + projects with stats + prefetch members
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/projects/")
+        stats = {p["name"]: p["completed_tickets"] for p in response.json()}
+        self.assertEqual(
+            stats, {"Archive": 2, "Collections": 2, "Conservation": 2, "Empty": 0}
+        )
+
+    def test_admin_changelist_query_count_is_constant(self):
+        admin_user = User.objects.create_superuser("root", "root@example.com", "pw")
+        self.client.force_login(admin_user)
+        url = "/admin/tickets/project/"
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        project = Project.objects.create(name="Extra")
+        make_ticket(project)
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.client.get(url)
+
+
+class AdminChangelistTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.admin_user = User.objects.create_superuser("root", "root@example.com", "pw")
+        cls.techs = [cls.django] + [
+            Technology.objects.create(name=f"Tech {n}", category=cls.category)
+            for n in range(4)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin_user)
+
+    def add_tickets(self, count):
+        tickets = [make_ticket(self.project, owner=self.se_user) for _ in range(count)]
+        for ticket in tickets:
+            ticket.technologies.add(*self.techs)
+        return tickets
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_ticket_changelist_query_count_is_constant(self):
+        url = "/admin/tickets/ticket/"
+        self.add_tickets(2)
+        self.client.get(url)
+        before, response = self.queries(url)
+        self.assertContains(response, "Django, Tech 0, Tech 1, + 2 more")
+        self.add_tickets(10)
+        after, _ = self.queries(url)
+        self.assertEqual(before, after)
+
+    def test_catalog_changelists_use_annotations(self):
+        self.add_tickets(3)
+        for url in ("/admin/tickets/technologycategory/", "/admin/tickets/technology/"):
+            self.client.get(url)
+            before, response = self.queries(url)
+            TechnologyCategory.objects.create(name=f"Extra {url}")
+            Technology.objects.create(name=url, category=self.category)
+            self.client.get(url)
+            after, _ = self.queries(url)
+            self.assertEqual(before, after)
+        self.assertContains(response, '<td class="field-usage_count">3</td>', html=True)
+
+    def test_filter_choices_are_cached_until_the_table_changes(self):
+        url = "/admin/tickets/ticket/"
+        self.add_tickets(1)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "?owner__id__exact=%d" % self.se_user.pk)
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertNotIn('FROM "tickets_project"', sql)
+        self.assertNotIn('FROM "tickets_technologycategory"', sql)
+        self.assertNotIn("EXISTS", sql)
+
+        # Only users who own tickets are offered, and a new one shows up once
+        # the users table changes
+        bob = User.objects.create_user("bob")
+        make_ticket(self.project, owner=bob)
+        _, response = self.queries(url)
+        self.assertContains(response, "?owner__id__exact=%d" % bob.pk)
+        self.assertNotContains(response, "?owner__id__exact=%d" % self.admin_user.pk)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=5)
+    def test_large_unfiltered_changelists_use_the_row_estimate(self):
+        self.add_tickets(6)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.add_tickets(2)
+
+        paginator = EstimatedCountPaginator(Ticket.objects.all(), 100)
+        self.assertEqual(paginator.count, 6)
+        filtered = EstimatedCountPaginator(Ticket.objects.filter(status="staging"), 100)
+        self.assertEqual(filtered.count, 8)
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=10):
+            self.assertEqual(
+                EstimatedCountPaginator(Ticket.objects.all(), 100).count, 8
+            )
+        self.assertEqual(self.client.get("/admin/tickets/ticket/").status_code, 200)
+
+
+class IndividualReportTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.react = Technology.objects.create(
+            name="React", category=TechnologyCategory.objects.create(name="Frontend")
+        )
+        owned = make_ticket(cls.project, owner=cls.se_user, status="completed")
+        owned.technologies.add(cls.django, cls.react)
+        assigned = make_ticket(Project.objects.create(name="Archive"))
+        assigned.assigned_users.add(cls.se_user)
+        assigned.technologies.add(cls.django)
+        # Owned and assigned at once must only be counted once
+        both = make_ticket(cls.project, owner=cls.se_user, status="in_progress")
+        both.assigned_users.add(cls.se_user)
+        make_ticket(cls.project)
+
+    def get_report(self):
+        response = self.client.get("/api/reports/individual/alice/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_report_contents(self):
+        report = self.get_report()
+        self.assertEqual(
+            report["summary"],
+            {
+                "total_tickets": 3,
+                "completed": 1,
+                "in_progress": 1,
+                "completion_rate": 33.3,
+            },
+        )
+        self.assertEqual(
+            report["technology_expertise"],
+            {
+                "most_used_technologies": {"Django": 2, "React": 1},
+                "technology_categories": {"Backend": 2, "Frontend": 1},
+                "total_technologies_used": 2,
+            },
+        )
+        self.assertEqual(
+            report["project_contributions"],
+            {
+                "Archive": {"total": 1, "completed": 0},
+                "Collections": {"total": 2, "completed": 1},
+            },
+        )
+        self.assertEqual(len(report["recent_work"]), 3)
+
+    def test_unknown_user(self):
+        response = self.client.get("/api/reports/individual/nobody/")
+        self.assertEqual(
+            response.json(), {"error": "User not found or not S.E. team member"}
+        )
+
+    def test_query_count_independent_of_ticket_count(self):
+        bulk_make_tickets(
+            self.project, 10, owner=self.se_user, technologies=[self.django]
+        )
+        catalog.get_catalog()  # loaded once per process, not per report
+        with CaptureQueriesContext(connection) as small:
+            self.get_report()
+
+        bulk_make_tickets(
+            self.project,
+            10_000,
+            owner=self.se_user,
+            technologies=[self.django, self.react],
+        )
+        # bulk_create sends no signals, so drop the cached report by hand
+        cache.clear()
+        with self.assertNumQueries(len(small.captured_queries)):
+            report = self.get_report()
+        self.assertEqual(report["summary"]["total_tickets"], 10_013)
+
+
+class ReportCacheTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ticket = make_ticket(cls.project, owner=cls.se_user)
+        cls.ticket.technologies.add(cls.django)
+
+    def individual(self):
+        return self.client.get("/api/reports/individual/alice/").json()
+
+    def test_repeat_hits_are_served_from_cache(self):
+        self.individual()
+        self.client.get(f"/api/reports/project/{self.project.id}/")
+        self.client.get("/api/reports/team-technology/")
+        # Only the ETag counters and the user/project lookups remain on a hit
+        with self.assertNumQueries(2):
+            self.individual()
+        with self.assertNumQueries(2):
+            self.client.get(f"/api/reports/project/{self.project.id}/")
+        with self.assertNumQueries(1):
+            self.client.get("/api/reports/team-technology/")
+
+    def test_ticket_save_invalidates(self):
+        self.assertEqual(self.individual()["summary"]["completed"], 0)
+        self.ticket.status = "completed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket.save()
+        self.assertEqual(self.individual()["summary"]["completed"], 1)
+
+    def test_invalidation_waits_for_commit(self):
+        self.assertEqual(self.individual()["summary"]["completed"], 0)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.ticket.status = "completed"
+            self.ticket.save()
+            # Still in the transaction: the cached report stays put
+            self.assertEqual(self.individual()["summary"]["completed"], 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.individual()["summary"]["completed"], 1)
+
+    def test_reassignment_invalidates_previous_owner(self):
+        self.assertEqual(self.individual()["summary"]["total_tickets"], 1)
+        ticket = Ticket.objects.get(pk=self.ticket.pk)
+        ticket.owner = User.objects.create_user("bob", is_se_team=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.save()
+        self.assertEqual(self.individual()["summary"]["total_tickets"], 0)
+
+    def test_m2m_changes_invalidate(self):
+        other = make_ticket(self.project)
+        self.assertEqual(self.individual()["summary"]["total_tickets"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.assigned_users.add(self.se_user)
+        self.assertEqual(self.individual()["summary"]["total_tickets"], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.se_user.assigned_tickets.remove(other)
+        self.assertEqual(self.individual()["summary"]["total_tickets"], 1)
+
+        report = self.client.get("/api/reports/team-technology/").json()
+        self.assertEqual(report["technology_diversity"]["total_technologies_used"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket.technologies.clear()
+        report = self.client.get("/api/reports/team-technology/").json()
+        self.assertEqual(report["technology_diversity"]["total_technologies_used"], 0)
+
+    def test_technology_rename_invalidates(self):
+        self.individual()
+        self.django.name = "Django 5"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.save()
+        expertise = self.individual()["technology_expertise"]
+        self.assertEqual(expertise["most_used_technologies"], {"Django 5": 1})
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": tempfile.mkdtemp(),
+            }
+        }
+    )
+    def test_file_based_cache(self):
+        cache.clear()
+        self.test_ticket_save_invalidates()
+
+
+class BulkCreateTests(TicketFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.se_user)
+
+    def item(self, **overrides):
+        item = {
+            "title": "Thumbnails missing",
+            "description": "Gallery shows blanks",
+            "ticket_type": "bug",
+            "project_id": self.project.id,
+            "technology_ids": [self.django.id],
+            "reporter_name": "Intake Bot",
+            "reporter_contact": "intake@example.com",
+        }
+        item.update(overrides)
+        return item
+
+    def post(self, items):
+        return self.client.post(
+            "/api/tickets/bulk", json.dumps(items), content_type="application/json"
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.post([self.item()]).status_code, 401)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_creates_valid_items_and_reports_errors(self):
+        response = self.post(
+            [
+                self.item(),
+                self.item(ticket_type="question", technology_ids=[999]),
+                self.item(title="Upload fails", priority="high"),
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["created"], body["failed"]), (2, 1))
+        first, bad, last = body["results"]
+        self.assertEqual(bad["id"], None)
+        self.assertEqual(len(bad["errors"]), 2)
+        self.assertEqual(
+            int(last["ticket_id"].rsplit("-", 1)[1]),
+            int(first["ticket_id"].rsplit("-", 1)[1]) + 1,
+        )
+
+        ticket = Ticket.objects.get(pk=last["id"])
+        self.assertEqual(ticket.priority, "high")
+        self.assertEqual(list(ticket.technologies.all()), [self.django])
+        self.assertEqual(
+            TechnologyUsage.objects.get(technology=self.django).ticket_count, 2
+        )
+        self.assertEqual([pk for pk, _ in search_ticket_ids("upload")], [ticket.pk])
+
+    def test_values_longer_than_the_columns_are_item_errors(self):
+        response = self.post([self.item(title="x" * 256), self.item()])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["created"], body["failed"]), (1, 1))
+        self.assertEqual(
+            body["results"][0]["errors"],
+            ["title: Ensure this value has at most 255 characters (it has 256)."],
+        )
+
+    def test_insert_is_batched(self):
+        self.client.get(f"/api/reports/project/{self.project.id}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.post(
+                    [self.item(title=f"Ticket {i}") for i in range(300)]
+                )
+        self.assertEqual(response.json()["created"], 300)
+        inserts = [
+            q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT INTO")
+        ]
+        # SQLite caps the rows per INSERT by its 999 bound-parameter limit
+        ticket_batch = connection.ops.bulk_batch_size(
+            Ticket._meta.concrete_fields, [None] * 300
+        )
+        self.assertEqual(
+            sum('"tickets_ticket" (' in sql for sql in inserts),
+            -(-300 // min(ticket_batch, 500)),
+        )
+        self.assertEqual(
+            sum('"tickets_ticket_technologies"' in sql for sql in inserts), 1
+        )
+        report = self.client.get(f"/api/reports/project/{self.project.id}/").json()
+        self.assertEqual(report["progress"]["total_tickets"], 300)
+
+    def test_rejects_oversized_batches(self):
+        response = self.post([self.item()] * 1001)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+
+class AsyncReportTests(TransactionTestCase):
+    # The report pieces run on worker threads with their own connections, so
+    # the data has to be committed for them to see it
+
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(name="Collections")
+        category = TechnologyCategory.objects.create(name="Backend")
+        django = Technology.objects.create(name="Django", category=category)
+        self.se_user = User.objects.create_user("alice", is_se_team=True)
+        for status in ("completed", "in_progress", "staging"):
+            ticket = make_ticket(self.project, owner=self.se_user, status=status)
+            ticket.technologies.add(django)
+
+    def test_matches_sync_reports(self):
+        for path in (
+            "/reports/individual/alice/",
+            "/reports/team-technology/",
+            f"/reports/project/{self.project.id}/",
+        ):
+            with self.subTest(path=path):
+                cache.clear()
+                expected = self.client.get(f"/api{path}").json()
+                cache.clear()
+                response = self.client.get(f"/api/async{path}")
+                self.assertEqual(response.status_code, 200)
+                actual = response.json()
+                if "contributors" in expected:
+                    self.assertCountEqual(
+                        actual.pop("contributors"), expected.pop("contributors")
+                    )
+                self.assertEqual(actual, expected)
+
+    def test_unknown_user_and_project(self):
+        response = self.client.get("/api/async/reports/individual/nobody/")
+        self.assertIn("error", response.json())
+        response = self.client.get("/api/async/reports/project/999/")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_asgi_handler_and_conditional_get(self):
+        response = await self.async_client.get("/api/async/reports/team-technology/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["team_size"], 1)
+        response = await self.async_client.get(
+            "/api/async/reports/team-technology/",
+            headers={"If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_request_metrics_cover_worker_threads(self):
+        path = "/reports/team-technology/"
+        await sync_to_async(catalog.get_catalog)()
+        with self.assertLogs("ticket_system.requests", "INFO") as logs:
+            await sync_to_async(self.client.get)(f"/api{path}")
+            await sync_to_async(cache.clear)()
+            response = await self.async_client.get(f"/api/async{path}")
+        self.assertEqual(response.status_code, 200)
+        sync_record, async_record = (
+            json.loads(record.getMessage()) for record in logs.records
+        )
+        self.assertGreater(sync_record["queries"], 0)
+        # The report pieces run on worker threads; their queries count too
+        self.assertEqual(async_record["queries"], sync_record["queries"])
+        self.assertIn(f'"{async_record["queries"]} queries"', response["Server-Timing"])
+
+    def test_benchmark_suite(self):
+        results = benchmarks.run_async_report_suite(3, repeat=1, concurrency=2)
+        self.assertEqual(
+            [r["name"] for r in results][:2],
+            ["report_individual_wsgi", "report_individual_asgi"],
+        )
+        self.assertEqual(len(results), 6)
+
+
+class TicketTransitionTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bob = User.objects.create_user("bob", is_se_team=True)
+        cls.tickets = bulk_make_tickets(
+            cls.project, 5, owner=cls.se_user, technologies=[cls.django]
+        )
+        Ticket.objects.update(modified_at=timezone.now() - timedelta(days=1))
+        call_command("rebuild_usage_rollups", stdout=StringIO())
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.se_user)
+
+    def transition(self, **payload):
+        return self.client.post(
+            "/api/tickets/transition",
+            json.dumps(payload),
+            content_type="application/json",
+        )
+
+    def test_updates_only_changed_rows_and_stamps_them(self):
+        ids = [t.id for t in self.tickets]
+        Ticket.objects.filter(pk=ids[0]).update(status="completed")
+        response = self.transition(
+            ticket_ids=ids, status="completed", priority="medium"
+        )
+        self.assertEqual(
+            response.json(), {"updated": 4, "assigned": 0, "unassigned": 0}
+        )
+        self.assertEqual(Ticket.objects.filter(status="completed").count(), 5)
+        recent = Ticket.objects.filter(
+            modified_at__gt=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(set(recent.values_list("pk", flat=True)), set(ids[1:]))
+        self.assertEqual(
+            set(recent.values_list("modified_by", flat=True)), {self.se_user.pk}
+        )
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.transition(ticket_ids=[self.tickets[0].id], status="completed")
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Ticket.objects.filter(status="completed").exists())
+
+    def test_owner_and_assignments(self):
+        ids = [t.id for t in self.tickets[:3]]
+        self.tickets[0].assigned_users.add(self.bob)
+        self.assertEqual(
+            self.client.get("/api/reports/individual/alice/").json()["summary"][
+                "total_tickets"
+            ],
+            5,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.transition(ticket_ids=ids, owner_id=self.bob.id)
+        self.assertEqual(response.json()["updated"], 3)
+        alice = self.client.get("/api/reports/individual/alice/").json()
+        self.assertEqual(alice["summary"]["total_tickets"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.transition(
+                ticket_ids=ids,
+                owner_id=None,
+                assign=[self.se_user.id],
+                unassign=[self.bob.id],
+            )
+        self.assertEqual(
+            response.json(), {"updated": 3, "assigned": 3, "unassigned": 1}
+        )
+        self.assertFalse(
+            Ticket.objects.filter(pk__in=ids, owner__isnull=False).exists()
+        )
+        alice = self.client.get("/api/reports/individual/alice/").json()
+        self.assertEqual(alice["summary"]["total_tickets"], 5)
+
+        # Leaving owner_id out keeps the owner
+        self.transition(ticket_ids=[self.tickets[4].id], priority="high")
+        self.assertEqual(Ticket.objects.get(pk=self.tickets[4].id).owner, self.se_user)
+
+        incremental = rollup_snapshot()
+        call_command("rebuild_usage_rollups", stdout=StringIO())
+        self.assertEqual(incremental, rollup_snapshot())
+
+    def test_query_count_independent_of_selection_size(self):
+        def count(ids):
+            with CaptureQueriesContext(connection) as ctx:
+                self.transition(
+                    ticket_ids=ids, status="in_progress", assign=[self.bob.id]
+                )
+            return len(ctx.captured_queries)
+
+        count([self.tickets[1].id])  # creates the ETag counter row
+        small = count([self.tickets[0].id])
+        more = bulk_make_tickets(self.project, 200, technologies=[self.django])
+        self.assertEqual(count([t.id for t in more]), small)
+
+    def test_rejects_unknown_values(self):
+        response = self.transition(
+            ticket_ids=[self.tickets[0].id], status="done", assign=[999]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Ticket.objects.filter(status="done").count(), 0)
+
+    def test_admin_actions(self):
+        self.client.force_login(
+            User.objects.create_superuser("root", "root@example.com", "pw")
+        )
+        ids = [t.id for t in self.tickets[:2]]
+        for action in ("set_status_frozen", "take_ownership"):
+            response = self.client.post(
+                "/admin/tickets/ticket/",
+                {"action": action, "_selected_action": ids},
+                follow=True,
+            )
+            self.assertContains(response, "2 tickets updated")
+        frozen = Ticket.objects.filter(status="frozen")
+        self.assertEqual(set(frozen.values_list("pk", flat=True)), set(ids))
+        self.assertEqual(
+            set(frozen.values_list("owner__username", "modified_by__username")),
+            {("root", "root")},
+        )
+
+
+class StreamingExportTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        frontend = TechnologyCategory.objects.create(name="Frontend")
+        cls.react = Technology.objects.create(name="React", category=frontend)
+        cls.tickets = bulk_make_tickets(
+            cls.project, 12, owner=cls.se_user, technologies=[cls.django, cls.react]
+        )
+        bob = User.objects.create_user("bob", is_se_team=True)
+        Ticket.assigned_users.through.objects.bulk_create(
+            [
+                Ticket.assigned_users.through(ticket_id=t.id, user_id=user.id)
+                for t in cls.tickets
+                for user in (cls.se_user, bob)
+            ]
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+
+    def test_staff_only(self):
+        self.client.logout()
+        self.assertEqual(self.client.get("/api/tickets/export.csv").status_code, 401)
+        self.client.force_login(self.se_user)
+        self.assertEqual(self.client.get("/api/tickets/export.csv").status_code, 403)
+
+    def read(self, response):
+        self.assertTrue(response.streaming)
+        return list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+
+    def test_export_streams_with_bounded_queries(self):
+        chunk_size = exports.EXPORT_CHUNK_SIZE
+        exports.EXPORT_CHUNK_SIZE = 5
+        self.addCleanup(setattr, exports, "EXPORT_CHUNK_SIZE", chunk_size)
+
+        response = self.client.get("/api/tickets/export.csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        # Rows are produced while the body is consumed: the ticket query plus
+        # technologies and assignees for each of the three chunks
+        with self.assertNumQueries(7):
+            rows = self.read(response)
+
+        self.assertEqual(rows[0], exports.TICKET_CSV_HEADER)
+        self.assertEqual(len(rows), 13)
+        newest = self.tickets[-1]
+        self.assertEqual(
+            rows[1],
+            [
+                newest.ticket_id,
+                newest.title,
+                "Collections",
+                "staging",
+                "medium",
+                "alice",
+                "alice, bob",
+                "Django, React",
+                "Backend, Frontend",
+            ],
+        )
+
+    def test_filters_and_admin_action(self):
+        Ticket.objects.filter(pk=self.tickets[0].pk).update(status="completed")
+        rows = self.read(self.client.get("/api/tickets/export.csv?status=completed"))
+        self.assertEqual([row[0] for row in rows[1:]], [self.tickets[0].ticket_id])
+
+        self.client.force_login(
+            User.objects.create_superuser("root", "root@example.com", "pw")
+        )
+        response = self.client.post(
+            "/admin/tickets/ticket/",
+            {
+                "action": "export_tickets_with_tech",
+                "_selected_action": [t.id for t in self.tickets[:3]],
+            },
+        )
+        self.assertEqual(len(self.read(response)), 4)
+
+
+class AnalyticsExportTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.bug = make_ticket(cls.project, ticket_type="bug", owner=cls.se_user)
+        BugReport.objects.create(
+            ticket=cls.bug,
+            category="data_issue",
+            steps_to_reproduce="Open it",
+            expected_results="Data",
+            actual_results="No data",
+        )
+        cls.bug.technologies.add(cls.django)
+        cls.bug.assigned_users.add(cls.se_user)
+        cls.task = make_ticket(cls.project, ticket_type="task", title="Docs")
+
+    def export(self, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facts.ndjson")
+            out = StringIO()
+            call_command("export_analytics", path, *args, stdout=out)
+            with open(path) as f:
+                return [json.loads(line) for line in f], out.getvalue()
+
+    def test_facts_are_denormalized(self):
+        with self.assertNumQueries(3):
+            batches = list(analytics.fact_batches())
+        facts = {fact["ticket_id"]: fact for batch in batches for fact in batch}
+        bug = facts[self.bug.ticket_id]
+        self.assertEqual(bug["project"], "Collections")
+        self.assertEqual(bug["subtype_category"], "data_issue")
+        self.assertEqual(
+            bug["technologies"], [{"name": "Django", "category": "Backend"}]
+        )
+        self.assertEqual(bug["assignees"], ["alice"])
+        self.assertEqual(bug["owner"], "alice")
+        self.assertIsNone(facts[self.task.ticket_id]["subtype_category"])
+
+    def test_batches_and_incremental_state(self):
+        third = make_ticket(self.project, title="Third")
+        batches = list(analytics.fact_batches(batch_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            state = os.path.join(tmp, "state.json")
+            facts, out = self.export("--state", state)
+            self.assertEqual(len(facts), 3)
+            self.assertIn("Exported 3 tickets", out)
+
+            # Only the boundary row comes back when nothing has changed
+            facts, _ = self.export("--state", state)
+            self.assertEqual(len(facts), 1)
+
+            Ticket.objects.filter(pk=self.task.pk).update(
+                modified_at=timezone.now() + timedelta(minutes=1)
+            )
+            facts, _ = self.export("--state", state)
+            self.assertEqual(
+                [f["ticket_id"] for f in facts], [third.ticket_id, self.task.ticket_id]
+            )
+
+    def test_parquet(self):
+        if analytics.pyarrow is None:
+            self.skipTest("pyarrow is not installed")
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "facts.parquet")
+            call_command(
+                "export_analytics",
+                path,
+                format="parquet",
+                batch_size=1,
+                stdout=StringIO(),
+            )
+            parquet = pyarrow.parquet.ParquetFile(path)
+            self.assertEqual(parquet.metadata.num_row_groups, 2)
+            self.assertEqual(parquet.read().num_rows, 2)
+
+    def test_job(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        with override_settings(MEDIA_ROOT=media.name):
+            job = jobs.enqueue(
+                "analytics_export", {"since": self.task.modified_at.isoformat()}
+            )
+            jobs.execute(jobs.claim("w1").pk, "w1")
+            job.refresh_from_db()
+            self.assertEqual(job.status, "succeeded")
+            self.assertEqual(job.result["rows"], 1)
+            self.assertTrue(job.result_file.name.endswith(".ndjson"))
+            with job.result_file.open("rb") as f:
+                self.assertEqual(json.loads(f.readline())["id"], self.task.pk)
+
+    def test_job_payload_is_validated_on_enqueue(self):
+        for payload in (
+            {"format": "csv"},
+            {"since": "last tuesday"},
+            {"since": "2024-02-30T00:00:00Z"},
+            {"since": 20240101},
+        ):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValidationError):
+                    jobs.enqueue("analytics_export", payload)
+        self.assertFalse(Job.objects.exists())
+
+        self.client.force_login(self.se_user)
+        response = self.client.post(
+            "/api/jobs",
+            {"kind": "analytics_export", "payload": {"format": "xml"}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("xml", response.json()["detail"])
+
+
+class ImportTicketsTests(TicketFixtureMixin, TestCase):
+    FIELDS = [
+        "ticket_id",
+        "title",
+        "ticket_type",
+        "project",
+        "reporter_name",
+        "reporter_contact",
+        "owner",
+        "technologies",
+        "assignees",
+        "created_at",
+        "task_type",
+        "detailed_description",
+        "acceptance_criteria",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def task_row(self, n, **kwargs):
+        row = {
+            "title": f"Imported {n}",
+            "ticket_type": "task",
+            "project": "Collections",
+            "reporter_name": "Jane Reporter",
+            "reporter_contact": "jane@example.com",
+            "technologies": "Django",
+            "assignees": "alice",
+            "task_type": "documentation",
+            "detailed_description": "Write it",
+            "acceptance_criteria": "Written",
+        }
+        row.update(kwargs)
+        return row
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp, "tickets.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, self.FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_tickets", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_subtypes_links_and_legacy_values(self):
+        path = os.path.join(self.tmp, "tickets.ndjson")
+        with open(path, "w") as f:
+            f.write(
+                json.dumps(
+                    self.task_row(
+                        1,
+                        ticket_id="SE-2019-042",
+                        created_at="2019-05-01T09:30:00+00:00",
+                        owner="alice",
+                        technologies=["Django"],
+                    )
+                )
+                + "\n"
+            )
+            f.write(
+                json.dumps(
+                    {
+                        "title": "Crash",
+                        "ticket_type": "bug",
+                        "project": "Collections",
+                        "reporter_name": "Jane Reporter",
+                        "reporter_contact": "jane@example.com",
+                        "category": "error_page",
+                        "steps_to_reproduce": "Click",
+                        "expected_results": "Nothing",
+                        "actual_results": "Crash",
+                    }
+                )
+                + "\n"
+            )
+        out, _ = self.run_import(path)
+        self.assertIn("2 imported, 0 skipped", out)
+        self.assertIn("rows/s", out)
+
+        legacy = Ticket.objects.get(ticket_id="SE-2019-042")
+        self.assertEqual(legacy.created_at.year, 2019)
+        self.assertEqual(legacy.owner, self.se_user)
+        self.assertEqual(legacy.task.task_type, "documentation")
+        self.assertEqual(list(legacy.technologies.all()), [self.django])
+        self.assertEqual(list(legacy.assigned_users.all()), [self.se_user])
+        self.assertEqual(list(TicketSequence.allocate(2019)), [43])
+        bug = Ticket.objects.get(title="Crash")
+        self.assertEqual(bug.bugreport.category, "error_page")
+        self.assertRegex(bug.ticket_id, rf"^SE-{timezone.now().year}-\d{{3}}$")
+
+        self.assertEqual([pk for pk, _ in search_ticket_ids("Imported")], [legacy.pk])
+        snapshot = rollup_snapshot()
+        call_command("rebuild_usage_rollups", stdout=StringIO())
+        self.assertEqual(snapshot, rollup_snapshot())
+
+    def test_generated_ids_skip_legacy_ids_in_the_same_batch(self):
+        year = timezone.now().year
+        make_ticket(self.project)  # the counter now stands at 1
+        path = self.write_csv(
+            [self.task_row(1, ticket_id=f"SE-{year}-002"), self.task_row(2)]
+        )
+        out, _ = self.run_import(path)
+        self.assertIn("2 imported, 0 skipped", out)
+        self.assertEqual(
+            Ticket.objects.get(title="Imported 2").ticket_id, f"SE-{year}-003"
+        )
+        self.assertEqual(list(TicketSequence.allocate(year)), [4])
+
+    def test_ndjson_values_need_not_be_strings(self):
+        path = os.path.join(self.tmp, "tickets.ndjson")
+        with open(path, "w") as f:
+            for row in (
+                self.task_row(1, reporter_contact=5551234, technologies=["Django"]),
+                self.task_row(2, created_at="2019-13-01T00:00:00"),
+                ["not", "an", "object"],
+            ):
+                f.write(json.dumps(row) + "\n")
+            f.write('{"title": "Truncated\n')
+            f.write(json.dumps(self.task_row(5)) + "\n")
+        errors = os.path.join(self.tmp, "errors.ndjson")
+        out, _ = self.run_import(path, "--errors", errors, "--batch-size", "2")
+        self.assertIn("2 imported, 3 skipped", out)
+        self.assertEqual(
+            Ticket.objects.get(title="Imported 1").reporter_contact, "5551234"
+        )
+        with open(errors) as f:
+            rejected = {row["row"]: row["errors"] for row in map(json.loads, f)}
+        self.assertEqual(rejected[2], ["created_at: Not an ISO 8601 timestamp."])
+        self.assertEqual(rejected[3], ["Row is not an object."])
+        self.assertTrue(rejected[4][0].startswith("Not valid JSON: "))
+        self.assertTrue(ImportCheckpoint.objects.get().finished)
+
+    def test_values_longer_than_the_columns_are_rejected(self):
+        path = self.write_csv(
+            [
+                self.task_row(1, title="x" * 256),
+                self.task_row(2, ticket_id="SE-2019-" + "1" * 20),
+                self.task_row(3, acceptance_criteria="ok"),
+            ]
+        )
+        errors = os.path.join(self.tmp, "errors.ndjson")
+        out, _ = self.run_import(path, "--errors", errors)
+        self.assertIn("1 imported, 2 skipped", out)
+        with open(errors) as f:
+            rejected = {row["row"]: row["errors"] for row in map(json.loads, f)}
+        self.assertEqual(
+            rejected[1],
+            ["title: Ensure this value has at most 255 characters (it has 256)."],
+        )
+        self.assertEqual(
+            rejected[2],
+            ["ticket_id: Ensure this value has at most 20 characters (it has 28)."],
+        )
+
+    def test_rejected_rows_are_reported_and_skipped(self):
+        make_ticket(self.project, ticket_id="SE-2019-001")
+        path = self.write_csv(
+            [
+                self.task_row(1),
+                self.task_row(2, project="Nowhere"),
+                self.task_row(3, technologies="Django, Cobol", assignees="nobody"),
+                self.task_row(4, ticket_id="SE-2019-001"),
+                self.task_row(5, task_type="juggling"),
+            ]
+        )
+        errors = os.path.join(self.tmp, "errors.ndjson")
+        out, _ = self.run_import(path, "--errors", errors)
+        self.assertIn("1 imported, 4 skipped", out)
+        with open(errors) as f:
+            rejected = {row["row"]: row["errors"] for row in map(json.loads, f)}
+        self.assertEqual(sorted(rejected), [2, 3, 4, 5])
+        self.assertEqual(rejected[2], ["project: Unknown project 'Nowhere'."])
+        self.assertEqual(
+            rejected[3],
+            ["technologies: Unknown Cobol.", "assignees: Unknown nobody."],
+        )
+        self.assertEqual(rejected[4], ["ticket_id: SE-2019-001 already exists."])
+        self.assertEqual(Ticket.objects.filter(title__startswith="Imported").count(), 1)
+
+    def test_resumes_after_interruption(self):
+        path = self.write_csv([self.task_row(n) for n in range(1, 8)])
+        source = os.path.abspath(path)
+
+        def interrupt(checkpoint, errors):
+            if checkpoint.rows_done == 4:
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            importer.run_import(path, "csv", source, batch_size=2, on_batch=interrupt)
+        checkpoint = ImportCheckpoint.objects.get(source=source)
+        self.assertEqual((checkpoint.rows_done, checkpoint.finished), (4, False))
+
+        out, _ = self.run_import(path, "--batch-size", "2")
+        self.assertIn("Resuming after row 4", out)
+        self.assertIn("Processed 3 rows", out)
+        titles = Ticket.objects.values_list("title", flat=True)
+        self.assertEqual(sorted(titles), [f"Imported {n}" for n in range(1, 8)])
+
+        out, _ = self.run_import(path)
+        self.assertIn("already imported (7 tickets)", out)
+        self.run_import(path, "--restart")
+        self.assertEqual(Ticket.objects.count(), 14)
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        def queries(count):
+            path = self.write_csv([self.task_row(n) for n in range(count)])
+            with CaptureQueriesContext(connection) as ctx:
+                importer.run_import(path, "csv", f"batch-{count}", batch_size=count)
+            return len(ctx.captured_queries)
+
+        queries(1)  # the first batch also creates this year's counter
+        self.assertEqual(queries(2), queries(20))
+
+
+class ConditionalGetTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ticket = make_ticket(cls.project, owner=cls.se_user)
+        cls.ticket.technologies.add(cls.django)
+
+    def revalidate(self, url, params=None):
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        return self.client.get(url, params, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    def test_unchanged_polls_get_304_with_one_query(self):
+        for url in (
+            "/api/tickets/",
+            "/api/projects/",
+            "/api/technologies/",
+            "/api/reports/individual/alice/",
+            "/api/reports/team-technology/",
+            f"/api/reports/project/{self.project.id}/",
+        ):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=f'"other", {first["ETag"]}'
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], first["ETag"])
+                self.assertEqual(response.content, b"")
+
+    def test_weak_comparison(self):
+        tag = self.client.get("/api/tickets/")["ETag"]
+        self.assertTrue(tag.startswith('W/"'))
+        response = self.client.get("/api/tickets/", HTTP_IF_NONE_MATCH=tag[2:])
+        self.assertEqual(response.status_code, 304)
+
+    def test_tag_depends_on_filters(self):
+        first = self.client.get("/api/tickets/")
+        response = self.client.get(
+            "/api/tickets/", {"status": "new"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_produce_a_new_tag(self):
+        changes = [
+            lambda: make_ticket(self.project),
+            lambda: self.ticket.assigned_users.add(self.se_user),
+            lambda: self.ticket.technologies.clear(),
+            lambda: Technology.objects.create(name="Vue", category=self.category),
+            lambda: self.project.members.add(self.se_user),
+            lambda: User.objects.create_user("bob"),
+        ]
+        for change in changes:
+            etag = self.client.get("/api/projects/")["ETag"]
+            change()
+            response = self.client.get("/api/projects/", HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_last_login_does_not_change_tag(self):
+        etag = self.client.get("/api/tickets/")["ETag"]
+        self.client.force_login(self.se_user)
+        response = self.client.get("/api/tickets/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+def rollup_snapshot():
+    """Non-zero rollup state, comparable between incremental and rebuilt tables"""
+    return (
+        set(
+            TechnologyUsage.objects.exclude(
+                ticket_count=0, se_user_count=0
+            ).values_list("technology_id", "ticket_count", "se_user_count")
+        ),
+        set(
+            CategoryUsage.objects.exclude(ticket_count=0, se_user_count=0).values_list(
+                "category_id", "ticket_count", "se_user_count"
+            )
+        ),
+        set(
+            TechnologyUserUsage.objects.exclude(ticket_count=0).values_list(
+                "technology_id", "user_id", "ticket_count"
+            )
+        ),
+        set(
+            CategoryUserUsage.objects.exclude(ticket_count=0).values_list(
+                "category_id", "user_id", "ticket_count"
+            )
+        ),
+    )
+
+
+class AttachmentMixin(TicketFixtureMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ticket = make_ticket(cls.project)
+        cls.other = make_ticket(cls.project, title="Another one")
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.storage = attachment_storage()
+
+    def attach(self, ticket, data, name="screenshot.png"):
+        return Attachment.objects.create(
+            ticket=ticket, file=ContentFile(data, name=name), original_name=name
+        )
+
+
+class AttachmentStorageTests(AttachmentMixin, TestCase):
+
+    def test_identical_content_is_stored_once(self):
+        data = b"\x89PNG" + b"x" * 200_000
+        digest = hashlib.sha256(data).hexdigest()
+        first = self.attach(self.ticket, data)
+        second = self.attach(self.other, data, name="copy.png")
+
+        self.assertEqual(first.file.name, blob_name(digest))
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(first.blob_id, digest)
+        blob = Blob.objects.get()
+        self.assertEqual((blob.size, blob.ref_count), (len(data), 2))
+        with self.storage.open(first.file.name) as f:
+            self.assertEqual(f.read(), data)
+        # No temporary spool files are left behind
+        stored = [f for _, _, files in os.walk(self.storage.location) for f in files]
+        self.assertEqual(stored, [digest])
+
+    def test_references_are_counted_and_pruned(self):
+        first = self.attach(self.ticket, b"log one")
+        self.attach(self.other, b"log one")
+        first.file = ContentFile(b"log two", name="other.log")
+        first.save()
+        self.assertEqual(
+            dict(Blob.objects.values_list("sha256", "ref_count")),
+            {
+                hashlib.sha256(b"log one").hexdigest(): 1,
+                hashlib.sha256(b"log two").hexdigest(): 1,
+            },
+        )
+
+        self.other.delete()
+        out = StringIO()
+        call_command("prune_blobs", grace=0, stdout=out)
+        self.assertIn("Deleted 1 blobs", out.getvalue())
+        self.assertFalse(
+            self.storage.exists(blob_name(hashlib.sha256(b"log one").hexdigest()))
+        )
+        self.assertTrue(self.storage.exists(first.file.name))
+        self.assertEqual(Blob.objects.get().ref_count, 1)
+
+    def test_recent_blobs_survive_pruning(self):
+        attachment = self.attach(self.ticket, b"just uploaded")
+        attachment.delete()
+        call_command("prune_blobs", stdout=StringIO())
+        self.assertTrue(self.storage.exists(attachment.file.name))
+        self.assertEqual(Blob.objects.get().ref_count, 0)
+
+    def test_upload_endpoint_hashes_while_receiving(self):
+        data = b"traceback\n" * 10_000
+        url = f"/api/tickets/{self.ticket.pk}/attachments"
+        response = self.client.post(url, {"file": SimpleUploadedFile("a.log", data)})
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Blob.objects.exists())
+
+        self.client.force_login(self.se_user)
+        for name in ("crash.log", "crash-again.log"):
+            response = self.client.post(
+                f"/api/tickets/{self.ticket.pk}/attachments",
+                {"file": SimpleUploadedFile(name, data)},
+            )
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertEqual(body["original_name"], name)
+            self.assertEqual(body["sha256"], hashlib.sha256(data).hexdigest())
+            self.assertEqual(body["size"], len(data))
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+        self.assertEqual(self.ticket.attachments.count(), 2)
+        self.assertEqual(self.ticket.attachments.first().created_by, self.se_user)
+
+
+class AttachmentDownloadTests(AttachmentMixin, TestCase):
+    data = bytes(range(256)) * 400
+
+    def setUp(self):
+        super().setUp()
+        self.attachment = self.attach(self.ticket, self.data, name="bundle.log")
+        self.url = f"/api/attachments/{self.attachment.pk}/download"
+        self.client.force_login(self.se_user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_full_download_streams_the_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Content-Length"], str(len(self.data)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["ETag"], f'"{self.attachment.blob_id}"')
+        self.assertIn('filename="bundle.log"', response["Content-Disposition"])
+
+    def test_byte_ranges(self):
+        size = len(self.data)
+        for header, start, end in (
+            ("bytes=100-199", 100, 199),
+            ("bytes=50000-", 50000, size - 1),
+            ("bytes=-10", size - 10, size - 1),
+            ("bytes=102000-999999", 102000, size - 1),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    response["Content-Range"], f"bytes {start}-{end}/{size}"
+                )
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                body = b"".join(response.streaming_content)
+                self.assertEqual(body, self.data[start : end + 1])
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+        for header in ("bytes=0-1,5-6", "lines=1-2", "bytes=9-3"):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 200)
+
+    def test_if_range(self):
+        etag = f'"{self.attachment.blob_id}"'
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        # A stale validator means the client's partial copy is useless
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"something-else"'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ATTACHMENT_DOWNLOAD_OFFLOAD="x-accel-redirect")
+    def test_offload_to_front_end_server(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            "/protected-media/" + self.attachment.file.name,
+        )
+        with override_settings(ATTACHMENT_DOWNLOAD_OFFLOAD="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(
+            response["X-Sendfile"], self.storage.path(self.attachment.file.name)
+        )
+
+
+class JobQueueTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.ticket = make_ticket(cls.project, owner=cls.se_user)
+        cls.ticket.technologies.add(cls.django)
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.attempts = 0
+
+        def flaky(job):
+            self.attempts += 1
+            raise RuntimeError("boom")
+
+        jobs.REGISTRY["flaky"] = flaky
+        self.addCleanup(jobs.REGISTRY.pop, "flaky")
+
+    def test_claims_in_priority_order_once(self):
+        later = jobs.enqueue("precompute_reports")
+        sooner = jobs.enqueue("precompute_reports", priority=-1)
+        self.assertEqual(jobs.claim("w1").pk, sooner.pk)
+        self.assertEqual(jobs.claim("w2").pk, later.pk)
+        self.assertIsNone(jobs.claim("w3"))
+        later.refresh_from_db()
+        self.assertEqual(
+            (later.status, later.worker, later.attempts), ("running", "w2", 1)
+        )
+
+    def test_export_job_writes_result_file(self):
+        job = jobs.enqueue("export_tickets_with_tech", {"ticket_ids": [self.ticket.pk]})
+        jobs.execute(jobs.claim("w1").pk, "w1")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.result, {"rows": 1})
+        with job.result_file.open("rb") as f:
+            lines = f.read().decode().splitlines()
+        self.assertEqual(lines[0].split(",")[0], "Ticket ID")
+        self.assertIn(self.ticket.ticket_id, lines[1])
+        self.assertIn("Django", lines[1])
+
+    def test_failures_are_retried_with_backoff_then_fail(self):
+        job = jobs.enqueue("flaky", max_attempts=2)
+        with self.assertLogs("tickets.jobs", "ERROR"):
+            jobs.execute(jobs.claim("w1").pk, "w1")
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertIn("RuntimeError: boom", job.error)
+        self.assertGreater(job.run_after, timezone.now())
+        # Not due until the backoff has passed
+        self.assertIsNone(jobs.claim("w1"))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("tickets.jobs", "ERROR"):
+            jobs.execute(jobs.claim("w1").pk, "w1")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, self.attempts), ("failed", 2, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_STALE_SECONDS=60)
+    def test_jobs_of_silent_workers_are_requeued(self):
+        job = jobs.enqueue("precompute_reports")
+        jobs.claim("dead-worker")
+        jobs.heartbeat("dead-worker", [job.pk])
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+        Job.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(jobs.claim("w2").pk, job.pk)
+        # The dead worker's late result is not recorded over the new claim
+        jobs.execute(job.pk, "dead-worker")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), ("running", "w2"))
+
+    def test_api(self):
+        self.assertEqual(
+            self.client.post(
+                "/api/jobs", {"kind": "report"}, content_type="application/json"
+            ).status_code,
+            401,
+        )
+        self.client.force_login(self.se_user)
+        response = self.client.post(
+            "/api/jobs", {"kind": "nope"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/api/jobs",
+            {"kind": "export_tickets_with_tech"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        job_id = response.json()["id"]
+        self.assertEqual(response.json()["status"], "queued")
+
+        jobs.execute(jobs.claim("w1").pk, "w1")
+        body = self.client.get(f"/api/jobs/{job_id}").json()
+        self.assertEqual(body["status"], "succeeded")
+        response = self.client.get(body["result_url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            self.ticket.ticket_id, b"".join(response.streaming_content).decode()
+        )
+
+        # Other users' jobs are not visible
+        self.client.force_login(User.objects.create_user("mallory"))
+        self.assertEqual(self.client.get(f"/api/jobs/{job_id}").status_code, 404)
+
+    def test_report_payload_is_validated_on_enqueue(self):
+        for payload in (
+            {},
+            {"name": "weekly"},
+            {"name": ["project"]},
+            {"name": "individual", "param": "nobody"},
+            {"name": "project", "param": 999},
+            {"name": "project", "param": "abc"},
+        ):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValidationError):
+                    jobs.enqueue("report", payload)
+        self.assertFalse(Job.objects.exists())
+
+        self.client.force_login(self.se_user)
+        response = self.client.post(
+            "/api/jobs",
+            {"kind": "report", "payload": {"name": "project", "param": 999}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        jobs.enqueue("report", {"name": "project", "param": self.project.pk})
+
+
+class JobWorkerTests(TicketFixtureMixin, TransactionTestCase):
+    def test_burst_worker_drains_the_queue(self):
+        TicketFixtureMixin.setUpTestData.__func__(type(self))
+        make_ticket(self.project, owner=self.se_user)
+        queued = [
+            jobs.enqueue("report", {"name": "team-technology"}),
+            jobs.enqueue("report", {"name": "project", "param": self.project.pk}),
+            jobs.enqueue("report", {"name": "individual", "param": "alice"}),
+            jobs.enqueue("precompute_reports"),
+        ]
+        out = StringIO()
+        call_command("run_jobs", workers=2, burst=True, poll=0.01, stdout=out)
+        self.assertIn("Ran 4 jobs", out.getvalue())
+        statuses = Job.objects.filter(pk__in=[j.pk for j in queued]).values_list(
+            "status", flat=True
+        )
+        self.assertEqual(set(statuses), {"succeeded"})
+        self.assertEqual(Job.objects.get(pk=queued[2].pk).result["user"], "alice")
+
+
+class TechnologyCatalogTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.frontend = TechnologyCategory.objects.create(
+            name="Frontend", color="#ff0000"
+        )
+        cls.react = Technology.objects.create(name="React", category=cls.frontend)
+
+    def test_entries_and_ordering(self):
+        with self.assertNumQueries(3):  # version, categories, technologies
+            current = catalog.get_catalog()
+        self.assertEqual(
+            current.technologies[self.react.pk],
+            ("React", "Frontend", self.frontend.pk, "#ff0000", True),
+        )
+        self.assertEqual(
+            current.names([self.react.pk, self.django.pk]), ["Django", "React"]
+        )
+
+    def test_str_reads_the_catalog(self):
+        catalog.get_catalog()
+        technologies = list(Technology.objects.all())
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [str(t) for t in technologies], ["Django (Backend)", "React (Frontend)"]
+            )
+
+    def test_reloads_only_when_the_version_moves(self):
+        catalog.get_catalog()
+        catalog.expire()
+        with self.assertNumQueries(1):
+            catalog.get_catalog()
+        with self.assertNumQueries(0):
+            catalog.get_catalog()
+
+        # Another process renames a technology; update() sends no signals
+        Technology.objects.filter(pk=self.react.pk).update(name="Preact")
+        catalog.expire()
+        self.assertEqual(catalog.get_catalog().names([self.react.pk]), ["React"])
+        DataVersion.bump(CATALOG)
+        catalog.expire()
+        self.assertEqual(catalog.get_catalog().names([self.react.pk]), ["Preact"])
+
+    def test_changes_in_this_process_apply_at_once(self):
+        catalog.get_catalog()
+        vue = Technology.objects.create(name="Vue", category=self.frontend)
+        self.assertEqual(catalog.get_catalog().technologies[vue.pk].name, "Vue")
+        self.frontend.name = "UI"
+        self.frontend.save()
+        self.assertEqual(catalog.get_catalog().technologies[vue.pk].category, "UI")
+
+    def test_unknown_ids_force_a_reload(self):
+        catalog.get_catalog()
+        Technology.objects.bulk_create(
+            [Technology(name="Svelte", category=self.frontend)]
+        )
+        svelte = Technology.objects.get(name="Svelte")
+        self.assertEqual(
+            catalog.get_catalog([svelte.pk]).names([svelte.pk]), ["Svelte"]
+        )
+
+    def test_admin_technology_widget_does_not_query_per_option(self):
+        ticket = make_ticket(self.project)
+        url = f"/admin/tickets/ticket/{ticket.pk}/change/"
+        self.client.force_login(
+            User.objects.create_superuser("root", "root@example.com", "pw")
+        )
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        before = len(ctx.captured_queries)
+        for n in range(5):
+            Technology.objects.create(name=f"Tech {n}", category=self.category)
+        self.client.get(url)
+        with self.assertNumQueries(before):
+            response = self.client.get(url)
+        self.assertContains(response, "Tech 4 (Backend)")
+
+    def test_ticket_list_names_come_from_the_catalog(self):
+        ticket = make_ticket(self.project)
+        ticket.technologies.add(self.react, self.django)
+        response = self.client.get("/api/tickets/", {"fields": "technologies"})
+        self.assertEqual(
+            response.json()["items"][0]["technologies"], ["Django", "React"]
+        )
+        response = self.client.get("/api/tickets/", {"expand": "technologies"})
+        self.assertEqual(
+            response.json()["items"][0]["technologies"][1],
+            {"id": self.react.pk, "name": "React", "category": "Frontend"},
+        )
+        sql = " ".join(q["sql"] for q in self.queries("/api/tickets/"))
+        self.assertNotIn('"tickets_technologycategory"', sql)
+
+    def queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return ctx.captured_queries
+
+
+class UsageRollupTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.frontend = TechnologyCategory.objects.create(name="Frontend")
+        cls.react = Technology.objects.create(name="React", category=cls.frontend)
+        cls.postgres = Technology.objects.create(name="Postgres", category=cls.category)
+        cls.bob = User.objects.create_user("bob", is_se_team=True)
+        cls.carol = User.objects.create_user("carol")
+
+    def assertMatchesRebuild(self):
+        incremental = rollup_snapshot()
+        call_command("rebuild_usage_rollups", stdout=StringIO())
+        self.assertEqual(incremental, rollup_snapshot())
+
+    def usage(self, obj):
+        obj.usage_rollup.refresh_from_db()
+        return obj.usage_rollup.ticket_count, obj.usage_rollup.se_user_count
+
+    def test_tracks_links_and_distinct_se_users(self):
+        first = make_ticket(self.project)
+        first.technologies.add(self.django, self.postgres)
+        first.assigned_users.add(self.se_user, self.carol)
+        second = make_ticket(self.project)
+        second.assigned_users.add(self.se_user)
+        second.technologies.add(self.django)
+
+        self.assertEqual(self.usage(self.django), (2, 1))
+        self.assertEqual(self.usage(self.category), (3, 1))
+
+        self.bob.assigned_tickets.add(second)
+        self.assertEqual(self.usage(self.django), (2, 2))
+        first.technologies.remove(self.django, self.react)  # React was never linked
+        self.assertEqual(self.usage(self.django), (1, 2))
+        self.assertEqual(self.usage(self.postgres), (1, 1))
+        second.assigned_users.clear()
+        self.assertEqual(self.usage(self.django), (1, 0))
+        self.assertMatchesRebuild()
+
+    def test_deletes_and_reclassification(self):
+        ticket = make_ticket(self.project)
+        ticket.technologies.add(self.django, self.react)
+        ticket.assigned_users.add(self.se_user, self.bob)
+        other = make_ticket(self.project)
+        other.technologies.add(self.react)
+        other.assigned_users.add(self.carol)
+
+        self.carol.is_se_team = True
+        self.carol.save()
+        self.assertEqual(self.usage(self.react), (2, 3))
+        self.bob.delete()
+        self.assertEqual(self.usage(self.react), (2, 2))
+
+        self.react.category = self.category
+        self.react.save()
+        self.assertEqual(self.usage(self.category), (3, 2))
+        self.assertEqual(self.usage(self.frontend), (0, 0))
+
+        ticket.delete()
+        self.assertEqual(self.usage(self.category), (1, 1))
+        self.assertMatchesRebuild()
+        self.postgres.delete()
+        self.assertMatchesRebuild()
+
+    def test_team_report_reads_rollups(self):
+        ticket = make_ticket(self.project)
+        ticket.technologies.add(self.django)
+        ticket.assigned_users.add(self.se_user, self.bob, self.carol)
+
+        catalog.get_catalog()
+        with self.assertNumQueries(5):
+            report = self.client.get("/api/reports/team-technology/").json()
+        diversity = report["technology_diversity"]
+        self.assertEqual(report["team_size"], 2)
+        self.assertEqual(diversity["total_technologies_used"], 1)
+        self.assertEqual(
+            diversity["most_popular_technologies"][0],
+            {
+                "name": "Django",
+                "category": "Backend",
+                "tickets": 1,
+                "team_members_using": 2,
+            },
+        )
+        self.assertEqual(
+            diversity["category_breakdown"],
+            [
+                {"category": "Backend", "tickets": 1, "team_members_using": 2},
+                {"category": "Frontend", "tickets": 0, "team_members_using": 0},
+            ],
+        )
+
+
+class TicketSearchTests(TicketFixtureMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.login = make_ticket(
+            cls.project, title="Login page crashes", description="500 on submit"
+        )
+        cls.export = make_ticket(
+            cls.project,
+            title="Export condition reports",
+            description="Conservators need a CSV of condition reports",
+        )
+        cls.bug = make_ticket(cls.project, title="Slow gallery", description="Lag")
+        BugReport.objects.create(
+            ticket=cls.bug,
+            category="perceived_lag",
+            steps_to_reproduce="Open the thumbnail grid and scroll",
+            expected_results="Smooth",
+            actual_results="Stutters",
+        )
+
+    def search(self, q, **params):
+        response = self.client.get("/api/tickets/search", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranked_results(self):
+        results = self.search("condition reports")
+        self.assertEqual([r["ticket_id"] for r in results], [self.export.ticket_id])
+        self.assertGreater(results[0]["rank"], 0)
+        # Prefix match, and stemming via the porter tokenizer
+        self.assertEqual(self.search("crash")[0]["id"], self.login.id)
+
+    def test_subtype_fields_are_indexed_and_kept_in_sync(self):
+        self.assertEqual(self.search("thumbnail")[0]["id"], self.bug.id)
+        self.bug.bugreport.steps_to_reproduce = "Open the carousel"
+        self.bug.bugreport.save()
+        self.assertEqual(self.search("thumbnail"), [])
+        self.assertEqual(self.search("carousel")[0]["id"], self.bug.id)
+
+        self.login.delete()
+        self.assertEqual(self.search("login"), [])
+
+    def test_subtype_edits_change_the_etag(self):
+        first = self.client.get("/api/tickets/search", {"q": "thumbnail"})
+        self.bug.bugreport.steps_to_reproduce = "Open the carousel"
+        self.bug.bugreport.save()
+        response = self.client.get(
+            "/api/tickets/search", {"q": "thumbnail"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_ticket_id_and_syntax_characters(self):
+        self.assertEqual(self.search(self.export.ticket_id)[0]["id"], self.export.id)
+        self.assertEqual(self.search('"NEAR( AND *'), [])
+        self.assertEqual(search_ticket_ids("   "), [])
+
+    def test_admin_search_uses_index(self):
+        self.client.force_login(
+            User.objects.create_superuser("root", "root@example.com", "pw")
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/admin/tickets/ticket/", {"q": "thumbnail"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.bug])
+        # The index is queried as a subquery, never as a separate id lookup
+        matches = [q["sql"] for q in ctx.captured_queries if "MATCH" in q["sql"]]
+        self.assertTrue(matches)
+        self.assertTrue(all("IN (SELECT rowid" in sql for sql in matches))
+
+    def test_filter_without_fts5(self):
+        self.assertTrue(search.fts_enabled())
+        self.assertEqual(
+            list(Ticket.objects.filter(search_filter("thumbnail"))), [self.bug]
+        )
+        self.assertFalse(Ticket.objects.filter(search_filter("  ")).exists())
+        search._fts5_available = False
+        try:
+            self.assertEqual(
+                list(Ticket.objects.filter(search_filter("thumbnail"))), [self.bug]
+            )
+            self.assertEqual(search_ticket_ids("thumbnail"), [(self.bug.pk, 0.0)])
+        finally:
+            search._fts5_available = None
+
+
+class QueryPlanTests(TicketFixtureMixin, TestCase):
+    """EXPLAIN every ticket query an endpoint runs and reject full table scans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for status in ("staging", "completed", "in_progress"):
+            ticket = make_ticket(cls.project, status=status, owner=cls.se_user)
+            ticket.technologies.add(cls.django)
+            ticket.assigned_users.add(cls.se_user)
+        # Admin related filters only apply once they offer more than one choice
+        make_ticket(
+            Project.objects.create(name="Archive"),
+            owner=User.objects.create_user("bob"),
+        )
+        cls.admin_user = User.objects.create_superuser("root", "root@example.com", "pw")
+
+    def ticket_scans(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+
+        scans = []
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or "tickets_ticket" not in sql:
+                continue
+            aliases = {"tickets_ticket"} | set(
+                re.findall(r'"tickets_ticket" (U\d+)', sql)
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = [row[-1] for row in cursor.fetchall()]
+            # An index walk is only acceptable when LIMIT stops it early
+            allowed = r"SCAN \S+ USING INDEX .*" if " LIMIT " in sql else None
+            scans += [
+                f"{step}\n  in: {sql}"
+                for step in plan
+                if step.startswith("SCAN ")
+                and step.split()[1] in aliases
+                and not (allowed and re.fullmatch(allowed, step))
+            ]
+        return scans
+
+    def assertNoTicketScans(self, url, params=None):
+        scans = self.ticket_scans(url, params)
+        self.assertFalse(scans, "Full scan of tickets_ticket:\n" + "\n".join(scans))
+
+    def test_ticket_list(self):
+        first = self.client.get("/api/tickets/", {"limit": 1}).json()
+        for params in (
+            {},
+            {"status": "completed"},
+            {"project_id": self.project.id},
+            {"status": "completed", "project_id": self.project.id},
+            {"limit": 1, "cursor": first["next"]},
+            {"status": "staging", "cursor": first["next"]},
+        ):
+            with self.subTest(params=params):
+                self.assertNoTicketScans("/api/tickets/", params)
+
+    def test_search_and_projects(self):
+        self.assertNoTicketScans("/api/tickets/search", {"q": "search"})
+        self.assertNoTicketScans("/api/projects/")
+        self.assertNoTicketScans("/api/technologies/")
+
+    def test_reports(self):
+        self.assertNoTicketScans("/api/reports/individual/alice/")
+        self.assertNoTicketScans("/api/reports/team-technology/")
+        self.assertNoTicketScans(f"/api/reports/project/{self.project.id}/")
+
+    def test_incremental_analytics_export(self):
+        since = Ticket.objects.order_by("modified_at").first().modified_at
+        sql, params = analytics.fact_queryset(since).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertIn(
+            "SEARCH tickets_ticket USING INDEX ticket_modified_idx (modified_at>?)",
+            plan,
+        )
+        self.assertFalse([step for step in plan if "TEMP B-TREE" in step], plan)
+
+    def test_admin_changelist_filters(self):
+        self.client.force_login(self.admin_user)
+        for params in (
+            {"status__exact": "completed"},
+            {"priority__exact": "high"},
+            {"ticket_type__exact": "bug"},
+            {"project__id__exact": self.project.id},
+            {"owner__id__exact": self.se_user.id},
+        ):
+            with self.subTest(params=params):
+                self.assertNoTicketScans("/admin/tickets/ticket/", params)
+
+
+class SyntheticDataTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def test_generate_and_benchmark(self):
+        call_command(
+            "generate_data",
+            tickets=120,
+            batch_size=50,
+            seed=7,
+            attachment_ratio=0.5,
+            stdout=StringIO(),
+        )
+        self.assertEqual(Ticket.objects.count(), 120)
+        self.assertEqual(
+            BugReport.objects.count(), Ticket.objects.filter(ticket_type="bug").count()
+        )
+        self.assertTrue(TechnologyUsage.objects.filter(ticket_count__gt=0).exists())
+        self.assertTrue(search_ticket_ids("condition"))
+
+        # Attachments point at stored files, counted on their blobs
+        attachments = Attachment.objects.select_related("blob")
+        self.assertTrue(attachments.exists())
+        for attachment in attachments:
+            with attachment.file.open("rb") as f:
+                self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+        self.assertEqual(
+            sum(Blob.objects.values_list("ref_count", flat=True)), attachments.count()
+        )
+
+        results = benchmarks.run_endpoint_suite(120, repeat=1)
+        self.assertEqual({r["status"] for r in results}, {200})
+        self.assertTrue(all(r["queries"] > 0 for r in results))
+
+        results = benchmarks.run_bulk_create_suite(120, repeat=1, batch=20)
+        self.assertEqual([r["name"] for r in results], ["bulk_endpoint", "save_loop"])
+        self.assertEqual(results[0]["status"], 200)
+        self.assertTrue(all(r["tickets_per_second"] > 0 for r in results))
+
+        results = benchmarks.run_serialization_suite(120, repeat=1)
+        self.assertEqual([r["name"] for r in results], ["validated", "fast_path"])
+        self.assertTrue(all(r["rows_per_second"] > 0 for r in results))
+
+        results = benchmarks.run_export_suite(120, repeat=1)
+        self.assertEqual([r["name"] for r in results], ["buffered", "streaming"])
+        self.assertLess(results[1]["queries"], results[0]["queries"])
+
+
+class RequestMetricsTests(TicketFixtureMixin, TestCase):
+    def test_server_timing_header_and_log_line(self):
+        make_ticket(self.project)
+        catalog.get_catalog()
+        with self.assertLogs("ticket_system.requests", "INFO") as logs:
+            response = self.client.get("/api/tickets/")
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="4 queries", app;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["path"], "/api/tickets/")
+        self.assertEqual(record["queries"], 4)
+        self.assertFalse(record["slow"])
+        self.assertEqual(record["duplicate_queries"], [])
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_flags_slow_requests_and_repeated_queries(self):
+        for i in range(6):
+            Technology.objects.create(name=f"Tech {i}", category=self.category)
+
+        def view(request):
+            # Technology.usage_count runs a COUNT per row
+            for technology in Technology.objects.all():
+                technology.usage_count
+            return HttpResponse()
+
+        with self.assertLogs("ticket_system.requests", "INFO") as logs:
+            RequestMetricsMiddleware(view)(RequestFactory().get("/technologies/"))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelno, logging.WARNING)
+        self.assertTrue(record["slow"])
+        self.assertEqual(len(record["duplicate_queries"]), 1)
+        self.assertEqual(record["duplicate_queries"][0]["count"], 7)
+        self.assertIn("COUNT(*)", record["duplicate_queries"][0]["sql"])